@@ -1,91 +1,208 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-from models.face_model import get_mood_from_webcam
-from models.voice_model import recognize_speech
-from models.text_model import detect_emotion
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response
 from flask_cors import CORS
+from model_registry import ModelRegistry
+from prefork import PreforkServer
+from emotion_service import emotion_service
+from user_store import SQLiteUserStore, import_users_json
+from hashing import HashingService, HashingUnavailable
+from catalog import CatalogLoader
+from face_pipeline import FaceAnalyzer, decode_image, read_clip
+from voice_stream import VoiceStreamManager, check_sample_rate
+from song_server import serve_song
+from transcode import TranscodeCache, choose_variant
+from jobs import JobManager, JobQueueFull
+from fusion import MoodFusion
+from recommender import Recommender
+from audio_features import FeatureCache
+from history import HistoryStore, clean_event
+from ranking import Reranker
+from text_cache import TextResponseCache, SharedTextResponseCache, normalize_phrase
+import click
+from werkzeug.security import safe_join
 import json
 import os
-import bcrypt
+import threading
+import wave
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'
 CORS(app)
 
 USER_FILE = "users.json"
+USER_DB = "users.db"
+CATALOG_FILE = "mood_songs.json"
+SONGS_DIR = os.path.join(app.static_folder, "songs")
+TRANSCODE_DIR = "transcode_cache"
+FEATURE_INDEX_DIR = "feature_index"
+FEATURE_CACHE_DIR = os.path.join(FEATURE_INDEX_DIR, "cache")
+HISTORY_DIR = "history"
+RANKING_SNAPSHOT = os.path.join(HISTORY_DIR, "ranking.json")
+# Comma-separated backends to load in the background at startup, e.g. "emotion,face"
+PREWARM_MODELS = [name for name in os.environ.get("VIBESYNC_PREWARM", "").split(",") if name]
+# Share the /text response cache between worker processes forked from this one
+SHARED_TEXT_CACHE = os.environ.get("VIBESYNC_SHARED_TEXT_CACHE") == "1"
 
-# Ensure users file exists
-if not os.path.exists(USER_FILE):
-    with open(USER_FILE, "w") as f:
-        json.dump({}, f)
+users = SQLiteUserStore(USER_DB)
+hasher = HashingService(workers=2, max_queue=16)
+catalog = CatalogLoader(CATALOG_FILE)
+face_analyzer = FaceAnalyzer(samples=5, stride=1, deadline=3.0)
+voice_streams = VoiceStreamManager(sample_rate=16000)
+transcoder = TranscodeCache(TRANSCODE_DIR, max_bytes=512 * 1024 * 1024)
+jobs = JobManager({"face": 2, "voice": 2, "text": 4}, max_pending=16, ttl=300)
+fusion = MoodFusion(half_life=60.0)
+recommender = Recommender(FEATURE_INDEX_DIR)
+feature_cache = FeatureCache(FEATURE_CACHE_DIR)
+history = HistoryStore(HISTORY_DIR)
+reranker = Reranker(RANKING_SNAPSHOT, snapshot_interval=60, history=history)
+reranker.start_snapshots()
 
-def load_users():
-    with open(USER_FILE, "r") as f:
-        return json.load(f)
+def load_emotion_model():
+    emotion_service.warmup()
+    return emotion_service
 
-def save_users(users):
-    with open(USER_FILE, "w") as f:
-        json.dump(users, f)
+def load_face_model():
+    face_analyzer.detector.warmup()
+    return face_analyzer
 
+# Nothing ML-related is imported until a route needs it (or it's prewarmed)
+models = ModelRegistry()
+models.register("text", "models.text_model")
+models.register("voice", "models.voice_model")
+models.register("emotion", load_emotion_model)
+models.register("face", load_face_model)
+
+if SHARED_TEXT_CACHE:
+    text_cache = SharedTextResponseCache(slots=4096, ttl=300.0)
+else:
+    text_cache = TextResponseCache(max_entries=2048, ttl=300.0)
+prewarm_thread = models.prewarm(PREWARM_MODELS) if PREWARM_MODELS else None
+
+# Import the legacy users.json the first time the database is created
+if users.count() == 0 and os.path.exists(USER_FILE):
+    import_users_json(USER_FILE, users)
+
+# Pick up new or changed songs in the background once the app starts serving
+# requests (not at import, so it doesn't race `flask extract-features`).
+# Run that command first for a large library.
+feature_sync_started = False
+feature_sync_lock = threading.Lock()
+
+@app.before_request
+def start_feature_sync():
+    global feature_sync_started
+    if feature_sync_started:
+        return
+    with feature_sync_lock:
+        if feature_sync_started:
+            return
+        feature_sync_started = True
+    if os.path.isdir(SONGS_DIR):
+        threading.Thread(target=recommender.sync, args=(SONGS_DIR, feature_cache), daemon=True).start()
+
+def detect_emotion(text):
+    return models.get("text").detect_emotion(text)
+
+def recognize_speech():
+    return models.get("voice").recognize_speech()
+
+# Tracks whose audio features sit closest to a mood, for moods without a curated list
+def recommended_songs(mood, k=10):
+    return [
+        {"title": os.path.splitext(name)[0], "url": "/songs/" + name}
+        for name, _ in recommender.top_k(mood, k)
+    ]
+
+# Songs for a mood, straight from the precompiled catalog
 def get_songs_for_mood(mood):
-    mood_songs = {
-        "happy": [
-            {"title": "Happy - Pharrell Williams", "url": "/static/songs/rey.wav"},
-            {"title": "Good Life - OneRepublic", "url": "/static/songs/hey.wav"},
-            {"title": "Fake It - Bastille", "url": "/static/songs/a.wav"},
-            {"title": "Electric Feel - MGMT", "url": "/static/songs/aa.wav"},
-            {"title": "Tongue Tied - Grouplove", "url": "/static/songs/ab.wav"},
-            {"title": "Pumped Up Kicks - Foster the People", "url": "/static/songs/ad.wav"},
-            {"title": "Safe and Sound - Capital Cities", "url": "/static/songs/av.wav"},
-            {"title": "Walking on a Dream - Empire of the Sun", "url": "/static/songs/av.wav"},
-            {"title": "Shark Attack - Grouplove", "url": "/static/songs/as.wav"},
-            {"title": "Dog Days Are Over - The Machine", "url": "/static/songs/an.wav"},
-            {"title": "Young Folks - Peter Bjorn and John", "url": "/static/songs/am.wav"}
-        ],
-        "sad": [
-            {"title": "Someone Like You - Adele", "url": "/static/songs/key.wav"},
-            {"title": "Fix You - Coldplay", "url": "/static/songs/jey.wav"},
-            {"title": "Take a Walk - Passion Pit", "url": "/static/songs/b.wav"},
-            {"title": "Sweet Disposition - The Temper Trap", "url": "/static/songs/bl.wav"},
-            {"title": "Anna Sun - Walk the Moon", "url": "/static/songs/blue.wav"},
-            {"title": "Dreaming - Smallpools", "url": "/static/songs/c.wav"},
-            {"title": "Helena Beat - Foster the People", "url": "/static/songs/cc.wav"},
-            {"title": "Kids - MGMT", "url": "/static/songs/csk.wav"},
-            {"title": "Midnight City - M83", "url": "/static/songs/dc.wav"},
-            {"title": "Electric Love - Børns", "url": "/static/songs/rcb.wav"}
-        ],
-        "neutral": [
-            {"title": "Stronger - Kanye West", "url": "/static/songs/pey.wav"},
-            {"title": "Colors - Grouplove", "url": "/static/songs/d.wav"},
-            {"title": "Cough Syrup - Young the Giant", "url": "/static/songs/e.wav"},
-            {"title": "Float On - Modest Mouse", "url": "/static/songs/f.wav"},
-            {"title": "Out of My League - Fitz and The Tantrums", "url": "/static/songs/ff.wav"},
-            {"title": "Lisztomania - Phoenix", "url": "/static/songs/g.wav"},
-            {"title": "Some Nights - fun", "url": "/static/songs/gry.wav"},
-            {"title": "Shut Up and Dance - Walk the Moon", "url": "/static/songs/gt.wav"},
-            {"title": "On Top of the World - Imagine Dragons", "url": "/static/songs/hh.wav"},
-            {"title": "Fireflies - Owl City", "url": "/static/songs/k.wav"},
-        ],
-        "angry": [
-            {"title": "Somewhere I Belong - Linkin Park", "url": "/static/songs/kkl.wav"},
-            {"title": "Safe and Sound - Capital Cities", "url": "/static/songs/kkr.wav"},
-            {"title": "Midnight City - M83", "url": "/static/songs/l.wav"},
-            {"title": "Pumped Up Kicks - Foster the People", "url": "/static/songs/ll.wav"},
-            {"title": "Tongue Tied - Grouplove", "url": "/static/songs/m.wav"},
-            {"title": "Lights - Ellie Goulding", "url": "/static/songs/mi.wav"},
-            {"title": "Call Me Maybe - Carly Rae Jepsen", "url": "/static/songs/mn.wav"},
-            {"title": "Good Time - Owl City & Carly Rae Jepsen", "url": "/static/songs/w.wav"},
-            {"title": "Tongue Tied - Grouplove", "url": "/static/songs/x.wav"},
-            {"title": "Young Blood - The Naked and Famous", "url": "/static/songs/xx.wav"}
-        ]
-    }
-    return mood_songs.get(mood.lower(), [])
+    return catalog.current.songs(mood) or (recommended_songs(mood) if mood else [])
+
+# The same for everyone part of a mood response: '{"mood": ..., "songs": [...]'
+# around the catalog's cached JSON, without the closing brace
+def mood_body(mood):
+    songs = catalog.current.encoded(mood)
+    if songs == b"[]" and mood:
+        songs = json.dumps(recommended_songs(mood), separators=(",", ":")).encode()
+    return b'{"mood":' + json.dumps(mood).encode() + b',"songs":' + songs
+
+# Build a {"mood": ..., "songs": [...]} response, reusing `body` from mood_body
+# when given. Users with listening history get the list re-ranked for them
+# instead. Any extra fields are encoded and appended after the songs.
+def mood_response(mood, body=None, **extra):
+    user = session.get("username")
+    if user and reranker.has_history(user):
+        songs = reranker.rank(user, [dict(song) for song in get_songs_for_mood(mood)])
+        body = b'{"mood":' + json.dumps(mood).encode() + b',"songs":' + json.dumps(songs, separators=(",", ":")).encode()
+    elif body is None:
+        body = mood_body(mood)
+    if extra:
+        body += b"," + json.dumps(extra, separators=(",", ":"))[1:-1].encode()
+    return app.response_class(body + b"}", mimetype="application/json")
+
+# Same shape as mood_response, as a plain dict for job results
+def mood_payload(mood, user=None, **extra):
+    songs = [dict(song) for song in get_songs_for_mood(mood)]
+    return {"mood": mood, "songs": reranker.rank(user, songs), **extra}
+
+# Fold one modality's reading into the user's fused mood. Returns the extra
+# response fields, or nothing for anonymous requests.
+def fuse(user, modality, scores):
+    if not user or not scores:
+        return {}
+    fusion.update(user, modality, scores)
+    return {"fused": fusion.distribution(user)}
+
+# Frames come from the browser, either as still images or as one short clip
+def read_face_frames():
+    try:
+        if "clip" in request.files:
+            frames = read_clip(request.files["clip"].read(), stride=5, limit=face_analyzer.samples)
+        else:
+            frames = [decode_image(f.read()) for f in request.files.getlist("frames")]
+    except ValueError:
+        raise ValueError("Could not decode the uploaded frames.")
+    if not frames:
+        raise ValueError("No frames uploaded.")
+    return frames
+
+def face_job(user, frames):
+    result = models.get("face").analyze(frames)
+    return mood_payload(
+        result["mood"], user, confidence=result["confidence"], frames=result["frames"],
+        **fuse(user, "face", result["scores"]),
+    )
+
+def voice_job(user, data, is_wav, rate):
+    stream_id = voice_streams.open(rate)
+    _, text = voice_streams.feed(stream_id, data, is_wav=is_wav, final=True)
+    mood = detect_emotion(text) if text else None
+    return mood_payload(mood or "neutral", user, text=text, **fuse(user, "voice", mood))
+
+# Mood and response body for a phrase, from the text cache when the same
+# phrase (after normalization) was seen recently. The catalog version is part
+# of the key so an edited catalog isn't served stale.
+def detect_text_mood(text):
+    key = f"{catalog.current.mtime}:{normalize_phrase(text)}"
+    cached = text_cache.get(key)
+    if cached is not None:
+        return cached
+    mood = detect_emotion(text)
+    body = mood_body(mood)
+    text_cache.put(key, mood, body)
+    return mood, body
+
+def text_job(user, text):
+    mood, _ = detect_text_mood(text)
+    return mood_payload(mood, user, **fuse(user, "text", mood))
 
 @app.route("/")
 def index():
     if "username" in session:
-        users = load_users()
-        user = users.get(session["username"], {})
-        return render_template("index.html", username=session["username"], email=user.get("email", "not_set@example.com"))
+        # The session was verified at login, so this never goes back to the store or bcrypt
+        email = session.get("email")
+        if email is None:
+            email = (users.get(session["username"]) or {}).get("email", "not_set@example.com")
+            session["email"] = email
+        return render_template("index.html", username=session["username"], email=email)
     return redirect(url_for("login"))
 
 @app.route("/login", methods=["GET", "POST"])
@@ -93,13 +210,21 @@ def login():
     if request.method == "POST":
         username = request.form["username"]
         password = request.form["password"].encode("utf-8")
-        users = load_users()
 
-        if username in users:
-            stored_password = users[username]["password"].encode("utf-8")
-            if bcrypt.checkpw(password, stored_password):
+        # Already verified in this session, no need to pay for bcrypt again
+        if session.get("username") == username:
+            return redirect(url_for("index"))
+
+        user = users.get(username)
+        if user:
+            stored_password = user["password"].encode("utf-8")
+            try:
+                verified = hasher.check_password(password, stored_password)
+            except HashingUnavailable:
+                return render_template("login.html", error="Server is busy, please try again."), 503
+            if verified:
                 session["username"] = username
-                session["email"] = users[username].get("email", "not_set@example.com")
+                session["email"] = user.get("email", "not_set@example.com")
                 return redirect(url_for("index"))
         return render_template("login.html", error="Invalid credentials.")
     return render_template("login.html")
@@ -111,16 +236,18 @@ def register():
         email = request.form["email"]
         password = request.form["password"]
         confirm = request.form["confirm"]
-        users = load_users()
 
-        if username in users:
+        if users.get(username):
             return render_template("register.html", error="Username already exists.")
         if password != confirm:
             return render_template("register.html", error="Passwords do not match.")
 
-        hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-        users[username] = {"email": email, "password": hashed_pw.decode("utf-8")}
-        save_users(users)
+        try:
+            hashed_pw = hasher.hash_password(password.encode("utf-8"))
+        except HashingUnavailable:
+            return render_template("register.html", error="Server is busy, please try again."), 503
+        if not users.add(username, email, hashed_pw.decode("utf-8")):
+            return render_template("register.html", error="Username already exists.")
         return redirect(url_for("login"))
     return render_template("register.html")
 
@@ -130,22 +257,215 @@ def logout():
     session.pop("email", None)
     return redirect(url_for("login"))
 
+# Song files for the <audio> players, with ETag/304 and byte-range support.
+# Clients that accept a compressed format get it from the transcode cache;
+# until it's cached the first request streams it while ffmpeg encodes.
+@app.route("/songs/<path:filename>")
+def song_file(filename):
+    variant = choose_variant(request.accept_mimetypes) if transcoder.available else None
+    path = safe_join(SONGS_DIR, filename)
+    if variant is None or path is None or not os.path.isfile(path):
+        response = serve_song(request, app.response_class, SONGS_DIR, filename)
+    else:
+        cached = transcoder.lookup(path, variant)
+        if cached is None:
+            response = app.response_class(transcoder.stream(path, variant), mimetype=variant)
+        else:
+            response = serve_song(request, app.response_class, transcoder.cache_dir, os.path.basename(cached))
+    response.vary.add("Accept")
+    return response
+
+@app.route("/metrics")
+def metrics():
+    return jsonify({
+        "hashing": hasher.metrics(),
+        "jobs": jobs.metrics(),
+        "text_cache": text_cache.metrics(),
+        "models": models.metrics(),
+    })
+
 @app.route("/face", methods=["POST"])
 def face_recognition():
-    mood = get_mood_from_webcam()
-    return jsonify({"mood": mood, "songs": get_songs_for_mood(mood)})
+    try:
+        frames = read_face_frames()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = models.get("face").analyze(frames)
+    return mood_response(
+        result["mood"], confidence=result["confidence"], frames=result["frames"],
+        **fuse(session.get("username"), "face", result["scores"]),
+    )
 
 @app.route("/voice", methods=["POST"])
 def voice_recognition():
     mood = recognize_speech()
-    return jsonify({"mood": mood, "songs": get_songs_for_mood(mood)})
+    return mood_response(mood, **fuse(session.get("username"), "voice", mood))
+
+# Chunked voice upload. The first POST (no ?session=) opens a stream; each
+# following POST carries raw 16-bit mono PCM or a WAV chunk. The answer comes
+# back as soon as the speaker stops, or when the client sends ?final=1.
+@app.route("/voice/stream", methods=["POST"])
+def voice_stream():
+    stream_id = request.args.get("session")
+    if not stream_id:
+        try:
+            stream_id = voice_streams.open(request.args.get("rate", type=int))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"session": stream_id, "done": False})
+
+    is_wav = request.mimetype in ("audio/wav", "audio/x-wav", "audio/wave")
+    final = request.args.get("final") == "1"
+    try:
+        done, text = voice_streams.feed(stream_id, request.get_data(), is_wav=is_wav, final=final)
+    except KeyError:
+        return jsonify({"error": "Unknown or expired session."}), 404
+    except (ValueError, EOFError, wave.Error) as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not done:
+        return jsonify({"session": stream_id, "done": False})
+    mood = detect_emotion(text) if text else None
+    return mood_response(mood or "neutral", done=True, text=text, **fuse(session.get("username"), "voice", mood))
 
 @app.route("/text", methods=["POST"])
 def text_analysis():
     data = request.json
     text = data.get("text")
-    mood = detect_emotion(text)
-    return jsonify({"mood": mood, "songs": get_songs_for_mood(mood)})
+    mood, body = detect_text_mood(text)
+    return mood_response(mood, body, **fuse(session.get("username"), "text", mood))
+
+# Asynchronous mood detection. POST returns a job id straight away; the
+# result is collected with GET /jobs/<id>?wait=<seconds> or over SSE.
+@app.route("/jobs/<modality>", methods=["POST"])
+def create_job(modality):
+    try:
+        if modality == "face":
+            args = (read_face_frames(),)
+        elif modality == "voice":
+            is_wav = request.mimetype in ("audio/wav", "audio/x-wav", "audio/wave")
+            rate = request.args.get("rate", type=int)
+            if rate is not None:
+                check_sample_rate(rate)
+            args = (request.get_data(), is_wav, rate)
+        elif modality == "text":
+            args = ((request.json or {}).get("text") or "",)
+        else:
+            return jsonify({"error": "Unknown modality."}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    worker = {"face": face_job, "voice": voice_job, "text": text_job}[modality]
+    try:
+        job = jobs.submit(modality, worker, session.get("username"), *args)
+    except JobQueueFull:
+        return jsonify({"error": "Too many pending jobs, please try again."}), 503
+    return jsonify({"id": job.id, "status": job.status}), 202
+
+# Batched listening events from the browser: {"events": [{"url", "title", "mood", "event", "ts", "duration"}, ...]}
+@app.route("/history/events", methods=["POST"])
+def history_events():
+    if "username" not in session:
+        return jsonify({"error": "Not logged in."}), 401
+    body = request.get_json(force=True, silent=True)
+    events = (body.get("events") if isinstance(body, dict) else None) or []
+    if not isinstance(events, list):
+        return jsonify({"error": "events must be a list."}), 400
+    try:
+        events = [clean_event(e) for e in events[:1000]]
+    except ValueError as e:
+        return jsonify({"error": f"Bad event: {e}."}), 400
+    ingested = history.ingest(session["username"], events)
+    for event in events:
+        reranker.record(session["username"], event["url"], event.get("event", "play"), event.get("ts"))
+    return jsonify({"ingested": ingested})
+
+@app.route("/history/recent")
+def history_recent():
+    if "username" not in session:
+        return jsonify({"error": "Not logged in."}), 401
+    n = max(1, min(request.args.get("n", 5, type=int), 500))
+    return jsonify({"songs": history.last(session["username"], n)})
+
+@app.route("/history/moods")
+def history_moods():
+    if "username" not in session:
+        return jsonify({"error": "Not logged in."}), 401
+    return jsonify({"counts": history.mood_counts(session["username"])})
+
+@app.route("/mood/fused")
+def fused_mood():
+    distribution = fusion.distribution(session.get("username"))
+    if distribution is None:
+        return jsonify({"mood": None, "fused": {}})
+    return jsonify({"mood": max(distribution, key=distribution.get), "fused": distribution})
+
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    job = jobs.wait(job_id, timeout=min(request.args.get("wait", 0, type=float), 30))
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    return Response(
+        jobs.events(job_id),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# flask --app app extract-features [--songs-dir DIR] [--workers N]
+@app.cli.command("extract-features")
+@click.option("--songs-dir", default=SONGS_DIR, show_default=True, help="Folder of WAV files to analyze.")
+@click.option("--workers", default=os.cpu_count(), show_default=True, help="Worker processes.")
+def extract_features_command(songs_dir, workers):
+    """Extract audio features for every song and update the feature index."""
+    progress = lambda path: click.echo(f"  analyzed {os.path.basename(path)}")
+    stats = recommender.sync(songs_dir, feature_cache, workers=workers, progress=progress)
+    click.echo(
+        f"{stats['files']} songs indexed: {stats['extracted']} analyzed, {stats['cached']} from cache, "
+        f"{stats['failed']} failed in {stats['seconds']:.2f} s ({stats['files_per_second']:.1f} files/s)"
+    )
+
+# Serve from preforked worker processes that share the preloaded models (POSIX only):
+# flask --app app serve [--host H] [--port P] [--workers N] [--max-requests M] [--preload emotion,face]
+# `kill -HUP <pid>` reloads the catalog and swaps in fresh workers, `kill -TERM <pid>` stops.
+@app.cli.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=5000, show_default=True)
+@click.option("--workers", default=os.cpu_count(), show_default=True, help="Worker processes.")
+@click.option("--max-requests", default=1000, show_default=True, help="Recycle a worker after about this many requests (0 = never).")
+@click.option("--preload", default="emotion,face", show_default=True, help="Model backends to load before forking.")
+def serve_command(host, port, workers, max_requests, preload):
+    """Serve the app from preforked worker processes."""
+    global text_cache
+    if not isinstance(text_cache, SharedTextResponseCache):
+        text_cache = SharedTextResponseCache(slots=4096, ttl=300.0)
+
+    def load():
+        global feature_sync_started
+        if prewarm_thread is not None:
+            prewarm_thread.join()
+        for name in filter(None, preload.split(",")):
+            try:
+                models.get(name)
+            except Exception as e:
+                click.echo(f"⚠️ Could not preload {name}: {e}")
+        # One feature sync here instead of one per worker
+        feature_sync_started = True
+        if os.path.isdir(SONGS_DIR):
+            recommender.sync(SONGS_DIR, feature_cache)
+
+    def reload():
+        catalog.reload()
+        text_cache.clear()
+
+    PreforkServer(
+        app, host=host, port=port, workers=workers, max_requests=max_requests,
+        preload=load, on_reload=reload, before_exit=reranker.snapshot,
+    ).run()
 
 if __name__ == "__main__":
     app.run(debug=True)
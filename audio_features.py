@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Columns of a feature vector
+FEATURES = ("tempo", "energy", "centroid")
+
+# Only the first minute is analyzed; that's plenty to characterize a track
+MAX_SECONDS = 60
+HOP = 512
+# Part of every cached feature file's name; bump it when extraction changes
+# so features computed the old way are extracted again
+EXTRACTOR_VERSION = 2
+
+
+# Read a WAV file as mono float32 in [-1, 1]. 8-bit WAV samples are unsigned,
+# centered on 128; wider ones are signed. With mmap the samples are paged
+# in from disk as they're touched instead of being read up front.
+# scipy is imported inside the functions that use it so the web app doesn't
+# pay for it at startup.
+def load_mono(path, mmap=False):
+    from scipy.io import wavfile
+
+    rate, data = wavfile.read(path, mmap=mmap)
+    # Before averaging the channels turns the samples into floats
+    dtype = data.dtype
+    data = data[: rate * MAX_SECONDS]
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if dtype == np.uint8:
+        data = (np.asarray(data, dtype=np.float32) - 128.0) / 128.0
+    elif np.issubdtype(dtype, np.integer):
+        data = np.asarray(data, dtype=np.float32) / float(np.iinfo(dtype).max)
+    return rate, np.asarray(data, dtype=np.float32)
+
+
+# Estimate tempo in BPM from the autocorrelation of the onset envelope
+def estimate_tempo(samples, rate, low_bpm=60, high_bpm=200):
+    from scipy import signal
+
+    frames = len(samples) // HOP
+    if frames < 4:
+        return 0.0
+    envelope = np.sqrt((samples[: frames * HOP].reshape(frames, HOP) ** 2).mean(axis=1))
+    onsets = np.maximum(np.diff(envelope), 0)
+    onsets -= onsets.mean()
+    corr = signal.correlate(onsets, onsets, mode="full", method="fft")[len(onsets) - 1 :]
+
+    frame_rate = rate / HOP
+    min_lag = max(1, int(frame_rate * 60 / high_bpm))
+    max_lag = min(len(corr) - 1, int(frame_rate * 60 / low_bpm))
+    if max_lag <= min_lag:
+        return 0.0
+    lag = min_lag + int(np.argmax(corr[min_lag:max_lag]))
+    return 60.0 * frame_rate / lag
+
+
+def spectral_centroid(samples, rate):
+    from scipy import signal
+
+    freqs, power = signal.welch(samples, fs=rate, nperseg=min(2048, len(samples)))
+    total = power.sum()
+    return float((freqs * power).sum() / total) if total > 0 else 0.0
+
+
+# [tempo (BPM), RMS energy, spectral centroid (Hz)] for one track
+def extract_features(path, mmap=False):
+    rate, samples = load_mono(path, mmap=mmap)
+    if not len(samples):
+        return np.zeros(len(FEATURES), dtype=np.float32)
+    energy = float(np.sqrt(np.mean(samples ** 2)))
+    return np.array(
+        [estimate_tempo(samples, rate), energy, spectral_centroid(samples, rate)],
+        dtype=np.float32,
+    )
+
+
+def content_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Features already extracted, stored as one small .npy per track keyed by the
+# hash of the file's contents. A manifest remembers each path's size, mtime
+# and hash so unchanged files aren't even re-hashed on the next run.
+class FeatureCache:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        except (OSError, ValueError):
+            self._manifest = {}
+
+    def key(self, path):
+        st = os.stat(path)
+        entry = self._manifest.get(path)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        digest = content_hash(path)
+        with self._lock:
+            self._manifest[path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def _file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.v{EXTRACTOR_VERSION}.npy")
+
+    def get(self, key):
+        try:
+            return np.load(self._file(key))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, features):
+        tmp_path = self._file(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, features)
+        os.replace(tmp_path, self._file(key))
+
+    def save_manifest(self):
+        with self._lock:
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f)
+            os.replace(tmp_path, self.manifest_path)
+
+
+def _extract_one(path):
+    return extract_features(path, mmap=True)
+
+
+# Features for many files. Cached results are reused; everything else is
+# spread across a process pool and checkpointed into the cache as each file
+# finishes, so an interrupted run picks up where it left off. The manifest is
+# saved every `save_interval` seconds while files are hashed and once they all
+# are, so an interrupted run doesn't hash them again either.
+# Returns ({path: features}, stats).
+def extract_many(paths, cache, workers=None, progress=None, save_interval=30.0):
+    started = time.perf_counter()
+    saved = started
+    results = {}
+    todo = {}
+    failed = 0
+    for path in paths:
+        if time.perf_counter() - saved >= save_interval:
+            cache.save_manifest()
+            saved = time.perf_counter()
+        key = cache.key(path)
+        features = cache.get(key)
+        if features is None:
+            todo[path] = key
+        else:
+            results[path] = features
+    cache.save_manifest()
+
+    def finish(path, features):
+        cache.put(todo[path], features)
+        results[path] = features
+        if progress is not None:
+            progress(path)
+
+    if workers == 1 or len(todo) <= 1:
+        for path in todo:
+            try:
+                finish(path, _extract_one(path))
+            except (OSError, ValueError) as e:
+                failed += 1
+                print(f"⚠️ Could not analyze {path}: {e}")
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_extract_one, path): path for path in todo}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    finish(path, future.result())
+                except (OSError, ValueError) as e:
+                    failed += 1
+                    print(f"⚠️ Could not analyze {path}: {e}")
+
+    elapsed = time.perf_counter() - started
+    extracted = len(todo) - failed
+    return results, {
+        "files": len(results),
+        "extracted": extracted,
+        "cached": len(results) - extracted,
+        "failed": failed,
+        "seconds": elapsed,
+        "files_per_second": extracted / elapsed if elapsed > 0 else 0.0,
+    }
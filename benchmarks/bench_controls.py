@@ -0,0 +1,82 @@
+# Idle CPU and repeat handling: the old busy-polling hotkey loop against the
+# command dispatcher.
+#
+#   python benchmarks/bench_controls.py [--seconds 2]
+#
+# The old loop checked keyboard.is_pressed() back to back, so it ran a core
+# flat out and fired a skip on every pass while the key was held. The
+# dispatcher sleeps in queue.get() until a command arrives and debounces
+# repeats. A dict lookup stands in for keyboard.is_pressed().
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controls import CommandDispatcher
+
+# How often a held key auto-repeats
+REPEAT_HZ = 30
+
+
+def thread_cpu(target, seconds):
+    result = {}
+
+    def run():
+        start = time.thread_time()
+        target(time.monotonic() + seconds)
+        result["cpu"] = time.thread_time() - start
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result["cpu"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # Idle: nobody touches a key
+    keys = {"n": False, "q": False}
+
+    def busy_poll(stop_at):
+        while time.monotonic() < stop_at:
+            if keys["n"] or keys["q"]:
+                pass
+
+    dispatcher = CommandDispatcher()
+    dispatcher.on("next", lambda: None)
+
+    def dispatch(stop_at):
+        threading.Timer(stop_at - time.monotonic(), dispatcher.stop).start()
+        dispatcher.run()
+
+    busy = thread_cpu(busy_poll, args.seconds)
+    idle = thread_cpu(dispatch, args.seconds)
+    print(f"idle CPU over {args.seconds:.0f} s:  busy poll {busy:6.3f} s   dispatcher {idle:6.3f} s")
+
+    # Holding 'n' for one second
+    skips = {"poll": 0, "dispatcher": 0}
+    keys["n"] = True
+    stop_at = time.monotonic() + 1.0
+    while time.monotonic() < stop_at:
+        if keys["n"]:
+            skips["poll"] += 1
+
+    dispatcher = CommandDispatcher(debounce=0.3)
+    dispatcher.on("next", lambda: skips.__setitem__("dispatcher", skips["dispatcher"] + 1))
+    thread = dispatcher.start()
+    for _ in range(REPEAT_HZ):
+        dispatcher.post("next", source="hotkey")
+        time.sleep(1.0 / REPEAT_HZ)
+    dispatcher.stop()
+    thread.join()
+    print(f"skips while 'n' is held for 1 s:  busy poll {skips['poll']}   dispatcher {skips['dispatcher']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Throughput of the emotion service at different micro-batch sizes.
+#
+#   python benchmarks/bench_emotion_service.py
+#
+# Runs offline against a tiny stand-in classifier with the same call shape as
+# the transformers pipeline: a fixed cost per forward pass (standing in for
+# kernel launch and framework overhead) plus a small cost per input.
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_service import EmotionService, LABEL_TO_MOOD
+
+CLIENTS = 64
+REQUESTS = 2048
+PASS_COST = 0.004
+ITEM_COST = 0.0002
+
+
+class TinyModel:
+    labels = list(LABEL_TO_MOOD)
+
+    def __call__(self, texts, batch_size=1):
+        time.sleep(PASS_COST + ITEM_COST * len(texts))
+        outputs = []
+        for text in texts:
+            hot = hash(text) % len(self.labels)
+            outputs.append(
+                [{"label": label, "score": 0.7 if i == hot else 0.05} for i, label in enumerate(self.labels)]
+            )
+        return outputs
+
+
+def bench(max_batch):
+    service = EmotionService(loader=TinyModel, max_batch=max_batch, cache_size=0)
+    service.warmup()
+    per_client = REQUESTS // CLIENTS
+
+    def client(n):
+        for i in range(per_client):
+            service.predict(f"client {n} message {i}")
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(CLIENTS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"batch {max_batch:>2}: {REQUESTS / elapsed:8.0f} req/s"
+        f"  ({service.batches} forward passes, {service.items / max(service.batches, 1):.1f} per pass)"
+    )
+
+
+def main():
+    for max_batch in (1, 8, 32):
+        bench(max_batch)
+
+
+if __name__ == "__main__":
+    main()
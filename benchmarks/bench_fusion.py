@@ -0,0 +1,51 @@
+# Replays a synthetic stream of face/voice/text readings through MoodFusion.
+#
+#   python benchmarks/bench_fusion.py [events] [sessions]
+#
+# Events arrive a few seconds apart per session, with face readings carrying
+# full score vectors and voice/text readings carrying a single label, the same
+# shapes the routes feed in.
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import MOODS
+from fusion import MODALITIES, MoodFusion
+
+
+def make_events(count, sessions):
+    rng = random.Random(42)
+    now = 0.0
+    events = []
+    for _ in range(count):
+        now += rng.expovariate(sessions / 5.0)
+        modality = rng.choice(MODALITIES)
+        if modality == "face":
+            weights = [rng.random() for _ in MOODS]
+            scores = {mood: w / sum(weights) for mood, w in zip(MOODS, weights)}
+        else:
+            scores = rng.choice(MOODS)
+        events.append((f"user{rng.randrange(sessions)}", modality, scores, now))
+    return events
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    events = make_events(count, sessions)
+
+    fusion = MoodFusion(half_life=60.0)
+    start = time.perf_counter()
+    for session_id, modality, scores, now in events:
+        fusion.update(session_id, modality, scores, now=now)
+    elapsed = time.perf_counter() - start
+
+    print(f"{count} updates over {len(fusion)} sessions in {elapsed:.2f} s")
+    print(f"{count / elapsed:,.0f} updates/s, {elapsed / count * 1e6:.1f} us per update")
+
+
+if __name__ == "__main__":
+    main()
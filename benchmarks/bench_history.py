@@ -0,0 +1,57 @@
+# Ingest and query speed of the listening-history log.
+#
+#   python benchmarks/bench_history.py [events] [users]
+#
+# Defaults to 10M events spread over 1000 users, ingested in batches of 1000
+# (about 160 MB of records in a temp directory).
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import MOODS
+from history import HistoryStore
+
+BATCH = 1000
+SONGS = [f"/songs/track{i}.wav" for i in range(500)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(1)
+    batch = [
+        {"url": rng.choice(SONGS), "mood": rng.choice(MOODS), "event": "play", "ts": 1.7e9 + i}
+        for i in range(BATCH)
+    ]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = HistoryStore(root)
+        start = time.perf_counter()
+        for i in range(count // BATCH):
+            store.ingest(f"user{i % users}", batch)
+        elapsed = time.perf_counter() - start
+        print(f"ingested {count:,} events in {elapsed:.1f} s ({count / elapsed:,.0f} events/s)")
+
+        names = [f"user{rng.randrange(users)}" for _ in range(1000)]
+        start = time.perf_counter()
+        for name in names:
+            store.last(name, 50)
+        print(f"last 50:              {(time.perf_counter() - start) / len(names) * 1e6:8.1f} us")
+
+        start = time.perf_counter()
+        for name in names[:100]:
+            store.mood_counts(name)
+        print(f"mood counts (cold):   {(time.perf_counter() - start) / 100 * 1e3:8.2f} ms")
+
+        start = time.perf_counter()
+        for name in names[:100]:
+            store.mood_counts(name)
+        print(f"mood counts (warm):   {(time.perf_counter() - start) / 100 * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Lookup latency of the library index over a large synthetic library.
+#
+#   python benchmarks/bench_library_index.py [tracks]
+#
+# Creates empty .wav files spread over the mood folders in a temp directory.
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_index import LibraryIndex
+
+FOLDERS = ["angry", "disgust", "fear", "happy", "neutral", "sad", "surprise"]
+WORDS = ["love", "night", "city", "dream", "fire", "summer", "blue", "heart", "road", "light"]
+LOOKUPS = 10000
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as root:
+        names = []
+        for folder in FOLDERS:
+            os.mkdir(os.path.join(root, folder))
+        for i in range(count):
+            name = f"{random.choice(WORDS)} {random.choice(WORDS)} {i}.wav"
+            open(os.path.join(root, FOLDERS[i % len(FOLDERS)], name), "w").close()
+            names.append(name)
+
+        start = time.perf_counter()
+        index = LibraryIndex(root, FOLDERS)
+        print(f"indexed {len(index)} tracks in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        index.refresh()
+        print(f"refresh with no changes: {(time.perf_counter() - start) * 1e6:.0f} us")
+
+        exact = [random.choice(names).upper() for _ in range(LOOKUPS)]
+        print(f"exact lookup:     {timed(index.find_exact, exact):8.2f} us")
+
+        substrings = [random.choice(names)[-12:-4] for _ in range(LOOKUPS)]
+        print(f"substring lookup: {timed(index.find_substring, substrings):8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
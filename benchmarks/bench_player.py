@@ -0,0 +1,79 @@
+# Gap between songs and skip latency: the old stop / sleep / load sequence
+# against the prefetching player.
+#
+#   python benchmarks/bench_player.py [--decode-ms 200] [--tracks 10]
+#
+# Runs against the null sink, so no sound card is needed. `--decode-ms`
+# stands in for the time it takes to decode a song.
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player import NullSink, Player
+
+
+# What skip_to_next used to do: stop, wait half a second, then load and
+# decode the next song before it can start
+def old_skip(sink, path):
+    sink.stop()
+    time.sleep(0.5)
+    sink.play(sink.decode(path))
+
+
+def wait_for_queue(player, sink, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        player.poll()
+        if sink.events and sink.events[-1][0] == "queue":
+            return
+        time.sleep(0.005)
+    raise RuntimeError("next track was never queued")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decode-ms", type=float, default=200.0)
+    parser.add_argument("--tracks", type=int, default=10)
+    args = parser.parse_args()
+    tracks = [f"/music/happy/song-{i}.wav" for i in range(args.tracks)]
+
+    sink = NullSink(decode_seconds=args.decode_ms / 1000)
+    old = []
+    for path in tracks[:3]:
+        start = time.perf_counter()
+        old_skip(sink, path)
+        old.append(time.perf_counter() - start)
+
+    # Natural track ends: the next track is already queued, so it takes over
+    # with no gap at all
+    sink = NullSink(decode_seconds=args.decode_ms / 1000)
+    player = Player(sink, poll_interval=3600)
+    player.play(tracks)
+    for i in range(1, args.tracks + 1):
+        wait_for_queue(player, sink)
+        sink.finish()
+        player.poll()
+        assert player.index == i % args.tracks, (player.index, i)
+    # One play() at the start; every change-over after that came off the queue
+    assert [kind for kind, _ in sink.events].count("play") == 1
+
+    # Skips once the next track is prefetched
+    skips = []
+    for _ in range(args.tracks):
+        wait_for_queue(player, sink)
+        start = time.perf_counter()
+        player.next()
+        skips.append(time.perf_counter() - start)
+    player.stop()
+
+    print(f"old skip (stop + sleep + decode): {statistics.median(old) * 1000:8.1f} ms")
+    print(f"player, track ends on its own: {args.tracks} change-overs, all from the queue (no gap)")
+    print(f"player, skip to prefetched track: {statistics.median(skips) * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
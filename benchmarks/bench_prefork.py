@@ -0,0 +1,131 @@
+# Load test: werkzeug's threaded server against the preforked worker server.
+#
+#   python benchmarks/bench_prefork.py [--clients 16] [--seconds 5] [--workers 4]
+#   python benchmarks/bench_prefork.py --app app:app --path /login
+#
+# Each server runs in its own process and is hit by `--clients` client
+# processes, each keeping one HTTP/1.1 connection open and sending requests
+# back to back. By default the target is a small CPU-bound WSGI app (JSON
+# encoding a song list), which is where one GIL-bound process falls behind.
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = """
+import json, logging, sys
+sys.path.append({root!r})
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+if {app!r}:
+    module, _, attr = {app!r}.partition(":")
+    app = getattr(__import__(module), attr or "app")
+else:
+    songs = [{{"title": f"Song {{i}}", "url": f"/songs/song-{{i}}.wav"}} for i in range(200)]
+
+    def app(environ, start_response):
+        for _ in range(10):
+            body = json.dumps({{"mood": "happy", "songs": songs}}).encode()
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+        return [body]
+
+if {mode!r} == "prefork":
+    from prefork import PreforkServer
+    PreforkServer(app, port={port}, workers={workers}, max_requests={max_requests}).run()
+else:
+    from werkzeug.serving import make_server
+    make_server("127.0.0.1", {port}, app, threaded=True).serve_forever()
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} didn't come up")
+
+
+# One client: a single keep-alive connection, requests back to back until
+# `seconds` run out. Returns the latency of every successful request.
+def client(port, path, seconds):
+    latencies = []
+    errors = 0
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    stop_at = time.perf_counter() + seconds
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.close()
+    return latencies, errors
+
+
+def bench(mode, args):
+    port = free_port()
+    code = SERVER.format(
+        root=ROOT, app=args.app, mode=mode, port=port, workers=args.workers, max_requests=args.max_requests
+    )
+    server = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        with ProcessPoolExecutor(max_workers=args.clients) as pool:
+            futures = [pool.submit(client, port, args.path, args.seconds) for _ in range(args.clients)]
+            results = [future.result() for future in futures]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(errors for _, errors in results)
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    print(
+        f"{mode:>8}: {len(latencies) / args.seconds:8.0f} req/s"
+        f"  p50 {statistics.median(latencies) * 1000 if latencies else 0:6.2f} ms"
+        f"  p99 {p99 * 1000:6.2f} ms  errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="", help="module:attr to serve instead of the built-in CPU-bound app")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    for mode in ("threaded", "prefork"):
+        bench(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Re-ranking latency as a user's history grows.
+#
+#   python benchmarks/bench_ranking.py
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import Reranker
+
+PLAYLIST = [{"title": f"Song {i}", "url": f"/songs/s{i}.wav"} for i in range(11)]
+RANKS = 10000
+
+
+def main():
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as root:
+        reranker = Reranker(os.path.join(root, "ranking.json"))
+        recorded = 0
+        for size in (100, 10000, 1000000):
+            for _ in range(size - recorded):
+                url = f"/songs/s{rng.randrange(5000)}.wav"
+                reranker.record("alice", url, rng.choice(("play", "play", "skip")), 1.7e9 + recorded)
+                recorded += 1
+
+            start = time.perf_counter()
+            for _ in range(RANKS):
+                reranker.rank("alice", PLAYLIST, now=1.7e9 + recorded)
+            per_rank = (time.perf_counter() - start) / RANKS
+            print(f"{size:>9} events in history: {per_rank * 1e6:6.1f} us per ranking")
+
+        start = time.perf_counter()
+        reranker.snapshot()
+        print(f"snapshot: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
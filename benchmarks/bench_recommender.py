@@ -0,0 +1,45 @@
+# Top-k query latency of the recommender over a synthetic feature matrix.
+#
+#   python benchmarks/bench_recommender.py [tracks]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommender import MOOD_PROFILES, Recommender
+
+QUERIES = 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    features = np.column_stack([
+        rng.normal(120, 25, count),   # tempo
+        rng.gamma(2.0, 0.05, count),  # energy
+        rng.normal(1500, 400, count), # centroid
+    ]).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        recommender = Recommender(index_dir)
+        start = time.perf_counter()
+        for i, row in enumerate(features):
+            recommender.add(f"track{i}.wav", row)
+        recommender.flush()
+        print(f"added {count} tracks in {time.perf_counter() - start:.2f} s")
+
+        moods = list(MOOD_PROFILES)
+        recommender.top_k("happy")  # standardize once
+        start = time.perf_counter()
+        for i in range(QUERIES):
+            recommender.top_k(moods[i % len(moods)], k=10)
+        elapsed = time.perf_counter() - start
+        print(f"top-10 query: {elapsed / QUERIES * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# URL matching over a large route map: werkzeug's state machine compiling each
+# dynamic transition's regex on every request against the compiled matcher
+# in matcher.py.
+#
+#   python benchmarks/bench_routing.py [--rules 5000] [--lookups 1000] [--runs 1]
+#
+# matcher.py is one of werkzeug's routing modules, so it's loaded into the
+# installed werkzeug.routing package and swapped in for that package's own
+# matcher. Both maps get the same rules and the same lookups, and have to
+# return the same results.
+import argparse
+import importlib.util
+import os
+import random
+import statistics
+import sys
+import time
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOODS = ["angry", "disgust", "fear", "happy", "neutral", "sad", "surprise"]
+
+
+def load_matcher():
+    spec = importlib.util.spec_from_file_location(
+        "werkzeug.routing._vibesync_matcher", os.path.join(ROOT, "matcher.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module.StateMachineMatcher
+
+
+# A mix of static pages, one-segment and multi-segment dynamic routes, and
+# dynamic states with many sibling transitions
+def make_rules(count):
+    rules = [Rule("/", endpoint="index"), Rule("/text", endpoint="text", methods=["POST"])]
+    for i in range(count - len(rules)):
+        mood = MOODS[i % len(MOODS)]
+        kind = i % 5
+        if kind == 0:
+            rules.append(Rule(f"/pages/{mood}/{i}", endpoint=f"page{i}"))
+        elif kind == 1:
+            rules.append(Rule(f"/api/v{i % 40}/{mood}/<int:song_id>/r{i}", endpoint=f"api{i}"))
+        elif kind == 2:
+            rules.append(Rule(f"/songs/<int:song_id>-take{i}", endpoint=f"take{i}"))
+        elif kind == 3:
+            rules.append(Rule(f"/users/<name>/playlists/p{i}", endpoint=f"playlist{i}"))
+        else:
+            rules.append(Rule(f"/files/{mood}/<path:path>/v{i}", endpoint=f"file{i}"))
+    return rules
+
+
+def make_paths(rules, count):
+    samples = {"<int:song_id>": "42", "<name>": "bhavya", "<path:path>": "a/b/c.wav"}
+    paths = []
+    for _ in range(count):
+        path = random.choice(rules).rule
+        for placeholder, value in samples.items():
+            path = path.replace(placeholder, value)
+        paths.append(path if random.random() > 0.1 else f"{path}/missing")
+    return paths
+
+
+def run(adapter, paths):
+    results = []
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            results.append(adapter.match(path))
+        except HTTPException as e:
+            results.append(e.code)
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(0)
+
+    rules = make_rules(args.rules)
+    paths = make_paths(rules, args.lookups)
+
+    old_map = Map([rule.empty() for rule in rules])
+    new_map = Map([rule.empty() for rule in rules])
+    matcher = load_matcher()(new_map.merge_slashes)
+    for rule in new_map.iter_rules():
+        matcher.add(rule)
+    new_map._matcher = matcher
+    new_map._remap = True
+
+    start = time.perf_counter()
+    new_map.update()
+    compile_time = time.perf_counter() - start
+
+    old_adapter = old_map.bind("localhost")
+    new_adapter = new_map.bind("localhost")
+    old_times, new_times = [], []
+    for _ in range(args.runs):
+        old_time, old_results = run(old_adapter, paths)
+        new_time, new_results = run(new_adapter, paths)
+        assert old_results == new_results
+        old_times.append(old_time)
+        new_times.append(new_time)
+
+    old_us = statistics.median(old_times) / len(paths) * 1e6
+    new_us = statistics.median(new_times) / len(paths) * 1e6
+    print(f"{args.rules} rules, {len(paths)} lookups, compiled in {compile_time * 1000:.0f} ms")
+    print(f"compile per request: {old_us:8.1f} us/match")
+    print(f"compiled matcher:    {new_us:8.1f} us/match   ({old_us / new_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
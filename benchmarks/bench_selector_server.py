@@ -0,0 +1,213 @@
+# Many idle keep-alive connections plus a burst of active clients: the
+# thread-per-connection server against the selector server.
+#
+#   python benchmarks/bench_selector_server.py [--idle 2000] [--active 200] [--requests 20]
+#
+# Every idle client holds a connection open without a request on it, the way
+# the audio players do between songs. Then the active clients each make
+# `--requests` requests, on one keep-alive connection if the server allows
+# it and on a new connection each time if it doesn't (the threaded server
+# closes the connection after every response). The server runs in its own process;
+# its /threads page reports how many threads it is running. serving.py is
+# werkzeug's dev server, so it's loaded into the installed werkzeug package.
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import selectors
+import socket
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_serving():
+    spec = importlib.util.spec_from_file_location(
+        "werkzeug._vibesync_serving", os.path.join(ROOT, "serving.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def app(environ, start_response):
+    if environ["PATH_INFO"] == "/threads":
+        body = str(threading.active_count()).encode()
+    else:
+        body = b"ok"
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+    return [body]
+
+
+def serve(kind, workers, ports):
+    serving = load_serving()
+
+    class QuietHandler(serving.WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    if kind == "selector":
+        server = serving.make_server(
+            "127.0.0.1", 0, app, request_handler=QuietHandler, server="selector", workers=workers
+        )
+    else:
+        server = serving.make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+        # Let the listen queue take a burst of connections like the selector
+        # server's does
+        server.socket.listen(1024)
+    ports.put(server.port)
+    server.serve_forever()
+
+
+def raise_fd_limit(needed):
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def request(path):
+    return f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+
+
+# Returns (body, keep_alive, leftover) once a whole response has been received
+def parse_response(data):
+    head, sep, rest = data.partition(b"\r\n\r\n")
+    if not sep:
+        return None, False, data
+    length = 0
+    keep_alive = True
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection" and value.strip().lower() == b"close":
+            keep_alive = False
+    if len(rest) < length:
+        return None, False, data
+    return rest[:length], keep_alive, rest[length:]
+
+
+def get(sock, path):
+    sock.sendall(request(path))
+    data = b""
+    while True:
+        body, _, _ = parse_response(data)
+        if body is not None:
+            return body
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError(f"connection closed during {path}")
+        data += chunk
+
+
+def server_threads(port):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        return int(get(sock, "/threads"))
+
+
+def open_idle(port, count):
+    return [socket.create_connection(("127.0.0.1", port)) for _ in range(count)]
+
+
+def connect(selector, port, state):
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setblocking(False)
+    state["sock"] = sock
+    selector.register(sock, selectors.EVENT_READ, state)
+
+
+# Every active client sends its requests one after another on one connection.
+# A single selector loop drives all of them, so the client side doesn't need
+# a thread per connection either.
+def run_active(port, clients, requests):
+    selector = selectors.DefaultSelector()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(clients):
+        state = {"left": requests, "data": b"", "sent": time.perf_counter()}
+        connect(selector, port, state)
+        state["sock"].send(request("/"))
+
+    while selector.get_map():
+        for key, _ in selector.select():
+            state = key.data
+            chunk = state["sock"].recv(65536)
+            if not chunk:
+                raise ConnectionError("an active client was disconnected")
+            state["data"] += chunk
+            body, keep_alive, state["data"] = parse_response(state["data"])
+            if body is None:
+                continue
+            latencies.append(time.perf_counter() - state["sent"])
+            state["left"] -= 1
+            if not state["left"] or not keep_alive:
+                selector.unregister(state["sock"])
+                state["sock"].close()
+            if state["left"]:
+                state["sent"] = time.perf_counter()
+                if not keep_alive:
+                    connect(selector, port, state)
+                state["sock"].send(request("/"))
+    return time.perf_counter() - start, latencies
+
+
+def bench(kind, args):
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(kind, args.workers, ports), daemon=True)
+    process.start()
+    port = ports.get(timeout=30)
+    try:
+        start = time.perf_counter()
+        idle = open_idle(port, args.idle)
+        connect_time = time.perf_counter() - start
+        idle_threads = server_threads(port)
+
+        seconds, latencies = run_active(port, args.active, args.requests)
+        busy_threads = server_threads(port)
+
+        # The idle connections are still usable after the burst
+        for sock in idle[:: max(1, len(idle) // 20)]:
+            assert get(sock, "/") == b"ok"
+        for sock in idle:
+            sock.close()
+    finally:
+        process.terminate()
+        process.join()
+
+    latencies.sort()
+    total = args.active * args.requests
+    print(
+        f"{kind:>9}: {args.idle} idle connected in {connect_time:5.2f} s, "
+        f"threads idle {idle_threads:5d} / after burst {busy_threads:5d}, "
+        f"{total / seconds:7.0f} req/s, "
+        f"p50 {statistics.median(latencies) * 1000:6.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--idle", type=int, default=2000)
+    parser.add_argument("--active", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    # Client and server sockets for every connection, plus some headroom
+    raise_fd_limit(2 * (args.idle + args.active) + 256)
+
+    print(f"{args.idle} idle clients, {args.active} active clients x {args.requests} requests")
+    for kind in ("threaded", "selector"):
+        bench(kind, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Serving large WAV files: werkzeug's stock dev server, which copies
+# wrap_file() bodies through the socket in buffer_size chunks, against
+# serving.py, which hands them to sendfile().
+#
+#   python benchmarks/bench_sendfile.py [--minutes 10] [--downloads 5]
+#
+# Each server runs in its own process and gets the same whole-file and
+# byte-range (seek) requests for a generated WAV file. Its /cpu page reports
+# the CPU time the server process has used, so the copying shows up even
+# when the network isn't the limit. serving.py is werkzeug's dev server, so
+# it's loaded into the installed werkzeug package.
+import argparse
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+import wave
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BLOCK_SIZE = 64 * 1024
+
+
+def load_serving():
+    spec = importlib.util.spec_from_file_location(
+        "werkzeug._vibesync_serving", os.path.join(ROOT, "serving.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_wav(path, minutes):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        # One second of noise, repeated
+        second = os.urandom(44100 * 4)
+        for _ in range(int(minutes * 60)):
+            f.writeframes(second)
+
+
+def make_app(path):
+    from werkzeug.wsgi import _RangeWrapper, wrap_file
+
+    size = os.path.getsize(path)
+
+    def app(environ, start_response):
+        if environ["PATH_INFO"] == "/cpu":
+            body = str(time.process_time()).encode()
+            start_response("200 OK", [("Content-Length", str(len(body)))])
+            return [body]
+
+        f = open(path, "rb")
+        body = wrap_file(environ, f, BLOCK_SIZE)
+        if environ["PATH_INFO"] == "/range":
+            # The middle half, as when the player seeks
+            start, length = size // 4, size // 2
+            start_response("206 Partial Content", [("Content-Length", str(length))])
+            return _RangeWrapper(body, start, length)
+        start_response("200 OK", [("Content-Length", str(size))])
+        return body
+
+    return app
+
+
+def serve(kind, path, ports):
+    if kind == "sendfile":
+        serving = load_serving()
+    else:
+        from werkzeug import serving
+
+    class QuietHandler(serving.WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = serving.make_server("127.0.0.1", 0, make_app(path), request_handler=QuietHandler)
+    ports.put(server.port)
+    server.serve_forever()
+
+
+# Returns the body's length and, if asked for, its SHA-256
+def get(port, path, digest=False):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        data = b""
+        while b"\r\n\r\n" not in data:
+            data += sock.recv(65536)
+        head, _, body = data.partition(b"\r\n\r\n")
+        length = 0
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+
+        sha = hashlib.sha256(body) if digest else None
+        received = len(body)
+        buffer = bytearray(1024 * 1024)
+        view = memoryview(buffer)
+        while received < length:
+            n = sock.recv_into(buffer)
+            if not n:
+                raise ConnectionError(f"connection closed after {received} of {length} bytes")
+            if sha is not None:
+                sha.update(view[:n])
+            received += n
+        return received, sha.hexdigest() if sha is not None else None
+
+
+def get_text(port, path):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        return data.partition(b"\r\n\r\n")[2].decode()
+
+
+def bench(kind, path, downloads):
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(kind, path, ports), daemon=True)
+    process.start()
+    port = ports.get(timeout=30)
+    results = {}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        size = len(data)
+        # Both paths have to send the same bytes
+        assert get(port, "/", digest=True)[1] == hashlib.sha256(data).hexdigest(), kind
+        middle = data[size // 4 : size // 4 + size // 2]
+        assert get(port, "/range", digest=True)[1] == hashlib.sha256(middle).hexdigest(), kind
+        del data, middle
+
+        for name in ("/", "/range"):
+            cpu_start = float(get_text(port, "/cpu"))
+            start = time.perf_counter()
+            sent = 0
+            for _ in range(downloads):
+                sent += get(port, name)[0]
+            seconds = time.perf_counter() - start
+            cpu = float(get_text(port, "/cpu")) - cpu_start
+            results[name] = (sent / seconds / 1e6, cpu / downloads * 1000)
+    finally:
+        process.terminate()
+        process.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--downloads", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "song.wav")
+        make_wav(path, args.minutes)
+        size = os.path.getsize(path)
+        print(f"{size / 1e6:.0f} MB WAV, {args.downloads} downloads per request type")
+        for kind in ("stock", "sendfile"):
+            results = bench(kind, path, args.downloads)
+            print(
+                f"{kind:>9}: whole file {results['/'][0]:7.0f} MB/s ({results['/'][1]:6.1f} ms server CPU each), "
+                f"range {results['/range'][0]:7.0f} MB/s ({results['/range'][1]:6.1f} ms server CPU each)"
+            )
+
+
+if __name__ == "__main__":
+    main()
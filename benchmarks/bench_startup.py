@@ -0,0 +1,95 @@
+# Time from a cold interpreter to the login page being served, and proof that
+# no ML library was imported along the way.
+#
+#   python benchmarks/bench_startup.py [--runs 5] [--budget 1.0]
+#
+# Each run starts a fresh interpreter in an empty working directory (holding
+# only a copy of the catalog, so the app's data files don't land in the repo),
+# imports the app, and requests /login through Flask's test client.
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Anything on this list showing up before the first page is a regression
+HEAVY_MODULES = (
+    "cv2",
+    "deepface",
+    "keyboard",
+    "nltk",
+    "pygame",
+    "pyttsx3",
+    "scipy",
+    "speech_recognition",
+    "tensorflow",
+    "torch",
+    "transformers",
+)
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.append({root!r})
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get("/login")
+served = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "first_page": served - start,
+    "status": response.status_code,
+    "heavy": sorted(name for name in {heavy!r} if name in sys.modules),
+}}))
+"""
+
+
+def run_once(workdir):
+    code = CHILD.format(root=ROOT, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True, check=True
+    ).stdout
+    wall = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    result["wall"] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds allowed to the first page")
+    args = parser.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        workdir = tempfile.mkdtemp()
+        try:
+            shutil.copy(os.path.join(ROOT, "mood_songs.json"), workdir)
+            results.append(run_once(workdir))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for key, label in (("import", "import app"), ("first_page", "login served"), ("wall", "process wall")):
+        print(f"{label:>14}: {statistics.median(r[key] for r in results) * 1000:7.1f} ms (median of {args.runs})")
+
+    heavy = sorted({name for r in results for name in r["heavy"]})
+    statuses = sorted({r["status"] for r in results})
+    print(f"{'status':>14}: {statuses}")
+    print(f"{'ML imports':>14}: {heavy or 'none'}")
+
+    assert statuses == [200], f"login page returned {statuses}"
+    assert not heavy, f"imported before the first page: {', '.join(heavy)}"
+    slowest = max(r["first_page"] for r in results)
+    assert slowest < args.budget, f"first page took {slowest:.2f}s (budget {args.budget:.2f}s)"
+
+
+if __name__ == "__main__":
+    main()
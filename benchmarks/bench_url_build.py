@@ -0,0 +1,107 @@
+# URL building as a page render does it: url_for() on argument-free
+# endpoints, and one link per song in the song list.
+#
+#   python benchmarks/bench_url_build.py [--builds 10000] [--songs 50]
+#
+# map.py is werkzeug's routing map, so it's loaded into the installed
+# werkzeug.routing package (together with the modules it depends on from
+# this repo) and compared with the stock MapAdapter.build. Every variant has
+# to build the same URLs.
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+from werkzeug.routing import Map, Rule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["converters", "rules", "matcher", "map"]
+
+
+def load_map():
+    module = None
+    for name in MODULES:
+        spec = importlib.util.spec_from_file_location(
+            f"werkzeug.routing._vibesync_{name}", os.path.join(ROOT, f"{name}.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        # map.py imports its siblings relatively, point those at this repo's
+        # copies
+        sys.modules[f"werkzeug.routing.{name}"] = sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return module.Map, module.Rule
+
+
+def make_rules(rule_class):
+    return [
+        rule_class("/", endpoint="index"),
+        rule_class("/login", endpoint="login"),
+        rule_class("/logout", endpoint="logout"),
+        rule_class("/history", endpoint="history"),
+        rule_class("/songs/<mood>/<int:song_id>", endpoint="song"),
+        rule_class("/static/<path:filename>", endpoint="static"),
+    ]
+
+
+# One page render: the navigation links, then a link per song
+def render(adapter, songs, build_many):
+    urls = [adapter.build(endpoint) for endpoint in ("index", "login", "logout", "history")]
+    if build_many:
+        urls += adapter.build_many("song", songs)
+    else:
+        urls += [adapter.build("song", values) for values in songs]
+    return urls
+
+
+def bench(adapter, songs, renders, build_many):
+    start = time.perf_counter()
+    for _ in range(renders):
+        urls = render(adapter, songs, build_many)
+    return time.perf_counter() - start, urls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--builds", type=int, default=10000)
+    parser.add_argument("--songs", type=int, default=50)
+    args = parser.parse_args()
+
+    songs = [{"mood": "happy", "song_id": i} for i in range(args.songs)]
+    per_render = 4 + len(songs)
+    renders = max(1, args.builds // per_render)
+
+    stock = Map(make_rules(Rule)).bind("localhost")
+    # The stock modules are imported above, so load_map() can only replace
+    # them in sys.modules once they're no longer needed
+    map_class, rule_class = load_map()
+    variants = [
+        ("stock build", stock, False),
+        ("build", map_class(make_rules(rule_class)).bind("localhost"), False),
+        ("build_many", map_class(make_rules(rule_class)).bind("localhost"), True),
+        (
+            "build + cache",
+            map_class(make_rules(rule_class), build_cache_size=256).bind("localhost"),
+            False,
+        ),
+        (
+            "build_many + cache",
+            map_class(make_rules(rule_class), build_cache_size=256).bind("localhost"),
+            True,
+        ),
+    ]
+
+    print(f"{renders} renders x {per_render} URLs = {renders * per_render} builds")
+    expected = None
+    baseline = None
+    for name, adapter, build_many in variants:
+        seconds, urls = bench(adapter, songs, renders, build_many)
+        expected = expected or urls
+        assert urls == expected, name
+        baseline = baseline or seconds
+        per_build = seconds / (renders * per_render) * 1e6
+        print(f"{name:>20}: {seconds * 1000:8.1f} ms  {per_build:6.2f} us/build  ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
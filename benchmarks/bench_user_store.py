@@ -0,0 +1,59 @@
+# Login lookup latency of the SQLite user store as the user count grows.
+#
+#   python benchmarks/bench_user_store.py [max_users]
+#
+# The read cache is disabled so every lookup hits the index, which is the
+# worst case for a login against a cold user.
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_store import SQLiteUserStore
+
+FAKE_HASH = "$2b$12$" + "x" * 53
+LOOKUPS = 10000
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def bench(n, workdir):
+    store = SQLiteUserStore(os.path.join(workdir, f"users_{n}.db"), cache_size=0)
+    batch = []
+    for i in range(n):
+        batch.append((f"user{i}", f"user{i}@example.com", FAKE_HASH))
+        if len(batch) == 50000:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+
+    names = [f"user{random.randrange(n)}" for _ in range(LOOKUPS)]
+    samples = []
+    for name in names:
+        start = time.perf_counter()
+        store.get(name)
+        samples.append(time.perf_counter() - start)
+    store.close()
+
+    print(
+        f"{n:>9} users  p50 {percentile(samples, 50) * 1e6:7.1f} us"
+        f"  p99 {percentile(samples, 99) * 1e6:7.1f} us"
+    )
+
+
+def main():
+    max_users = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sizes = [n for n in (10, 1000, 100000, 1000000) if n <= max_users]
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            bench(n, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+# Moods the app knows about, in the same order as EMOTION_FOLDERS
+MOODS = ("angry", "disgust", "fear", "happy", "neutral", "sad", "surprise")
+
+
+# An immutable snapshot of the mood -> songs mapping. Every song is a
+# read-only mapping of interned strings, and the JSON for each mood's list is
+# encoded once up front so responses can reuse the bytes as-is.
+class Catalog:
+    def __init__(self, mapping, mtime=None):
+        self.mtime = mtime
+        songs = {}
+        encoded = {}
+        for mood, entries in mapping.items():
+            mood = sys.intern(mood.lower())
+            songs[mood] = tuple(
+                MappingProxyType({"title": sys.intern(song["title"]), "url": sys.intern(song["url"])})
+                for song in entries
+            )
+            encoded[mood] = json.dumps(
+                [{"title": song["title"], "url": song["url"]} for song in songs[mood]],
+                separators=(",", ":"),
+            ).encode("utf-8")
+        self._songs = MappingProxyType(songs)
+        self._encoded = MappingProxyType(encoded)
+
+    @classmethod
+    def from_file(cls, path):
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), mtime)
+
+    def moods(self):
+        return tuple(self._songs)
+
+    def songs(self, mood):
+        return self._songs.get((mood or "").lower(), ())
+
+    def encoded(self, mood):
+        return self._encoded.get((mood or "").lower(), b"[]")
+
+
+# Holds the current catalog and swaps in a freshly built one when the data
+# file changes. Readers just grab `current`; the swap is a single reference
+# assignment, so a request always sees one whole catalog or the other.
+class CatalogLoader:
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._catalog = Catalog.from_file(path)
+        self._next_check = time.monotonic() + check_interval
+
+    @property
+    def current(self):
+        if self.check_interval is not None and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._catalog
+
+    def _maybe_reload(self):
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already checking
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                return
+            if mtime != self._catalog.mtime:
+                self._reload()
+        finally:
+            self._lock.release()
+
+    def _reload(self):
+        try:
+            catalog = Catalog.from_file(self.path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Keep serving the old catalog if the new file is half written or invalid
+            print(f"⚠️ Could not reload {self.path}: {e}")
+            return
+        self._catalog = catalog
+
+    def reload(self):
+        with self._lock:
+            self._reload()
+        return self._catalog
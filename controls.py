@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+
+
+# One place for playback commands ("next", "play", "quit", ...) no matter
+# where they come from: hotkeys, typed input or voice. Sources post()
+# commands onto a queue and a single thread runs the handlers in order, so
+# handlers never race each other and the thread sleeps in queue.get() while
+# nothing is happening. The same command from the same source is ignored if
+# it arrives within `debounce` seconds of the last one that was accepted.
+class CommandDispatcher:
+    def __init__(self, debounce=0.3, clock=time.monotonic):
+        self.debounce = debounce
+        self.clock = clock
+        self._handlers = {}
+        self._queue = queue.Queue()
+        self._last = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def on(self, command, handler):
+        self._handlers[command] = handler
+
+    # Returns False if the command was dropped by the debounce
+    def post(self, command, *args, source=None):
+        now = self.clock()
+        with self._lock:
+            last = self._last.get((source, command))
+            if last is not None and now - last < self.debounce:
+                return False
+            self._last[(source, command)] = now
+        self._queue.put((command, args))
+        return True
+
+    # Run handlers until stop() is called
+    def run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            command, args = item
+            handler = self._handlers.get(command)
+            if handler is None:
+                print(f"⚠️ Unknown command: {command}")
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"⚠️ Error running {command}: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._queue.put(None)
+
+
+# Post `commands[key]` when a key goes down. Holding a key down posts once;
+# it has to be released before it counts again. Returns False (and the CLI
+# keeps working from typed commands) when keyboard hooks aren't available,
+# e.g. without root on Linux.
+def bind_hotkeys(dispatcher, commands):
+    try:
+        import keyboard
+    except ImportError as e:
+        print(f"⚠️ Hotkeys unavailable: {e}")
+        return False
+
+    held = set()
+
+    def pressed(key, command):
+        if key not in held:
+            held.add(key)
+            dispatcher.post(command, source="hotkey")
+
+    for key, command in commands.items():
+        keyboard.on_press_key(key, lambda event, key=key, command=command: pressed(key, command))
+        keyboard.on_release_key(key, lambda event, key=key: held.discard(key))
+    return True
@@ -18,6 +18,17 @@ class ValidationError(ValueError):
 class BaseConverter:
     """Base class for all converters.
 
+    ``match_cacheable`` tells the :class:`Map` match cache whether the
+    values returned by :meth:`to_python` may be stored and handed out
+    again for the same URL. It defaults to ``False`` for converters that
+    override :meth:`to_python`, as they may look something up or have
+    other side effects.
+
+    ``build_cacheable`` does the same for the :class:`Map` build cache
+    and the URLs built with :meth:`to_url`. It defaults to ``False`` for
+    converters that override :meth:`to_url`, as the URL may depend on
+    more than the value.
+
     .. versionchanged:: 2.3
         ``part_isolating`` defaults to ``False`` if ``regex`` contains a ``/``.
     """
@@ -25,6 +36,8 @@ class BaseConverter:
     regex = "[^/]+"
     weight = 100
     part_isolating = True
+    match_cacheable = True
+    build_cacheable = True
 
     def __init_subclass__(cls, **kwargs: t.Any) -> None:
         super().__init_subclass__(**kwargs)
@@ -34,6 +47,15 @@ class BaseConverter:
         if "regex" in cls.__dict__ and "part_isolating" not in cls.__dict__:
             cls.part_isolating = "/" not in cls.regex
 
+        # A custom to_python may have side effects, so its results aren't
+        # cached unless the converter says they can be.
+        if "to_python" in cls.__dict__ and "match_cacheable" not in cls.__dict__:
+            cls.match_cacheable = False
+
+        # The same goes for a custom to_url and the URLs it builds.
+        if "to_url" in cls.__dict__ and "build_cacheable" not in cls.__dict__:
+            cls.build_cacheable = False
+
     def __init__(self, map: Map, *args: t.Any, **kwargs: t.Any) -> None:
         self.map = map
 
@@ -96,6 +118,8 @@ class AnyConverter(BaseConverter):
         Value is validated when building a URL.
     """
 
+    build_cacheable = True
+
     def __init__(self, map: Map, *items: str) -> None:
         super().__init__(map)
         self.items = set(items)
@@ -132,6 +156,8 @@ class NumberConverter(BaseConverter):
 
     weight = 50
     num_convert: t.Callable[[t.Any], t.Any] = int
+    match_cacheable = True
+    build_cacheable = True
 
     def __init__(
         self,
@@ -241,6 +267,8 @@ class UUIDConverter(BaseConverter):
         r"[A-Fa-f0-9]{8}-[A-Fa-f0-9]{4}-"
         r"[A-Fa-f0-9]{4}-[A-Fa-f0-9]{4}-[A-Fa-f0-9]{12}"
     )
+    match_cacheable = True
+    build_cacheable = True
 
     def to_python(self, value: str) -> uuid.UUID:
         return uuid.UUID(value)
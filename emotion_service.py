@@ -0,0 +1,140 @@
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+# Labels produced by the model, mapped onto our mood folders
+LABEL_TO_MOOD = {
+    "anger": "angry",
+    "disgust": "disgust",
+    "fear": "fear",
+    "joy": "happy",
+    "neutral": "neutral",
+    "sadness": "sad",
+    "surprise": "surprise",
+}
+
+
+# Case and whitespace shouldn't change the prediction, so they don't change the cache key either
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+
+# Build the Hugging Face pipeline. Only called the first time a prediction is needed.
+def load_pipeline():
+    from transformers import pipeline
+
+    return pipeline("text-classification", model=MODEL_NAME, top_k=None)
+
+
+# Keeps one emotion classifier loaded for the life of the process. Concurrent
+# requests are queued and a single batcher thread runs them through the model
+# together, so N waiting requests cost one forward pass instead of N.
+class EmotionService:
+    def __init__(self, loader=load_pipeline, max_batch=32, max_wait=0.005, cache_size=4096):
+        self.loader = loader
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._batcher = None
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    model = self.loader()
+                    model(["warming up the emotion model"])  # first call pays for lazy init
+                    self._model = model
+        return self._model
+
+    # Load the model and run one throwaway prediction ahead of the first request
+    def warmup(self):
+        self._get_model()
+
+    def _start_batcher(self):
+        with self._model_lock:
+            if self._batcher is None:
+                self._batcher = threading.Thread(target=self._batch_loop, daemon=True)
+                self._batcher.start()
+
+    # Returns {mood: score} for every mood the model knows. Each call gets its
+    # own dict; the one in the cache is shared with every later hit.
+    def scores(self, text):
+        key = normalize_text(text)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return dict(cached)
+
+        if self._batcher is None:
+            self._start_batcher()
+        future = Future()
+        self._queue.put((key, future))
+        return dict(future.result())
+
+    # The single most likely mood for a piece of text
+    def predict(self, text):
+        scores = self.scores(text)
+        return max(scores, key=scores.get)
+
+    def _remember(self, key, scores):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = scores
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        try:
+            while len(batch) < self.max_batch:
+                batch.append(self._queue.get(timeout=self.max_wait))
+        except queue.Empty:
+            pass
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._collect()
+
+            # Identical texts in the same batch only go through the model once
+            waiting = OrderedDict()
+            for key, future in batch:
+                waiting.setdefault(key, []).append(future)
+            texts = list(waiting)
+
+            try:
+                outputs = self._get_model()(texts, batch_size=len(texts))
+            except Exception as e:
+                for futures in waiting.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(texts)
+            for key, output in zip(texts, outputs):
+                scores = {LABEL_TO_MOOD.get(r["label"], r["label"]): r["score"] for r in output}
+                self._remember(key, scores)
+                for future in waiting[key]:
+                    future.set_result(scores)
+
+
+# Shared by the text and voice models
+emotion_service = EmotionService()
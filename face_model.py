@@ -1,24 +1,30 @@
 import os
-import pygame
 from deepface import DeepFace
 import cv2
-
-# Initialize pygame mixer
-pygame.mixer.init()
+from library_index import LibraryIndex
+from player import Player
+from controls import CommandDispatcher
 
 # Path to your music directory
 music_data_dir = r"C:\VibeSync\music"  # Ensure this path is correct
 
-# Ensure music directory exists
+# Warn about a missing music directory; the library just stays empty until it appears
 if not os.path.exists(music_data_dir):
     print(f"Music directory {music_data_dir} does not exist!")
-    exit()
+
+# One player for the session; the mixer stays up and the next song is
+# decoded in the background while the current one plays
+player = Player(on_track=lambda path: print(f"\n🎵 Now playing: {os.path.basename(path)}"))
+
+# Index of the whole music library, kept up to date in the background
+library = LibraryIndex(music_data_dir)
+library.start_watching()
 
 # Function to list songs from a specific mood folder
 def list_mood_songs(mood):
     mood_dir = os.path.join(music_data_dir, mood)
     if os.path.exists(mood_dir):
-        songs = [os.path.join(mood_dir, f) for f in os.listdir(mood_dir) if f.endswith((".mp3", ".wav"))]
+        songs = [os.path.join(mood_dir, f) for f in library.songs_in(mood)]
         if songs:
             print(f"\n🎵 Songs available for {mood}:")
             for index, song in enumerate(songs):
@@ -33,19 +39,22 @@ def list_mood_songs(mood):
 
 # Function to list all songs in the entire music folder
 def list_all_songs():
-    all_songs = []
-    for root, _, files in os.walk(music_data_dir):
-        for file in files:
-            if file.endswith((".mp3", ".wav")):
-                all_songs.append(os.path.join(root, file))
-
-    return all_songs
+    return library.all_songs()
 
 # Function to play a song
 def play_song(song_path):
-    pygame.mixer.music.load(song_path)
-    pygame.mixer.music.play()
-    print(f"\n🎵 Now playing: {os.path.basename(song_path)}")
+    player.play([song_path], loop=False)
+
+# Move to the next song in `songs` (looping back at the end), or start the
+# list if something else is playing
+def skip_to_next(songs):
+    if player.tracks != songs or not player.next():
+        player.play(songs, (player.index + 1) % len(songs) if player.tracks == songs else 0)
+
+# Playback commands from typed input, run one at a time
+controls = CommandDispatcher(debounce=0.3)
+controls.on("next", skip_to_next)
+controls.on("play", player.play)
 
 # Function to detect mood from webcam
 def get_mood_from_webcam():
@@ -77,6 +86,7 @@ def get_mood_from_webcam():
 
 # Main loop
 def main():
+    controls.start()
     while True:
         detected_mood = get_mood_from_webcam()
         print(f"\nDetected Mood: {detected_mood}")
@@ -95,30 +105,25 @@ def main():
             print("⚠ No songs found in the library. Exiting...")
             break
 
-        current_index = 0  # Start with the first song of detected mood
-
         while True:
             user_input = input("\nEnter index number, song name, 'n' for next song, or 'q' to quit: ").strip().lower()
 
             if user_input == 'q':
                 print("👋 Exiting program...")
-                pygame.mixer.music.stop()
+                player.stop()
                 return
             
             elif user_input == 'n':
-                # Move to the next song in the detected mood list (looping back if at the end)
-                current_index = (current_index + 1) % len(mood_songs)
-                play_song(mood_songs[current_index])
+                controls.post("next", mood_songs, source="input")
 
             elif user_input.isdigit() and 1 <= int(user_input) <= len(mood_songs):
-                current_index = int(user_input) - 1  # Set the selected song index
-                play_song(mood_songs[current_index])
+                controls.post("play", mood_songs, int(user_input) - 1, source="input")
 
             else:
                 # Check if user entered a valid song name from the entire music library
-                matching_songs = [s for s in all_songs if os.path.basename(s).lower() == user_input]
-                if matching_songs:
-                    play_song(matching_songs[0])  # Play the first matched song
+                matching_song = library.find_exact(user_input)
+                if matching_song:
+                    play_song(matching_song)  # Play the first matched song
                 else:
                     print("⚠ Invalid input. Please try again.")
 
@@ -0,0 +1,160 @@
+import os
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+# Default detector backend. Takes a batch of BGR frames and returns one
+# {emotion: score} dict per frame, or None where no face could be read.
+# A batch goes to DeepFace.analyze in one call, which runs the emotion model
+# on all of its faces together; deepface versions that only take one image
+# at a time are detected on the first batch and analyzed frame by frame.
+class DeepFaceDetector:
+    def __init__(self, detector_backend="opencv"):
+        self.detector_backend = detector_backend
+        self.batched = True
+
+    # Import deepface and build its emotion model by analyzing one blank frame
+    def warmup(self):
+        import numpy as np
+
+        self.analyze([np.zeros((48, 48, 3), dtype=np.uint8)])
+
+    def analyze(self, frames):
+        from deepface import DeepFace
+
+        if self.batched and len(frames) > 1:
+            try:
+                batch = DeepFace.analyze(
+                    list(frames),
+                    actions=["emotion"],
+                    detector_backend=self.detector_backend,
+                    enforce_detection=False,
+                    silent=True,
+                )
+                # One list of faces per frame
+                return [faces[0]["emotion"] if faces else None for faces in batch]
+            except Exception as e:
+                print(f"⚠️ Batched emotion detection failed, analyzing frame by frame from now on: {e}")
+                self.batched = False
+
+        results = []
+        for frame in frames:
+            try:
+                result = DeepFace.analyze(
+                    frame,
+                    actions=["emotion"],
+                    detector_backend=self.detector_backend,
+                    enforce_detection=False,
+                    silent=True,
+                )
+                results.append(result[0]["emotion"])
+            except Exception as e:
+                print(f"Error detecting emotion: {e}")
+                results.append(None)
+        return results
+
+
+# Decode an uploaded image (jpeg, png, ...) into a BGR frame
+def decode_image(data):
+    import cv2
+    import numpy as np
+
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Could not decode image")
+    return frame
+
+
+# Pull every `stride`-th frame out of a short video clip, at most `limit` of them.
+# Skipped frames are only grabbed, never decoded.
+def read_clip(data, stride=5, limit=5):
+    import cv2
+
+    fd, path = tempfile.mkstemp(suffix=".clip")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        cap = cv2.VideoCapture(path)
+        frames = []
+        index = 0
+        while len(frames) < limit:
+            if not cap.grab():
+                break
+            if index % stride == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    frames.append(frame)
+            index += 1
+        cap.release()
+        return frames
+    finally:
+        os.remove(path)
+
+
+# Headless face mood analysis. Samples frames at a fixed stride, runs them
+# through the detector in small batches and stops as soon as the deadline
+# passes. Each analyzed frame votes for its dominant emotion, weighted by
+# how confident the detector was.
+#
+# Batches run on `workers` detector threads, so a slow batch can't hold the
+# caller past the deadline: it's waited for only until then and left to
+# finish in the background, with its result dropped.
+class FaceAnalyzer:
+    def __init__(self, detector=None, samples=5, stride=1, batch_size=2, deadline=3.0, default="neutral",
+                 workers=2):
+        self.detector = detector if detector is not None else DeepFaceDetector()
+        self.samples = samples
+        self.stride = stride
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.default = default
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="face-detect")
+
+    def sample(self, frames, stride=None):
+        return list(frames)[:: stride or self.stride][: self.samples]
+
+    def analyze(self, frames, stride=None, deadline=None):
+        frames = self.sample(frames, stride)
+        deadline = self.deadline if deadline is None else deadline
+        stop_at = time.monotonic() + deadline
+
+        votes = defaultdict(float)
+        totals = defaultdict(float)
+        analyzed = 0
+        timed_out = False
+        for start in range(0, len(frames), self.batch_size):
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            future = self._executor.submit(self.detector.analyze, frames[start : start + self.batch_size])
+            try:
+                results = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                timed_out = True
+                break
+            for scores in results:
+                if not scores:
+                    continue
+                total = sum(scores.values()) or 1.0
+                for emotion, score in scores.items():
+                    totals[emotion] += score / total
+                dominant = max(scores, key=scores.get)
+                votes[dominant] += scores[dominant] / total
+                analyzed += 1
+
+        if not votes:
+            return {"mood": self.default, "confidence": 0.0, "scores": {}, "frames": 0, "timed_out": timed_out}
+
+        mood = max(votes, key=votes.get)
+        return {
+            "mood": mood,
+            "confidence": round(votes[mood] / analyzed, 4),
+            "scores": {emotion: total / analyzed for emotion, total in totals.items()},
+            "frames": analyzed,
+            "timed_out": timed_out,
+        }
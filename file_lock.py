@@ -0,0 +1,40 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows, where prefork.py doesn't run either
+    fcntl = None
+
+
+# Exclusive lock shared by every process using the same lock file, for state
+# on disk that prefork.py's workers write to. Each acquire opens its own
+# descriptor, so the lock also keeps threads of one process apart and a
+# forked child never shares its parent's lock. Without fcntl only threads
+# are kept apart.
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._thread_lock = threading.Lock() if fcntl is None else None
+
+    def __enter__(self):
+        if fcntl is None:
+            self._thread_lock.acquire()
+            return self
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._local.fd = fd
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is None:
+            self._thread_lock.release()
+            return
+        # Closing the descriptor releases the lock
+        os.close(self._local.fd)
+        self._local.fd = None
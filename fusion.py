@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from catalog import MOODS
+
+MOOD_INDEX = {mood: i for i, mood in enumerate(MOODS)}
+MODALITIES = ("face", "voice", "text")
+
+
+# Turn {mood: score} (or a bare mood label) into a probability vector over MOODS
+def to_vector(scores):
+    vector = np.zeros(len(MOODS))
+    if isinstance(scores, str):
+        scores = {scores: 1.0}
+    for mood, score in scores.items():
+        i = MOOD_INDEX.get(mood)
+        if i is not None:
+            vector[i] = score
+    total = vector.sum()
+    return vector / total if total > 0 else vector
+
+
+# Combines face, voice and text readings for a session into one distribution.
+# Each session holds a (modalities x moods) matrix: a new reading decays that
+# modality's row by its age and adds the new vector. The fused distribution
+# decays every row to "now", weights the rows per modality and normalizes, so
+# both an update and a read cost O(moods).
+class MoodFusion:
+    def __init__(self, half_life=60.0, weights=None, ttl=1800.0, clock=time.monotonic):
+        self.half_life = half_life
+        self.ttl = ttl
+        self.clock = clock
+        weights = weights or {"face": 1.0, "voice": 0.8, "text": 1.0}
+        self.weights = np.array([weights.get(m, 1.0) for m in MODALITIES])
+        self._decay_rate = math.log(2) / half_life
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._next_expiry = clock() + ttl
+
+    def _state(self, session_id):
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = (
+                np.zeros((len(MODALITIES), len(MOODS))),
+                np.full(len(MODALITIES), -np.inf),
+            )
+        return state
+
+    def update(self, session_id, modality, scores, now=None):
+        now = self.clock() if now is None else now
+        row = MODALITIES.index(modality)
+        vector = to_vector(scores)
+        with self._lock:
+            if now >= self._next_expiry:
+                self._expire(now)
+            matrix, times = self._state(session_id)
+            if np.isfinite(times[row]):
+                matrix[row] *= math.exp(-self._decay_rate * (now - times[row]))
+            matrix[row] += vector
+            times[row] = now
+            return self._fuse(matrix, times, now)
+
+    def _fuse(self, matrix, times, now):
+        decay = np.exp(-self._decay_rate * (now - times))  # exp(-inf) == 0 for unseen modalities
+        fused = (self.weights * decay) @ matrix
+        total = fused.sum()
+        if total <= 0:
+            return np.full(len(MOODS), 1.0 / len(MOODS))
+        return fused / total
+
+    # Current fused distribution as {mood: probability}
+    def distribution(self, session_id, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            fused = self._fuse(state[0], state[1], now)
+        return dict(zip(MOODS, fused.round(4).tolist()))
+
+    def _expire(self, now):
+        self._next_expiry = now + self.ttl
+        stale = [k for k, (_, times) in self._sessions.items() if now - times.max() > self.ttl]
+        for session_id in stale:
+            del self._sessions[session_id]
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+
+# Raised when a password can't be checked or hashed right now and the
+# request should be shed
+class HashingUnavailable(Exception):
+    pass
+
+
+# The hashing queue is full
+class HashQueueFull(HashingUnavailable):
+    pass
+
+
+# The call didn't finish within the service's timeout
+class HashTimeout(HashingUnavailable):
+    pass
+
+
+# These run inside the worker processes
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def _hashpw(password):
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+
+# Runs bcrypt in a fixed-size process pool so password checks never pin the
+# request threads. At most `workers + max_queue` calls are admitted at once;
+# anything beyond that fails fast with HashQueueFull. A call holds its slot
+# until the pool is done with it, even if the caller gave up waiting after
+# `timeout` seconds (HashTimeout), so the pool's backlog stays bounded too.
+class HashingService:
+    def __init__(self, workers=2, max_queue=16, timeout=10):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._total_seconds = 0.0
+
+    # The pool is started on first use so importing the app doesn't fork
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashQueueFull()
+
+        with self._lock:
+            self._in_flight += 1
+        start = time.perf_counter()
+
+        def done(future):
+            with self._lock:
+                self._in_flight -= 1
+                if not future.cancelled():
+                    self._completed += 1
+                    self._total_seconds += time.perf_counter() - start
+            self._slots.release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(done)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it. Already running: it keeps its slot
+            # until it finishes.
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise HashTimeout() from None
+
+    def check_password(self, password, hashed):
+        return self._run(_checkpw, password, hashed)
+
+    def hash_password(self, password):
+        return self._run(_hashpw, password)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.workers + self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "avg_ms": (self._total_seconds / self._completed * 1000) if self._completed else 0.0,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,320 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+
+from catalog import MOODS
+from file_lock import FileLock
+
+EVENTS = ("play", "skip", "complete")
+NO_MOOD = 255
+
+# One history record: timestamp, song id, mood index, event index, seconds listened
+RECORD = struct.Struct("<dIBBH")
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".log"
+USER_NAME_FILE = "user"  # in each user's directory, which is named by a hash
+MAX_DURATION = 0xFFFF  # the record's duration field is 16 bits
+
+
+# Check an event from a client and return a copy with "event", "title", "ts"
+# and "duration" set to values a record can hold: ts defaults to now and must
+# be a finite number, the duration is clamped to 0..MAX_DURATION seconds.
+# Raises ValueError for an event that can't be stored.
+def clean_event(event):
+    if not isinstance(event, dict) or not isinstance(event.get("url"), str):
+        raise ValueError("an event needs a url")
+    kind = event.get("event", "play")
+    if kind not in EVENTS:
+        raise ValueError(f"unknown event {kind!r}")
+    title = event.get("title") or ""
+    if not isinstance(title, str):
+        raise ValueError("the title must be a string")
+    ts = _finite(event.get("ts") or time.time(), "ts")
+    duration = _finite(event.get("duration") or 0, "duration")
+    return {
+        **event,
+        "event": kind,
+        "title": title,
+        "ts": ts,
+        "duration": int(min(max(duration, 0), MAX_DURATION)),
+    }
+
+
+def _finite(value, name):
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number") from None
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite")
+    return value
+
+
+# Per-user listening history kept as an append-only log of fixed-width
+# records. Each user has a directory of numbered segment files; the newest
+# one takes appends and is rolled over once it holds `segment_records`
+# records. Once `max_segments` closed segments pile up behind the last
+# compacted one they are merged into a single segment, so the file count
+# stays small without rewriting old history over and over. Songs are stored
+# as ids into a shared, append-only song list.
+#
+# Fixed-width records make "last N" a single seek-and-read from the tail,
+# and per-mood play counts are kept in memory once a user has been loaded.
+#
+# Several processes (prefork.py's workers) can share one store: the song list
+# and each user's segments are only changed under file locks, each process
+# reads the songs others appended before adding one, and cached mood counts
+# catch up on records other processes wrote.
+class HistoryStore:
+    def __init__(self, root, segment_records=65536, max_segments=8):
+        self.root = root
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self._songs_path = os.path.join(root, "songs.tsv")
+        self._songs = []
+        self._song_ids = {}
+        self._songs_read = 0  # bytes of songs.tsv loaded into _songs
+        self._songs_lock = FileLock(os.path.join(root, "songs.lock"))
+        self._user_locks = {}
+        self._locks_lock = threading.Lock()
+        self._mood_counts = {}  # user -> [counts, records counted]
+        os.makedirs(os.path.join(root, "users"), exist_ok=True)
+
+        with self._songs_lock:
+            self._read_new_songs()
+
+    # Load songs appended since the last call, by this or another process.
+    # Called with the songs lock held.
+    def _read_new_songs(self):
+        try:
+            with open(self._songs_path, "rb") as f:
+                f.seek(self._songs_read)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].decode("utf-8").split("\n")[:-1]:
+            url, _, title = line.rstrip("\r").partition("\t")
+            self._song_ids[url] = len(self._songs)
+            self._songs.append((url, title))
+        self._songs_read += end
+
+    def _user_lock(self, user):
+        with self._locks_lock:
+            lock = self._user_locks.get(user)
+            if lock is None:
+                path = self._user_dir(user) + ".lock"
+                lock = self._user_locks[user] = FileLock(path)
+            return lock
+
+    def _user_dir(self, user):
+        return os.path.join(self.root, "users", hashlib.sha1(user.encode("utf-8")).hexdigest()[:20])
+
+    def _segments(self, user_dir):
+        try:
+            names = os.listdir(user_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            os.path.join(user_dir, name)
+            for name in names
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _segment_path(self, user_dir, number):
+        return os.path.join(user_dir, f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _segment_number(path):
+        return int(os.path.basename(path)[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+
+    def _song_id(self, url, title):
+        song_id = self._song_ids.get(url)
+        if song_id is not None:
+            return song_id
+        with self._songs_lock:
+            self._read_new_songs()
+            song_id = self._song_ids.get(url)
+            if song_id is None:
+                title = title.replace("\t", " ").replace("\n", " ").replace("\r", " ")
+                line = f"{url}\t{title}\n".encode("utf-8")
+                with open(self._songs_path, "ab") as f:
+                    f.write(line)
+                self._songs_read += len(line)
+                song_id = len(self._songs)
+                self._songs.append((url, title))
+                self._song_ids[url] = song_id
+        return song_id
+
+    # Takes an event returned by clean_event
+    def _pack(self, event):
+        url = event["url"].replace("\t", " ").replace("\n", " ").replace("\r", " ")
+        mood = event.get("mood")
+        return RECORD.pack(
+            event["ts"],
+            self._song_id(url, event["title"]),
+            MOODS.index(mood) if mood in MOODS else NO_MOOD,
+            EVENTS.index(event["event"]),
+            event["duration"],
+        )
+
+    # Append a batch of events for one user. Each event is a dict with "url"
+    # and optionally "title", "mood", "event", "ts" and "duration". Raises
+    # ValueError, before anything is written, if one of them is malformed.
+    def ingest(self, user, events):
+        events = [clean_event(event) for event in events]
+        records = [self._pack(event) for event in events]
+        if not records:
+            return 0
+
+        user_dir = self._user_dir(user)
+        with self._user_lock(user):
+            name_path = os.path.join(user_dir, USER_NAME_FILE)
+            if not os.path.exists(name_path):
+                os.makedirs(user_dir, exist_ok=True)
+                with open(name_path, "w", encoding="utf-8") as f:
+                    f.write(user)
+            segments = self._segments(user_dir)
+            if segments:
+                path = segments[-1]
+                room = self.segment_records - os.path.getsize(path) // RECORD.size
+            else:
+                path, room = self._segment_path(user_dir, 1), self.segment_records
+
+            pending = records
+            while pending:
+                if room <= 0:
+                    path = self._segment_path(user_dir, self._segment_number(path) + 1)
+                    segments.append(path)
+                    room = self.segment_records
+                chunk, pending = pending[:room], pending[room:]
+                with open(path, "ab") as f:
+                    f.write(b"".join(chunk))
+                room -= len(chunk)
+
+            self._compact(user_dir)
+        return len(records)
+
+    # Closed segments written since the last compaction: the run of
+    # un-compacted segments just before the active one
+    def _uncompacted(self, user_dir):
+        limit = self.segment_records * RECORD.size
+        run = []
+        for path in reversed(self._segments(user_dir)[:-1]):
+            if os.path.getsize(path) > limit:
+                break
+            run.append(path)
+        return run[::-1]
+
+    # Merge the closed segments written since the last compaction into one.
+    # Record order is preserved.
+    def _compact(self, user_dir, force=False):
+        closed = self._uncompacted(user_dir)
+        if len(closed) < (2 if force else self.max_segments):
+            return
+        target = closed[0]
+        tmp_path = target + ".compact"
+        with open(tmp_path, "wb") as out:
+            for path in closed:
+                with open(path, "rb") as f:
+                    while True:
+                        block = f.read(1024 * 1024)
+                        if not block:
+                            break
+                        out.write(block)
+        os.replace(tmp_path, target)
+        for path in closed[1:]:
+            os.remove(path)
+
+    def compact(self, user):
+        with self._user_lock(user):
+            self._compact(self._user_dir(user), force=True)
+
+    def _decode(self, record):
+        ts, song_id, mood, event, duration = RECORD.unpack(record)
+        if song_id >= len(self._songs):
+            # Added by another process
+            with self._songs_lock:
+                self._read_new_songs()
+        url, title = self._songs[song_id]
+        return {
+            "url": url,
+            "title": title,
+            "mood": MOODS[mood] if mood != NO_MOOD else None,
+            "event": EVENTS[event],
+            "ts": ts,
+            "duration": duration,
+        }
+
+    # The names of the users with a history
+    def users(self):
+        users_dir = os.path.join(self.root, "users")
+        names = []
+        for entry in sorted(os.listdir(users_dir)):
+            try:
+                with open(os.path.join(users_dir, entry, USER_NAME_FILE), encoding="utf-8") as f:
+                    names.append(f.read())
+            except OSError:
+                # A lock file, or a directory from before names were kept
+                continue
+        return names
+
+    # How many events the user has
+    def count(self, user):
+        with self._user_lock(user):
+            return sum(os.path.getsize(path) // RECORD.size for path in self._segments(self._user_dir(user)))
+
+    # All of the user's events, oldest first
+    def events(self, user):
+        results = []
+        with self._user_lock(user):
+            for path in self._segments(self._user_dir(user)):
+                with open(path, "rb") as f:
+                    data = f.read()
+                for offset in range(0, len(data) - RECORD.size + 1, RECORD.size):
+                    results.append(self._decode(data[offset : offset + RECORD.size]))
+        return results
+
+    # The user's most recent `n` events, newest first
+    def last(self, user, n=10):
+        results = []
+        with self._user_lock(user):
+            for path in reversed(self._segments(self._user_dir(user))):
+                needed = n - len(results)
+                if needed <= 0:
+                    break
+                size = os.path.getsize(path) // RECORD.size * RECORD.size
+                start = max(0, size - needed * RECORD.size)
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    data = f.read(size - start)
+                for offset in range(len(data) - RECORD.size, -1, -RECORD.size):
+                    results.append(self._decode(data[offset : offset + RECORD.size]))
+        return results
+
+    # How many times the user has played something for each mood. Counts are
+    # kept per user along with how many records they cover; compaction keeps
+    # record order, so only records past that number are read on later calls.
+    def mood_counts(self, user):
+        with self._user_lock(user):
+            counts, counted = self._mood_counts.get(user) or ([0] * len(MOODS), 0)
+            seen = 0
+            for path in self._segments(self._user_dir(user)):
+                records = os.path.getsize(path) // RECORD.size
+                start = max(0, counted - seen)
+                seen += records
+                if start >= records:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(start * RECORD.size)
+                    data = f.read((records - start) * RECORD.size)
+                for _, _, mood, event, _ in RECORD.iter_unpack(data[: len(data) // RECORD.size * RECORD.size]):
+                    if mood != NO_MOOD and event == 0:
+                        counts[mood] += 1
+            self._mood_counts[user] = (counts, seen)
+            return dict(zip(MOODS, counts))
@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Raised when a modality already has as many jobs waiting as it allows
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, modality):
+        self.id = uuid.uuid4().hex
+        self.modality = modality
+        self.status = "pending"
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+    def to_dict(self):
+        data = {"id": self.id, "modality": self.modality, "status": self.status}
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "error":
+            data["error"] = self.error
+        return data
+
+
+# Runs mood detection in the background so requests return straight away.
+# Each modality gets its own executor (`limits` workers) and may have at most
+# `max_pending` jobs waiting behind them. Finished jobs are kept for `ttl`
+# seconds so clients can collect them by long-polling or over SSE.
+class JobManager:
+    def __init__(self, limits, max_pending=16, ttl=300):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executors = {
+            modality: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{modality}-job")
+            for modality, workers in limits.items()
+        }
+        self._limits = dict(limits)
+        self._jobs = {}
+        self._active = {modality: 0 for modality in limits}
+        self._cond = threading.Condition()
+
+    def submit(self, modality, fn, *args):
+        with self._cond:
+            self._expire()
+            if self._active[modality] >= self._limits[modality] + self.max_pending:
+                raise JobQueueFull(modality)
+            job = Job(modality)
+            self._jobs[job.id] = job
+            self._active[modality] += 1
+        self._executors[modality].submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        self._update(job, "running")
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self._update(job, "error", error=str(e))
+        else:
+            self._update(job, "done", result=result)
+
+    def _update(self, job, status, result=None, error=None):
+        with self._cond:
+            job.status = status
+            job.result = result
+            job.error = error
+            if job.finished:
+                job.finished_at = time.monotonic()
+                self._active[job.modality] -= 1
+            self._cond.notify_all()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for job_id in [k for k, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    # Long poll: block until the job finishes or `timeout` seconds pass
+    def wait(self, job_id, timeout=0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs.get(job_id)
+            while job is not None and not job.finished:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return job
+
+    # Server-sent events: one event per status change, ending with the result.
+    # A comment line goes out every `heartbeat` seconds to keep proxies happy.
+    def events(self, job_id, heartbeat=15, timeout=300):
+        deadline = time.monotonic() + timeout
+        last = None
+        while time.monotonic() < deadline:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is not None and job.status == last:
+                    self._cond.wait(heartbeat)
+                    job = self._jobs.get(job_id)
+                if job is None:
+                    yield 'event: error\ndata: {"error": "Unknown or expired job."}\n\n'
+                    return
+                status, data = job.status, job.to_dict()
+
+            if status == last:
+                yield ": keep-alive\n\n"
+                continue
+            last = status
+            yield f"event: {status}\ndata: {json.dumps(data)}\n\n"
+            if status in ("done", "error"):
+                return
+
+    def metrics(self):
+        with self._cond:
+            return {
+                modality: {"workers": self._limits[modality], "active": active}
+                for modality, active in self._active.items()
+            }
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+
+SONG_EXTENSIONS = (".mp3", ".wav")
+
+
+def _trigrams(text):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+# In-memory index of the music library. Each directory is scanned once and
+# remembered along with its mtime; refresh() only rescans directories whose
+# mtime changed, so keeping the index current costs one stat per directory.
+# Lookups are case-insensitive: exact names go through a dict, substrings
+# through a trigram index.
+class LibraryIndex:
+    def __init__(self, root, folders=None, extensions=SONG_EXTENSIONS):
+        self.root = root
+        # With explicit folders only those folders are indexed; otherwise the
+        # whole tree under root is walked
+        self.folders = list(folders) if folders is not None else None
+        self.extensions = extensions
+        self._lock = threading.RLock()
+        self._dirs = {}      # dir -> (mtime_ns, [song names], [subdirs])
+        self._by_name = {}   # lowercase name -> [paths]
+        self._grams = {}     # trigram -> {paths}
+        self._watcher = None
+        self._stop = threading.Event()
+        self.refresh()
+
+    def _top_dirs(self):
+        if self.folders is None:
+            return [self.root]
+        return [os.path.join(self.root, folder) for folder in self.folders]
+
+    # Bring the index up to date. Returns True if anything changed.
+    def refresh(self):
+        changed = False
+        with self._lock:
+            seen = set()
+            stack = self._top_dirs()
+            while stack:
+                folder = stack.pop()
+                try:
+                    mtime = os.stat(folder).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(folder)
+                entry = self._dirs.get(folder)
+                if entry is None or entry[0] != mtime:
+                    entry = self._scan_dir(folder, mtime)
+                    changed = True
+                if self.folders is None:
+                    stack.extend(entry[2])
+
+            for folder in [d for d in self._dirs if d not in seen]:
+                self._forget_dir(folder)
+                changed = True
+        return changed
+
+    def _scan_dir(self, folder, mtime):
+        songs, subdirs = [], []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(self.extensions):
+                        songs.append(entry.name)
+        except OSError:
+            pass
+
+        self._forget_dir(folder)
+        for name in songs:
+            self._add(os.path.join(folder, name), name.lower())
+        entry = self._dirs[folder] = (mtime, songs, subdirs)
+        return entry
+
+    def _forget_dir(self, folder):
+        entry = self._dirs.pop(folder, None)
+        if entry is None:
+            return
+        for name in entry[1]:
+            self._remove(os.path.join(folder, name), name.lower())
+
+    def _add(self, path, lower):
+        self._by_name.setdefault(lower, []).append(path)
+        for gram in _trigrams(lower):
+            self._grams.setdefault(gram, set()).add(path)
+
+    def _remove(self, path, lower):
+        paths = self._by_name.get(lower)
+        if paths is not None:
+            paths.remove(path)
+            if not paths:
+                del self._by_name[lower]
+        for gram in _trigrams(lower):
+            paths = self._grams.get(gram)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._grams[gram]
+
+    # Full path of the song whose file name matches exactly (ignoring case)
+    def find_exact(self, name):
+        with self._lock:
+            paths = self._by_name.get(name.lower())
+            return paths[0] if paths else None
+
+    # Full paths of every song whose file name contains `text` (ignoring case)
+    def find_substring(self, text):
+        text = text.lower()
+        with self._lock:
+            if len(text) < 3:
+                return [p for name, paths in self._by_name.items() if text in name for p in paths]
+
+            candidates = None
+            for gram in sorted(_trigrams(text), key=lambda g: len(self._grams.get(g, ()))):
+                paths = self._grams.get(gram)
+                if not paths:
+                    return []
+                candidates = set(paths) if candidates is None else candidates & paths
+                if not candidates:
+                    return []
+            return sorted(p for p in candidates if text in os.path.basename(p).lower())
+
+    # Song file names in one folder, in directory order
+    def songs_in(self, folder):
+        with self._lock:
+            entry = self._dirs.get(os.path.join(self.root, folder))
+            return list(entry[1]) if entry else []
+
+    def all_songs(self):
+        with self._lock:
+            return [os.path.join(d, name) for d, entry in self._dirs.items() for name in entry[1]]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entry[1]) for entry in self._dirs.values())
+
+    # Poll for changes in a background thread, like a lightweight inotify
+    def start_watching(self, interval=2.0):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            self.refresh()
+
+    # Save the scanned directories so the next start only rescans what changed
+    def save(self, path):
+        with self._lock:
+            data = {folder: list(entry) for folder, entry in self._dirs.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"root": self.root, "dirs": data}, f)
+
+    def load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("root") != self.root:
+            return False
+        with self._lock:
+            for folder in list(self._dirs):
+                self._forget_dir(folder)
+            for folder, (mtime, songs, subdirs) in data["dirs"].items():
+                for name in songs:
+                    self._add(os.path.join(folder, name), name.lower())
+                self._dirs[folder] = (mtime, songs, subdirs)
+        self.refresh()
+        return True
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import typing as t
+import uuid
 import warnings
+from collections import OrderedDict
 from pprint import pformat
 from threading import Lock
 from urllib.parse import quote
@@ -37,6 +39,26 @@ if t.TYPE_CHECKING:
     from .converters import BaseConverter
     from .rules import RuleFactory
 
+# Types of build values that hash and compare like the URL they build to,
+# anything else (lists, custom objects) isn't cached.
+_build_cache_types = frozenset({str, int, float, bool, uuid.UUID})
+
+
+class CacheInfo(t.NamedTuple):
+    """Statistics of a cache, returned by :meth:`Map.match_cache_info`
+    and :meth:`Map.build_cache_info`.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
 
 class Map:
     """The map class stores all the URL rules and some configuration
@@ -66,6 +88,19 @@ class Map:
                           feature and disables the subdomain one.  If
                           enabled the `host` parameter to rules is used
                           instead of the `subdomain` one.
+    :param match_cache_size: Keep the results of up to this many
+        successful matches, keyed by host, path, method and websocket,
+        and return them without matching again. Matches that redirect
+        or fail and rules with converters that aren't
+        ``match_cacheable`` are never cached. The cache is cleared when
+        rules are added. Disabled by default.
+    :param build_cache_size: Keep up to this many built URLs per
+        endpoint and return them when :meth:`MapAdapter.build` is called
+        again with the same endpoint, method and values. Only builds
+        without values or with string, number and UUID values are
+        cached. Endpoints with a rule that uses a converter that isn't
+        ``build_cacheable`` are never cached. The cache is cleared when
+        rules are added. Disabled by default.
 
     .. versionchanged:: 3.0
         The ``charset`` and ``encoding_errors`` parameters were removed.
@@ -102,12 +137,30 @@ class Map:
         sort_parameters: bool = False,
         sort_key: t.Callable[[t.Any], t.Any] | None = None,
         host_matching: bool = False,
+        match_cache_size: int = 0,
+        build_cache_size: int = 0,
     ) -> None:
         self._matcher = StateMachineMatcher(merge_slashes)
         self._rules_by_endpoint: dict[t.Any, list[Rule]] = {}
         self._remap = True
         self._remap_lock = self.lock_class()
 
+        self.match_cache_size = match_cache_size
+        self._match_cache: OrderedDict[
+            tuple[str, str, str, bool], tuple[Rule, dict[str, t.Any]]
+        ] = OrderedDict()
+        self._match_cache_lock = self.lock_class()
+        self._match_cache_hits = 0
+        self._match_cache_misses = 0
+
+        self.build_cache_size = build_cache_size
+        self._build_cache: dict[t.Any, dict[t.Hashable, str]] = {}
+        self._build_cache_lock = self.lock_class()
+        self._build_cache_hits = 0
+        self._build_cache_misses = 0
+        # Endpoints with a rule whose converters aren't build_cacheable
+        self._build_uncacheable: set[t.Any] = set()
+
         self.default_subdomain = default_subdomain
         self.strict_slashes = strict_slashes
         self.redirect_defaults = redirect_defaults
@@ -130,6 +183,81 @@ class Map:
     @merge_slashes.setter
     def merge_slashes(self, value: bool) -> None:
         self._matcher.merge_slashes = value
+        self.clear_match_cache()
+
+    def match_cache_info(self) -> CacheInfo:
+        """Return the hits, misses and size of the match cache. See
+        ``match_cache_size``.
+        """
+        with self._match_cache_lock:
+            return CacheInfo(
+                self._match_cache_hits,
+                self._match_cache_misses,
+                self.match_cache_size,
+                len(self._match_cache),
+            )
+
+    def clear_match_cache(self) -> None:
+        """Empty the match cache. The hit and miss counts are kept."""
+        with self._match_cache_lock:
+            self._match_cache.clear()
+
+    def _get_cached_match(
+        self, key: tuple[str, str, str, bool]
+    ) -> tuple[Rule, dict[str, t.Any]] | None:
+        with self._match_cache_lock:
+            cached = self._match_cache.get(key)
+            if cached is None:
+                self._match_cache_misses += 1
+                return None
+            self._match_cache.move_to_end(key)
+            self._match_cache_hits += 1
+            return cached
+
+    def _cache_match(
+        self, key: tuple[str, str, str, bool], rule: Rule, values: dict[str, t.Any]
+    ) -> None:
+        with self._match_cache_lock:
+            self._match_cache[key] = (rule, dict(values))
+            while len(self._match_cache) > self.match_cache_size:
+                self._match_cache.popitem(last=False)
+
+    def build_cache_info(self) -> CacheInfo:
+        """Return the hits, misses and size of the build cache. See
+        ``build_cache_size``, which is the limit for each endpoint.
+        """
+        with self._build_cache_lock:
+            return CacheInfo(
+                self._build_cache_hits,
+                self._build_cache_misses,
+                self.build_cache_size,
+                sum(len(cache) for cache in self._build_cache.values()),
+            )
+
+    def clear_build_cache(self) -> None:
+        """Empty the build cache. The hit and miss counts are kept."""
+        with self._build_cache_lock:
+            self._build_cache.clear()
+
+    def _get_cached_build(self, endpoint: t.Any, key: t.Hashable) -> str | None:
+        # Building is usually cheap already, so lookups don't take the
+        # lock. Dict lookups are atomic, and the counters may miss an
+        # update when threads build at the same time.
+        cache = self._build_cache.get(endpoint)
+        url = cache.get(key) if cache is not None else None
+        if url is None:
+            self._build_cache_misses += 1
+        else:
+            self._build_cache_hits += 1
+        return url
+
+    def _cache_build(self, endpoint: t.Any, key: t.Hashable, url: str) -> None:
+        with self._build_cache_lock:
+            cache = self._build_cache.setdefault(endpoint, {})
+            cache[key] = url
+            # The oldest URL goes first
+            while len(cache) > self.build_cache_size:
+                del cache[next(iter(cache))]
 
     def is_endpoint_expecting(self, endpoint: t.Any, *arguments: str) -> bool:
         """Iterate over all rules and check if the endpoint expects
@@ -178,7 +306,11 @@ class Map:
             if not rule.build_only:
                 self._matcher.add(rule)
             self._rules_by_endpoint.setdefault(rule.endpoint, []).append(rule)
+            if not rule._build_cacheable:
+                self._build_uncacheable.add(rule.endpoint)
         self._remap = True
+        self.clear_match_cache()
+        self.clear_build_cache()
 
     def bind(
         self,
@@ -372,6 +504,8 @@ class Map:
             self._matcher.update()
             for rules in self._rules_by_endpoint.values():
                 rules.sort(key=lambda x: x.build_compare_key())
+            self.clear_match_cache()
+            self.clear_build_cache()
             self._remap = False
 
     def __repr__(self) -> str:
@@ -601,6 +735,16 @@ class MapAdapter:
 
         path_part = f"/{path_info.lstrip('/')}" if path_info else ""
 
+        cache_key = None
+        if self.map.match_cache_size > 0:
+            cache_key = (domain_part, path_part, method, websocket)
+            cached = self.map._get_cached_match(cache_key)
+            if cached is not None:
+                rule, rv = cached
+                if return_rule:
+                    return rule, dict(rv)
+                return rule.endpoint, dict(rv)
+
         try:
             result = self.map._matcher.match(domain_part, path_part, method, websocket)
         except RequestPath as e:
@@ -658,6 +802,9 @@ class MapAdapter:
                     )
                 )
 
+            if cache_key is not None and rule._match_cacheable:
+                self.map._cache_match(cache_key, rule, rv)
+
             if return_rule:
                 return rule, rv
             else:
@@ -825,6 +972,95 @@ class MapAdapter:
 
         return first_match
 
+    def _build_cache_key(
+        self,
+        values: t.Mapping[str, t.Any],
+        method: str | None,
+        force_external: bool,
+        append_unknown: bool,
+        url_scheme: str | None,
+    ) -> t.Hashable | None:
+        """The key of a build in the map's build cache, or ``None`` if
+        the values can't be cached.
+
+        :internal:
+        """
+        # The types are part of the key because 1, 1.0 and True are equal
+        # but build different URLs.
+        types = tuple(map(type, values.values()))
+        if not _build_cache_types.issuperset(types):
+            return None
+
+        return (
+            tuple(values.items()),
+            types,
+            method,
+            force_external,
+            append_unknown,
+            url_scheme,
+            self.server_name,
+            self.subdomain,
+            self.script_name,
+            self.url_scheme,
+            self.default_method,
+        )
+
+    def _clean_build_values(
+        self, values: t.Mapping[str, t.Any] | None
+    ) -> t.Mapping[str, t.Any]:
+        """Drop ``None`` values and unpack single item lists of a
+        ``MultiDict`` before building.
+
+        :internal:
+        """
+        if not values:
+            return {}
+        if isinstance(values, MultiDict):
+            return {
+                k: (v[0] if len(v) == 1 else v)
+                for k, v in dict.items(values)
+                if len(v) != 0
+            }
+        return {k: v for k, v in values.items() if v is not None}
+
+    def _make_build_url(
+        self,
+        domain_part: str,
+        path: str,
+        websocket: bool,
+        force_external: bool,
+        url_scheme: str | None,
+    ) -> str:
+        """Turn the result of :meth:`_partial_build` into a URL.
+
+        :internal:
+        """
+        host = self.get_host(domain_part)
+
+        if url_scheme is None:
+            url_scheme = self.url_scheme
+
+        # Always build WebSocket routes with the scheme (browsers
+        # require full URLs). If bound to a WebSocket, ensure that HTTP
+        # routes are built with an HTTP scheme.
+        secure = url_scheme in {"https", "wss"}
+
+        if websocket:
+            force_external = True
+            url_scheme = "wss" if secure else "ws"
+        elif url_scheme:
+            url_scheme = "https" if secure else "http"
+
+        # shortcut this.
+        if not force_external and (
+            (self.map.host_matching and host == self.server_name)
+            or (not self.map.host_matching and domain_part == self.subdomain)
+        ):
+            return f"{self.script_name.rstrip('/')}/{path.lstrip('/')}"
+
+        scheme = f"{url_scheme}:" if url_scheme else ""
+        return f"{scheme}//{host}{self.script_name[:-1]}/{path.lstrip('/')}"
+
     def build(
         self,
         endpoint: t.Any,
@@ -906,46 +1142,118 @@ class MapAdapter:
            Added the ``append_unknown`` parameter.
         """
         self.map.update()
+        values = self._clean_build_values(values)
 
-        if values:
-            if isinstance(values, MultiDict):
-                values = {
-                    k: (v[0] if len(v) == 1 else v)
-                    for k, v in dict.items(values)
-                    if len(v) != 0
-                }
-            else:  # plain dict
-                values = {k: v for k, v in values.items() if v is not None}
-        else:
-            values = {}
+        cache_key = None
+        if (
+            self.map.build_cache_size > 0
+            and endpoint not in self.map._build_uncacheable
+        ):
+            cache_key = self._build_cache_key(
+                values, method, force_external, append_unknown, url_scheme
+            )
+            if cache_key is not None:
+                url = self.map._get_cached_build(endpoint, cache_key)
+                if url is not None:
+                    return url
 
         rv = self._partial_build(endpoint, values, method, append_unknown)
         if rv is None:
             raise BuildError(endpoint, values, method, self)
 
         domain_part, path, websocket = rv
-        host = self.get_host(domain_part)
+        url = self._make_build_url(
+            domain_part, path, websocket, force_external, url_scheme
+        )
+        if cache_key is not None:
+            self.map._cache_build(endpoint, cache_key, url)
+        return url
 
-        if url_scheme is None:
-            url_scheme = self.url_scheme
+    def build_many(
+        self,
+        endpoint: t.Any,
+        values: t.Iterable[t.Mapping[str, t.Any] | None],
+        method: str | None = None,
+        force_external: bool = False,
+        append_unknown: bool = True,
+        url_scheme: str | None = None,
+    ) -> list[str]:
+        """Build one URL for the endpoint for each mapping in *values*,
+        for example the links of a list of items. The result is the
+        same as calling :meth:`build` for each, but the rule to build
+        with is looked up once for every set of value names instead of
+        for every URL.
+
+        >>> m = Map([Rule('/songs/<int:id>', endpoint='song')])
+        >>> urls = m.bind("example.com", "/")
+        >>> urls.build_many("song", [{'id': 1}, {'id': 2}])
+        ['/songs/1', '/songs/2']
 
-        # Always build WebSocket routes with the scheme (browsers
-        # require full URLs). If bound to a WebSocket, ensure that HTTP
-        # routes are built with an HTTP scheme.
-        secure = url_scheme in {"https", "wss"}
+        A :exc:`BuildError` is raised for the first values no URL can be
+        built for. The other arguments work like they do for
+        :meth:`build`.
+        """
+        self.map.update()
+        rules = self.map._rules_by_endpoint.get(endpoint, ())
+        # Without defaults and host matching, whether a rule is suitable
+        # only depends on the names of the values, so the first suitable
+        # rule can be reused for values with the same names.
+        by_names = not self.map.host_matching and not any(
+            rule.defaults for rule in rules
+        )
+        cacheable = (
+            self.map.build_cache_size > 0
+            and endpoint not in self.map._build_uncacheable
+        )
+        methods = (self.default_method, None) if method is None else (method,)
+        rule_for: dict[frozenset[str], Rule | None] = {}
+        urls = []
 
-        if websocket:
-            force_external = True
-            url_scheme = "wss" if secure else "ws"
-        elif url_scheme:
-            url_scheme = "https" if secure else "http"
+        for item in values:
+            item = self._clean_build_values(item)
 
-        # shortcut this.
-        if not force_external and (
-            (self.map.host_matching and host == self.server_name)
-            or (not self.map.host_matching and domain_part == self.subdomain)
-        ):
-            return f"{self.script_name.rstrip('/')}/{path.lstrip('/')}"
+            cache_key = None
+            if cacheable:
+                cache_key = self._build_cache_key(
+                    item, method, force_external, append_unknown, url_scheme
+                )
+                if cache_key is not None:
+                    url = self.map._get_cached_build(endpoint, cache_key)
+                    if url is not None:
+                        urls.append(url)
+                        continue
+
+            rv = None
+            if by_names:
+                names = frozenset(item)
+                if names not in rule_for:
+                    rule_for[names] = next(
+                        (
+                            rule
+                            for rule_method in methods
+                            for rule in rules
+                            if rule.suitable_for(item, rule_method)
+                        ),
+                        None,
+                    )
+                rule = rule_for[names]
+                if rule is not None:
+                    build_rv = rule.build(item, append_unknown)
+                    if build_rv is not None:
+                        rv = (build_rv[0], build_rv[1], rule.websocket)
+
+            # Fall back to trying every rule, the same way build does
+            if rv is None:
+                rv = self._partial_build(endpoint, item, method, append_unknown)
+                if rv is None:
+                    raise BuildError(endpoint, item, method, self)
+
+            domain_part, path, websocket = rv
+            url = self._make_build_url(
+                domain_part, path, websocket, force_external, url_scheme
+            )
+            if cache_key is not None:
+                self.map._cache_build(endpoint, cache_key, url)
+            urls.append(url)
 
-        scheme = f"{url_scheme}:" if url_scheme else ""
-        return f"{scheme}//{host}{self.script_name[:-1]}/{path.lstrip('/')}"
+        return urls
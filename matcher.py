@@ -17,23 +17,121 @@ class SlashRequired(Exception):
     pass
 
 
+_converter_group_re = re.compile(r"\(\?P<__werkzeug_\d+>")
+
+
+@dataclass
+class Transition:
+    """A dynamic transition compiled by :meth:`StateMachineMatcher.update`.
+
+    *values* are the group numbers holding the converter values, in
+    converter order.
+    """
+
+    part: RulePart
+    state: State
+    regex: re.Pattern[str]
+    values: list[int]
+
+
+@dataclass
+class Alternation:
+    """All the dynamic transitions of a state that match against the
+    same target, joined into one regex so a single call finds the first
+    one (by weight) that matches.
+
+    *alternatives* maps the number of the group wrapping each
+    alternative to the index of its transition.
+    """
+
+    regex: re.Pattern[str]
+    alternatives: dict[int, int]
+
+
 @dataclass
 class State:
     """A representation of a rule state.
 
     This includes the *rules* that correspond to the state and the
     possible *static* and *dynamic* transitions to the next state.
+    The dynamic transitions are compiled into *transitions*, and into
+    a *segment* alternation for those matching a single path part and
+    a *tail* alternation for final ones that match the rest of the
+    path.
     """
 
     dynamic: list[tuple[RulePart, State]] = field(default_factory=list)
     rules: list[Rule] = field(default_factory=list)
     static: dict[str, State] = field(default_factory=dict)
+    transitions: list[Transition] = field(default_factory=list)
+    segment: Alternation | None = None
+    tail: Alternation | None = None
+    compiled: bool = False
+
+
+def _compile_transition(part: RulePart, state: State) -> Transition:
+    regex = re.compile(part.content)
+    names = sorted(
+        (name for name in regex.groupindex if name.startswith("__werkzeug_")),
+        key=lambda name: int(name[11:]),
+    )
+    return Transition(part, state, regex, [regex.groupindex[name] for name in names])
+
+
+def _compile_alternation(
+    transitions: list[Transition], indexes: list[int]
+) -> Alternation | None:
+    if not indexes:
+        return None
+
+    # The converter groups are made anonymous so the same names can
+    # appear in every alternative, the group numbers inside each
+    # alternative stay the same relative to the group wrapping it.
+    patterns = []
+    alternatives = {}
+    group = 1
+    for index in indexes:
+        transition = transitions[index]
+        patterns.append(f"({_converter_group_re.sub('(', transition.part.content)})")
+        alternatives[group] = index
+        group += transition.regex.groups + 1
+
+    return Alternation(re.compile("|".join(patterns)), alternatives)
+
+
+def _first_transition(
+    state: State, parts: list[str]
+) -> tuple[int, re.Match[str] | None, int]:
+    """Find the first of the state's dynamic transitions that matches,
+    returns its index, the match and the number of the group wrapping it
+    in the match.
+    """
+    if not state.compiled:
+        return 0, None, 0
+
+    first = len(state.transitions)
+    first_match = None
+    offset = 0
+    if state.segment is not None:
+        match = state.segment.regex.match(parts[0])
+        if match is not None:
+            first = state.segment.alternatives[match.lastindex]  # type: ignore[index]
+            first_match, offset = match, match.lastindex  # type: ignore[assignment]
+    if state.tail is not None:
+        match = state.tail.regex.match("/".join(parts))
+        if match is not None:
+            index = state.tail.alternatives[match.lastindex]  # type: ignore[index]
+            if index < first:
+                first = index
+                first_match, offset = match, match.lastindex  # type: ignore[assignment]
+    return first, first_match, offset
 
 
 class StateMachineMatcher:
     def __init__(self, merge_slashes: bool) -> None:
         self._root = State()
         self.merge_slashes = merge_slashes
+        self._static: dict[tuple[str, str], State] = {}
 
     def add(self, rule: Rule) -> None:
         state = self._root
@@ -54,17 +152,49 @@ class StateMachineMatcher:
 
     def update(self) -> None:
         # For every state the dynamic transitions should be sorted by
-        # the weight of the transition
+        # the weight of the transition, and are then compiled so
+        # matching never has to compile a regex. States reached through
+        # static transitions alone are indexed by their full path.
         state = self._root
+        self._static = {}
 
-        def _update_state(state: State) -> None:
+        def _update_state(state: State, static_parts: list[str] | None) -> None:
             state.dynamic.sort(key=lambda entry: entry[0].weight)
-            for new_state in state.static.values():
-                _update_state(new_state)
+            state.transitions = [
+                _compile_transition(part, new_state)
+                for part, new_state in state.dynamic
+            ]
+            indexes = range(len(state.transitions))
+            try:
+                state.segment = _compile_alternation(
+                    state.transitions,
+                    [i for i in indexes if not state.transitions[i].part.final],
+                )
+                state.tail = _compile_alternation(
+                    state.transitions,
+                    [i for i in indexes if state.transitions[i].part.final],
+                )
+                state.compiled = True
+            except re.error:
+                # A converter regex with its own named groups can't be
+                # repeated in one pattern, the transitions are tried one
+                # at a time instead.
+                state.segment = state.tail = None
+                state.compiled = False
+
+            if static_parts and state.rules:
+                domain, *path = static_parts
+                self._static[(domain, "/".join(path))] = state
+
+            for content, new_state in state.static.items():
+                _update_state(
+                    new_state,
+                    None if static_parts is None else [*static_parts, content],
+                )
             for _, new_state in state.dynamic:
-                _update_state(new_state)
+                _update_state(new_state, None)
 
-        _update_state(state)
+        _update_state(state, [])
 
     def match(
         self, domain: str, path: str, method: str, websocket: bool
@@ -117,34 +247,33 @@ class StateMachineMatcher:
                 if rv is not None:
                     return rv
             # No match via the static transitions, so try the dynamic
-            # ones.
-            for test_part, new_state in state.dynamic:
-                target = part
+            # ones. The alternations find the first transition that
+            # matches, if following it leads nowhere the transitions
+            # after it are tried one at a time.
+            first, match, offset = _first_transition(state, parts)
+            for index in range(first, len(state.transitions)):
+                transition = state.transitions[index]
+                test_part = transition.part
                 remaining = parts[1:]
                 # A final part indicates a transition that always
                 # consumes the remaining parts i.e. transitions to a
                 # final state.
                 if test_part.final:
-                    target = "/".join(parts)
                     remaining = []
-                match = re.compile(test_part.content).match(target)
+                if match is None or index != first:
+                    target = "/".join(parts) if test_part.final else part
+                    match = transition.regex.match(target)
+                    offset = 0
                 if match is not None:
                     if test_part.suffixed:
                         # If a part_isolating=False part has a slash suffix, remove the
                         # suffix from the match and check for the slash redirect next.
-                        suffix = match.groups()[-1]
+                        suffix = match.group(offset + transition.regex.groups)
                         if suffix == "/":
                             remaining = [""]
 
-                    converter_groups = sorted(
-                        match.groupdict().items(), key=lambda entry: entry[0]
-                    )
-                    groups = [
-                        value
-                        for key, value in converter_groups
-                        if key[:11] == "__werkzeug_"
-                    ]
-                    rv = _match(new_state, remaining, values + groups)
+                    groups = [match.group(offset + group) for group in transition.values]
+                    rv = _match(transition.state, remaining, values + groups)
                     if rv is not None:
                         return rv
 
@@ -165,10 +294,24 @@ class StateMachineMatcher:
 
             return None
 
-        try:
-            rv = _match(self._root, [domain, *path.split("/")], [])
-        except SlashRequired:
-            raise RequestPath(f"{path}/") from None
+        # A path made of static parts only is looked up directly, the
+        # state machine is only needed when none of the rules there
+        # accept the method or websocket.
+        rv = None
+        state = self._static.get((domain, path))
+        if state is not None:
+            for rule in state.rules:
+                if (
+                    rule.methods is None or method in rule.methods
+                ) and rule.websocket == websocket:
+                    rv = rule, []
+                    break
+
+        if rv is None:
+            try:
+                rv = _match(self._root, [domain, *path.split("/")], [])
+            except SlashRequired:
+                raise RequestPath(f"{path}/") from None
 
         if self.merge_slashes and rv is None:
             # Try to match again, but with slashes merged
@@ -0,0 +1,72 @@
+import importlib
+import threading
+import time
+
+
+# Heavy backends (the model modules and the ML libraries behind them) looked
+# up by name and loaded the first time something asks for them, so importing
+# the app only costs what the login page needs. A backend is registered
+# either as a dotted module path or as a zero-argument loader function.
+# prewarm() loads some of them on a background thread ahead of their first
+# request.
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._backends = {}
+        self._load_seconds = {}
+        self._errors = {}
+        self._locks = {}
+
+    def register(self, name, loader):
+        if isinstance(loader, str):
+            module_name = loader
+            loader = lambda: importlib.import_module(module_name)
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def loaded(self, name):
+        return name in self._backends
+
+    def get(self, name):
+        try:
+            return self._backends[name]
+        except KeyError:
+            pass
+        with self._locks[name]:
+            if name not in self._backends:
+                start = time.perf_counter()
+                try:
+                    backend = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_seconds[name] = time.perf_counter() - start
+                self._errors.pop(name, None)
+                self._backends[name] = backend
+        return self._backends[name]
+
+    # Load the named backends (all of them by default) on a daemon thread.
+    # A backend that fails here is retried when its route first needs it.
+    def prewarm(self, names=None):
+        names = list(self._loaders if names is None else names)
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"⚠️ Could not prewarm {name}: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def metrics(self):
+        return {
+            name: {
+                "loaded": name in self._backends,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
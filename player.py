@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Plays through pygame's mixer. The mixer is started once, on first use, and
+# kept for the life of the process. Tracks are decoded into Sound objects up
+# front (that's the slow part), and a decoded track queued on the channel
+# starts the moment the current one ends, so there's no gap between songs.
+class PygameSink:
+    def __init__(self, frequency=44100, buffer=2048):
+        self.frequency = frequency
+        self.buffer = buffer
+        self._channel = None
+        self._lock = threading.Lock()
+
+    def _get_channel(self):
+        with self._lock:
+            if self._channel is None:
+                import pygame
+
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init(frequency=self.frequency, buffer=self.buffer)
+                pygame.mixer.set_reserved(1)
+                self._channel = pygame.mixer.Channel(0)
+            return self._channel
+
+    def decode(self, path):
+        import pygame
+
+        self._get_channel()
+        return pygame.mixer.Sound(path)
+
+    def play(self, track):
+        self._get_channel().play(track)
+
+    def queue(self, track):
+        self._get_channel().queue(track)
+
+    def stop(self):
+        if self._channel is not None:
+            self._channel.stop()
+
+    def current(self):
+        return self._channel.get_sound() if self._channel is not None else None
+
+
+class NullTrack:
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f"NullTrack({self.path!r})"
+
+
+# Stands in for the sound card: nothing is played, every call is recorded in
+# `events`, and finish() plays the part of a track reaching its end. Decoding
+# can be made to take `decode_seconds`.
+class NullSink:
+    def __init__(self, decode_seconds=0.0):
+        self.decode_seconds = decode_seconds
+        self.events = []
+        self._current = None
+        self._queued = None
+
+    def decode(self, path):
+        time.sleep(self.decode_seconds)
+        self.events.append(("decode", path))
+        return NullTrack(path)
+
+    def play(self, track):
+        self.events.append(("play", track.path))
+        self._current, self._queued = track, None
+
+    def queue(self, track):
+        self.events.append(("queue", track.path))
+        if self._current is None:
+            self._current = track
+        else:
+            self._queued = track
+
+    def stop(self):
+        self.events.append(("stop", None))
+        self._current = self._queued = None
+
+    def current(self):
+        return self._current
+
+    def finish(self):
+        if self._current is not None:
+            self.events.append(("end", self._current.path))
+        self._current, self._queued = self._queued, None
+
+
+# Plays a list of tracks in order. While one track plays, the next is decoded
+# on a background thread and queued on the sink, so the change-over is
+# gapless and skipping to a prefetched track is immediate. Only the current
+# and next decoded tracks are kept in memory.
+class Player:
+    def __init__(self, sink=None, on_track=None, poll_interval=0.1):
+        self.sink = sink if sink is not None else PygameSink()
+        self.on_track = on_track
+        self.poll_interval = poll_interval
+        self.tracks = []
+        self.index = -1
+        self.loop = True
+        self._decoded = {}  # index -> Future of the decoded track
+        self._current = None
+        self._queued = None
+        self._queued_index = None
+        self._lock = threading.RLock()
+        self._playing = threading.Event()
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._watcher = None
+
+    @property
+    def playing(self):
+        return self._current is not None
+
+    @property
+    def current_track(self):
+        return self.tracks[self.index] if self._current is not None else None
+
+    # Play `tracks` starting at `start`. With loop the list wraps around.
+    def play(self, tracks, start=0, loop=True):
+        with self._lock:
+            self.tracks = list(tracks)
+            self.loop = loop
+            self._decoded = {}
+            return self._start(start)
+
+    def next(self):
+        with self._lock:
+            index = self._next_index(self.index)
+            return index is not None and self._start(index)
+
+    def jump(self, index):
+        with self._lock:
+            return 0 <= index < len(self.tracks) and self._start(index)
+
+    def stop(self):
+        with self._lock:
+            self.sink.stop()
+            self._current = self._queued = None
+            self._decoded = {}
+            self._playing.clear()
+
+    def _next_index(self, index):
+        if index + 1 < len(self.tracks):
+            return index + 1
+        return 0 if self.loop and len(self.tracks) > 1 else None
+
+    def _decode(self, index):
+        future = self._decoded.get(index)
+        if future is None:
+            future = self._decoded[index] = self._prefetcher.submit(self.sink.decode, self.tracks[index])
+        return future
+
+    # Switch to `index`, skipping tracks that fail to decode
+    def _start(self, index):
+        for _ in range(len(self.tracks)):
+            try:
+                track = self._decode(index).result()
+            except Exception as e:
+                print(f"⚠️ Could not play {os.path.basename(self.tracks[index])}: {e}")
+                self._decoded.pop(index, None)
+                index = self._next_index(index)
+                if index is None:
+                    break
+                continue
+            self.index = index
+            self._current = track
+            self.sink.play(track)
+            self._prepare_next()
+            self._playing.set()
+            self._ensure_watcher()
+            self._announce()
+            return True
+        self._current = None
+        self._playing.clear()
+        return False
+
+    # Drop decoded tracks that are no longer needed and start decoding the
+    # next one; poll() queues it on the sink once it's ready
+    def _prepare_next(self):
+        index = self._next_index(self.index)
+        self._decoded = {i: f for i, f in self._decoded.items() if i in (self.index, index)}
+        self._queued = self._queued_index = None
+        if index is not None:
+            self._decode(index)
+            self._queue_next()
+
+    def _queue_next(self):
+        index = self._next_index(self.index)
+        future = self._decoded.get(index)
+        if self._queued is not None or future is None or not future.done() or future.exception() is not None:
+            return
+        self._queued = future.result()
+        self._queued_index = index
+        self.sink.queue(self._queued)
+
+    # Catch up with the sink: queue the next track once it's decoded, and
+    # notice when it has taken over or playback ran out before it was ready
+    def poll(self):
+        with self._lock:
+            if self._current is None:
+                return
+            playing = self.sink.current()
+            if playing is self._current:
+                self._queue_next()
+                return
+            if playing is not None and playing is self._queued:
+                self.index = self._queued_index
+                self._current = playing
+                self._prepare_next()
+                self._announce()
+                return
+            index = self._next_index(self.index)
+            if index is None:
+                self._current = None
+                self._playing.clear()
+            else:
+                self._start(index)
+
+    def _announce(self):
+        if self.on_track is not None:
+            self.on_track(self.tracks[self.index])
+
+    def _ensure_watcher(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    # Sleeps on an event while nothing is playing
+    def _watch(self):
+        while True:
+            self._playing.wait()
+            time.sleep(self.poll_interval)
+            self.poll()
@@ -0,0 +1,245 @@
+import gc
+import os
+import random
+import select
+import selectors
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from werkzeug.serving import WSGIRequestHandler, make_server, select_address_family
+
+
+# Pre-forking server: the parent binds the socket, loads whatever `preload`
+# loads (models, indexes), freezes the garbage collector so those objects'
+# pages stay shared copy-on-write, then forks `workers` long-lived processes
+# that all accept on the same socket. Each worker serves requests with
+# werkzeug's server (threaded by default, so long-polls and event streams
+# don't block it) and exits after roughly `max_requests` requests, at which
+# point the parent forks a fresh one.
+#
+# Signals to the parent:
+#   SIGHUP   graceful reload: run `on_reload`, start a new set of workers,
+#            then let the old ones finish their requests and exit
+#   SIGTERM  graceful stop (SIGINT too)
+#
+# Needs os.fork, so POSIX only. Anything kept in process memory (jobs, voice
+# streams, fused moods) is per worker. The listening history and ranking
+# snapshot on disk are shared, through file locks (see file_lock.py).
+# `before_exit` runs in a worker once it has stopped serving, to save
+# whatever it still holds in memory; workers leave with os._exit, which
+# skips atexit handlers.
+class PreforkServer:
+    def __init__(self, app, host="127.0.0.1", port=5000, workers=4, threaded=True,
+                 max_requests=1000, max_requests_jitter=100, graceful_timeout=30, keepalive_timeout=5,
+                 preload=None, after_fork=None, on_reload=None, backlog=2048, before_exit=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threaded = threaded
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.preload = preload
+        self.after_fork = after_fork
+        self.before_exit = before_exit
+        self.on_reload = on_reload
+        self.backlog = backlog
+        self._children = {}  # pid -> generation
+        self._generation = 0
+        self._stopping = False
+        self._reloading = False
+        self._socket = None
+        self._wakeup = None
+
+    def _listen(self):
+        family = select_address_family(self.host, self.port)
+        sock = socket.create_server((self.host, self.port), family=family, backlog=self.backlog)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def run(self):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Preforked workers need os.fork, which this platform doesn't have.")
+
+        self._socket = self._listen()
+        if self.preload is not None:
+            self.preload()
+        gc.collect()
+        gc.freeze()
+
+        self._wakeup = os.pipe()
+        for fd in self._wakeup:
+            os.set_blocking(fd, False)
+        signal.set_wakeup_fd(self._wakeup[1])
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        signal.signal(signal.SIGCHLD, lambda *_: None)
+
+        print(f"🚀 Serving on http://{self.host}:{self.port} with {self.workers} workers (pid {os.getpid()})")
+        try:
+            while not self._stopping:
+                if self._reloading:
+                    self._reload()
+                self._reap()
+                self._spawn_missing()
+                self._sleep(1.0)
+        finally:
+            self._stop_children(list(self._children))
+            signal.set_wakeup_fd(-1)
+            self._socket.close()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reloading = True
+
+    # Block until a signal arrives or `timeout` passes
+    def _sleep(self, timeout):
+        try:
+            select.select([self._wakeup[0]], [], [], timeout)
+            while os.read(self._wakeup[0], 512):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _reload(self):
+        self._reloading = False
+        print("🔄 Reloading workers")
+        if self.on_reload is not None:
+            self.on_reload()
+            gc.collect()
+            gc.freeze()
+        old = list(self._children)
+        self._generation += 1
+        self._spawn_missing()
+        for pid in old:
+            self._signal(pid, signal.SIGTERM)
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self._children.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and not self._stopping:
+                print(f"⚠️ Worker {pid} exited with status {code}")
+
+    def _spawn_missing(self):
+        current = sum(1 for generation in self._children.values() if generation == self._generation)
+        for _ in range(self.workers - current):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = self._generation
+            return
+
+        code = 0
+        try:
+            signal.set_wakeup_fd(-1)
+            for fd in self._wakeup:
+                os.close(fd)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent decides when to stop
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, self._handle_stop)
+            random.seed()
+            if self.after_fork is not None:
+                self.after_fork()
+            self._serve()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                if self.before_exit is not None:
+                    self.before_exit()
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            os._exit(code)
+
+    def _stop_children(self, pids):
+        for pid in pids:
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._children):
+            self._signal(pid, signal.SIGKILL)
+        self._reap()
+
+    @staticmethod
+    def _signal(pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    # Worker side: serve until told to stop, the parent goes away, or the
+    # request budget runs out, then let open connections finish. Idle
+    # keep-alive connections time out after `keepalive_timeout`, so a worker
+    # never waits on a client that has nothing more to send.
+    def _serve(self):
+        parent = os.getppid()
+        limit = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else None
+        counts = {"requests": 0, "connections": 0}
+        lock = threading.Lock()
+
+        def app(environ, start_response):
+            with lock:
+                counts["requests"] += 1
+            return self.app(environ, start_response)
+
+        handler = type("PreforkRequestHandler", (WSGIRequestHandler,), {"timeout": self.keepalive_timeout})
+        server = make_server(
+            self.host, self.port, app, threaded=self.threaded, request_handler=handler, fd=self._socket.fileno()
+        )
+        self._socket.close()
+        # Every worker wakes up for each connection; only one gets it, the
+        # rest go back to waiting instead of blocking in accept()
+        server.socket.setblocking(False)
+
+        process_request = server.process_request
+        shutdown_request = server.shutdown_request
+
+        def opened(request, client_address):
+            with lock:
+                counts["connections"] += 1
+            process_request(request, client_address)
+
+        def closed(request):
+            try:
+                shutdown_request(request)
+            finally:
+                with lock:
+                    counts["connections"] -= 1
+
+        server.process_request = opened
+        server.shutdown_request = closed
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(server, selectors.EVENT_READ)
+            while not self._stopping and os.getppid() == parent:
+                if limit is not None and counts["requests"] >= limit:
+                    break
+                if selector.select(0.5):
+                    server._handle_request_noblock()
+
+        server.socket.close()
+        deadline = time.monotonic() + self.graceful_timeout
+        while counts["connections"] > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
@@ -0,0 +1,240 @@
+import json
+import math
+import os
+import threading
+import time
+
+from file_lock import FileLock
+
+
+# Re-orders a mood's song list for one user. Each song's score blends its
+# position in the catalog list with how often the user played it, how often
+# they skipped it, and how recently they heard it.
+#
+# The counters behind that are updated in place as history events arrive
+# ({user: {url: [plays, skips, last_played]}}), so ranking only touches the
+# songs being ranked, however long the user's history is. A background thread
+# snapshots the counters to disk every `snapshot_interval` seconds.
+#
+# prefork.py's workers each record their own events, so a snapshot doesn't
+# overwrite the file with one process's counters: it merges the changes made
+# since the last snapshot into whatever is on disk, under a file lock, and
+# takes the merged counters (which include other workers' events) back. A
+# process with nothing to snapshot still takes the file's counters back
+# whenever another process has changed it, and so does a freshly forked one.
+#
+# The snapshot also keeps how many events it covers for each user. Given the
+# `history` store the events come from, loading rebuilds the counters of any
+# user whose history holds more events than that (recorded after the last
+# snapshot by a process that then stopped) and saves them.
+class Reranker:
+    def __init__(self, snapshot_path, relevance=1.0, plays=0.3, skips=0.8, recency=0.2,
+                 recency_half_life=3 * 24 * 3600, snapshot_interval=60, history=None):
+        self.snapshot_path = snapshot_path
+        self.history = history
+        self.relevance = relevance
+        self.plays = plays
+        self.skips = skips
+        self.recency = recency
+        self.recency_rate = math.log(2) / recency_half_life
+        self.snapshot_interval = snapshot_interval
+        self._counters = {}
+        self._pending = {}  # changes not yet merged into the snapshot
+        self._pending_events = {}  # user -> events behind those changes
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()  # one snapshot or refresh at a time
+        self._file_lock = FileLock(f"{snapshot_path}.lock")
+        self._snapshot_stamp = None  # identity of the file the counters came from
+        self._thread = None
+        self.load()
+        # A forked worker gets fresh locks, the current counters and its own
+        # snapshot thread
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        try:
+            self.refresh()
+        except OSError as e:
+            print(f"⚠️ Could not load ranking counters: {e}")
+        if self._thread is not None:
+            self._thread = None
+            self.start_snapshots()
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    # Returns (counters, {user: events covered})
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if data.get("version") != 2:
+            # Counters only, so every user's history is replayed
+            return data, {}
+        return data["counters"], data["events"]
+
+    def _write_snapshot(self, counters, events):
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "counters": counters, "events": events}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def load(self):
+        stamp = self._stamp()
+        if self.history is not None:
+            counters = self._catch_up()
+            stamp = self._stamp()
+        else:
+            counters = self._read_snapshot()[0]
+        self._snapshot_stamp = stamp
+        with self._lock:
+            self._counters = counters
+            self._merge(self._counters, self._pending)
+
+    # Rebuild, from the history, the counters of users with events the
+    # snapshot doesn't cover, and save them. Meant for startup: events other
+    # processes recorded but haven't snapshotted yet would be counted twice.
+    def _catch_up(self):
+        with self._file_lock:
+            counters, events = self._read_snapshot()
+            rebuilt = False
+            for user in self.history.users():
+                if self.history.count(user) == events.get(user, 0):
+                    continue
+                history = self.history.events(user)
+                changes = {}
+                for event in history:
+                    self._merge(changes, {user: {event["url"]: self._change(event["event"], event["ts"])}})
+                counters[user] = changes.get(user, {})
+                events[user] = len(history)
+                rebuilt = True
+            if rebuilt:
+                self._write_snapshot(counters, events)
+        return counters
+
+    @staticmethod
+    def _change(event, ts):
+        if event == "skip":
+            return [0, 1, 0.0]
+        if event == "play":
+            return [1, 0, ts]
+        return [0, 0, 0.0]
+
+    @staticmethod
+    def _add_events(events, changes):
+        for user, count in changes.items():
+            events[user] = events.get(user, 0) + count
+
+    # Add the counts in `changes` to `counters`
+    @staticmethod
+    def _merge(counters, changes):
+        for user, urls in changes.items():
+            stats = counters.setdefault(user, {})
+            for url, (plays, skips, last_played) in urls.items():
+                counts = stats.setdefault(url, [0, 0, 0.0])
+                counts[0] += plays
+                counts[1] += skips
+                counts[2] = max(counts[2], last_played)
+
+    # `ts` is converted to a float first, so a bad one raises ValueError or
+    # TypeError before any counter changes
+    def record(self, user, url, event, ts=None):
+        change = self._change(event, float(ts or time.time()))
+        with self._lock:
+            self._merge(self._counters, {user: {url: change}})
+            self._merge(self._pending, {user: {url: change}})
+            self._add_events(self._pending_events, {user: 1})
+
+    def has_history(self, user):
+        return user in self._counters
+
+    # Return `songs` (dicts with a "url") best first
+    def rank(self, user, songs, now=None):
+        stats = self._counters.get(user)
+        if not stats or not songs:
+            return list(songs)
+
+        now = now or time.time()
+        total = len(songs)
+        scored = []
+        for position, song in enumerate(songs):
+            score = self.relevance * (1.0 - position / total)
+            counts = stats.get(song["url"])
+            if counts is not None:
+                plays, skips, last_played = counts
+                score += self.plays * math.log1p(plays)
+                score -= self.skips * skips / (plays + skips or 1)
+                if last_played:
+                    score += self.recency * math.exp(-self.recency_rate * max(0.0, now - last_played))
+            scored.append((-score, position, song))
+        scored.sort()
+        return [song for _, _, song in scored]
+
+    # Merge this process's changes into the file and take the merged counters
+    # back. With no changes, refresh() instead. Returns whether anything was
+    # written.
+    def snapshot(self):
+        with self._snapshot_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                pending_events, self._pending_events = self._pending_events, {}
+            if not pending:
+                self._refresh()
+                return False
+            try:
+                with self._file_lock:
+                    counters, events = self._read_snapshot()
+                    self._merge(counters, pending)
+                    self._add_events(events, pending_events)
+                    self._write_snapshot(counters, events)
+                    stamp = self._stamp()
+            except BaseException:
+                # Try again with the next snapshot
+                with self._lock:
+                    self._merge(self._pending, pending)
+                    self._add_events(self._pending_events, pending_events)
+                raise
+            # Pick up other processes' events, keeping what arrived meanwhile
+            self._take(counters, stamp)
+            return True
+
+    # Take the counters on disk, which hold other processes' snapshots, if
+    # the file changed since they were last read. Returns whether it had.
+    def refresh(self):
+        with self._snapshot_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        stamp = self._stamp()
+        if stamp is None or stamp == self._snapshot_stamp:
+            return False
+        self._take(self._read_snapshot()[0], stamp)
+        return True
+
+    def _take(self, counters, stamp):
+        with self._lock:
+            self._merge(counters, self._pending)
+            self._counters = counters
+            self._snapshot_stamp = stamp
+
+    def start_snapshots(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._snapshot_loop, daemon=True)
+            self._thread.start()
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            try:
+                self.snapshot()
+            except OSError as e:
+                print(f"⚠️ Could not snapshot ranking counters: {e}")
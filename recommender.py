@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from audio_features import FEATURES, extract_many
+
+# Where each mood sits in standardized feature space (tempo, energy,
+# brightness), in standard deviations from the library average
+MOOD_PROFILES = {
+    "angry": (0.8, 1.0, 1.0),
+    "disgust": (-0.4, 0.6, 0.8),
+    "fear": (0.2, -0.6, 0.8),
+    "happy": (1.0, 0.8, 0.6),
+    "neutral": (0.1, -0.3, -0.2),
+    "sad": (-1.0, -0.8, -0.6),
+    "surprise": (0.8, 0.4, 0.2),
+}
+
+
+# Target vector for a single mood or a {mood: probability} distribution.
+# Moods without a profile contribute nothing, so an unknown mood gives a zero
+# vector, which matches no track.
+def mood_vector(mood):
+    if isinstance(mood, str):
+        return np.array(MOOD_PROFILES.get(mood.lower(), (0.0,) * len(FEATURES)))
+    vector = np.zeros(len(FEATURES))
+    for name, weight in mood.items():
+        if name in MOOD_PROFILES:
+            vector += weight * np.array(MOOD_PROFILES[name])
+    return vector
+
+
+# Feature vectors for every track in the library, kept in a memory-mapped
+# float32 matrix (one row per track) next to a JSON list of track names.
+# Queries standardize the matrix and rank tracks by cosine similarity to a
+# mood vector in one vectorized pass. New tracks are appended in place; when
+# the file runs out of room the rows are copied into a new file of twice the
+# size, which then replaces it.
+class Recommender:
+    def __init__(self, index_dir, initial_capacity=256):
+        self.index_dir = index_dir
+        self.matrix_path = os.path.join(index_dir, "features.npy")
+        self.meta_path = os.path.join(index_dir, "tracks.json")
+        self._lock = threading.Lock()
+        self._normalized = None
+        os.makedirs(index_dir, exist_ok=True)
+
+        if os.path.exists(self.meta_path) and os.path.exists(self.matrix_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.tracks = json.load(f)
+            self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+        else:
+            self.tracks = []
+            self._matrix = self._create(initial_capacity)
+        self._positions = {name: i for i, name in enumerate(self.tracks)}
+
+    def _create(self, capacity, path=None):
+        return np.lib.format.open_memmap(
+            path or self.matrix_path, mode="w+", dtype=np.float32, shape=(capacity, len(FEATURES))
+        )
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    # The old file stays whole until the new one is written, so a crash
+    # part way through leaves the index as it was
+    def _grow(self):
+        rows = len(self.tracks)
+        tmp_path = self.matrix_path + ".tmp"
+        grown = self._create(max(1, rows) * 2, tmp_path)
+        grown[:rows] = self._matrix[:rows]
+        grown.flush()
+        self._matrix = grown
+        os.replace(tmp_path, self.matrix_path)
+
+    # Add (or replace) one track's features
+    def add(self, name, features):
+        with self._lock:
+            row = self._positions.get(name)
+            if row is None:
+                if len(self.tracks) >= self._matrix.shape[0]:
+                    self._grow()
+                row = len(self.tracks)
+                self.tracks.append(name)
+                self._positions[name] = row
+            self._matrix[row] = features
+            self._normalized = None
+
+    # Persist the track list; the matrix itself is written through the mmap
+    def flush(self):
+        with self._lock:
+            self._matrix.flush()
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.tracks, f)
+            os.replace(tmp_path, self.meta_path)
+
+    # Bring the index in line with the songs in songs_dir. Unchanged files
+    # come straight from the feature cache; new or changed ones are extracted,
+    # across `workers` processes if more than one.
+    def sync(self, songs_dir, cache, workers=1, extensions=(".wav",), progress=None):
+        paths = [
+            os.path.join(songs_dir, name)
+            for name in sorted(os.listdir(songs_dir))
+            if name.endswith(extensions)
+        ]
+        results, stats = extract_many(paths, cache, workers=workers, progress=progress)
+        for path, features in results.items():
+            self.add(os.path.basename(path), features)
+        self.flush()
+        return stats
+
+    # Standardized, unit-length rows, rebuilt only after the library changes
+    def _unit_rows(self):
+        if self._normalized is None:
+            data = np.asarray(self._matrix[: len(self.tracks)], dtype=np.float64)
+            std = data.std(axis=0)
+            std[std == 0] = 1.0
+            z = (data - data.mean(axis=0)) / std
+            norms = np.linalg.norm(z, axis=1)
+            norms[norms == 0] = 1.0
+            self._normalized = z / norms[:, None]
+        return self._normalized
+
+    # The k tracks closest to a mood (label or distribution) as [(name, similarity)]
+    def top_k(self, mood, k=10):
+        target = mood_vector(mood)
+        norm = np.linalg.norm(target)
+        with self._lock:
+            if not self.tracks or norm == 0:
+                return []
+            similarity = self._unit_rows() @ (target / norm)
+            tracks = self.tracks
+        k = min(k, len(similarity))
+        best = np.argpartition(-similarity, k - 1)[:k]
+        best = best[np.argsort(-similarity[best])]
+        return [(tracks[i], float(similarity[i])) for i in best]
@@ -514,6 +514,8 @@ class Rule(RuleFactory):
         self._converters: dict[str, BaseConverter] = {}
         self._trace: list[tuple[bool, str]] = []
         self._parts: list[RulePart] = []
+        self._match_cacheable = False
+        self._build_cacheable = False
 
     def empty(self) -> Rule:
         """
@@ -730,6 +732,13 @@ class Rule(RuleFactory):
         self._build_unknown: t.Callable[..., tuple[str, str]]
         self._build_unknown = self._compile_builder(True).__get__(self, None)
 
+        self._match_cacheable = all(
+            converter.match_cacheable for converter in self._converters.values()
+        )
+        self._build_cacheable = all(
+            converter.build_cacheable for converter in self._converters.values()
+        )
+
     @staticmethod
     def _get_func_code(code: CodeType, name: str) -> t.Callable[..., tuple[str, str]]:
         globs: dict[str, t.Any] = {}
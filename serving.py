@@ -17,11 +17,16 @@ from __future__ import annotations
 import errno
 import io
 import os
+import queue
 import selectors
 import socket
 import socketserver
+import stat
 import sys
+import threading
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
 from datetime import timedelta
 from datetime import timezone
@@ -34,6 +39,8 @@ from ._internal import _log
 from ._internal import _wsgi_encoding_dance
 from .exceptions import InternalServerError
 from .urls import uri_to_iri
+from .wsgi import _RangeWrapper
+from .wsgi import FileWrapper
 
 try:
     import ssl
@@ -155,6 +162,44 @@ class DechunkedInput(io.RawIOBase):
         return read
 
 
+def _get_file_range(
+    iterable: t.Iterable[bytes],
+) -> tuple[t.IO[bytes], int, int | None] | None:
+    """If a response body is a file wrapped with
+    :func:`~werkzeug.wsgi.wrap_file`, possibly limited to a range with
+    :class:`~werkzeug.wsgi._RangeWrapper`, return the file, the offset to
+    start at and the number of bytes to send, or ``None`` to send up to the
+    end of the file. Returns ``None`` if the body isn't a regular file that
+    hasn't been read from yet.
+    """
+    offset: int | None = None
+    count: int | None = None
+
+    if isinstance(iterable, _RangeWrapper):
+        if iterable.read_length or not iterable.seekable:
+            return None
+
+        offset = iterable.start_byte
+        count = iterable.byte_range
+        iterable = iterable.iterable
+
+    if not isinstance(iterable, FileWrapper):
+        return None
+
+    file = iterable.file
+
+    try:
+        if not stat.S_ISREG(os.fstat(file.fileno()).st_mode):
+            return None
+
+        if offset is None:
+            offset = file.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+    return file, offset, count
+
+
 class WSGIRequestHandler(BaseHTTPRequestHandler):
     """A request handler that implements WSGI dispatching."""
 
@@ -292,11 +337,10 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
                     chunk_response = True
                     self.send_header("Transfer-Encoding", "chunked")
 
-                # Always close the connection. This disables HTTP/1.1
-                # keep-alive connections. They aren't handled well by
-                # Python's http.server because it doesn't know how to
-                # drain the stream before the next request line.
-                self.send_header("Connection", "close")
+                # Close the connection unless the handler knows how to
+                # keep it alive, see can_keep_alive.
+                if not self.can_keep_alive():
+                    self.send_header("Connection", "close")
                 self.end_headers()
 
             assert isinstance(data, bytes), "applications must write bytes"
@@ -327,41 +371,44 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
             headers_set = headers
             return write
 
+        def send_file(application_iter: t.Iterable[bytes]) -> bool:
+            # Send a file body straight from its descriptor rather than
+            # copying it through write in buffer_size chunks. A chunked
+            # response needs the chunk framing and TLS needs the data to
+            # be encrypted, those iterate the file as usual.
+            file_range = _get_file_range(application_iter)
+
+            if (
+                file_range is None
+                or status_set is None
+                or self.server.ssl_context is not None
+            ):
+                return False
+
+            write(b"")
+
+            if chunk_response:
+                return False
+
+            file, offset, count = file_range
+
+            if count is None or count > 0:
+                self.connection.sendfile(file, offset, count)
+
+            return True
+
         def execute(app: WSGIApplication) -> None:
             application_iter = app(environ, start_response)
             try:
-                for data in application_iter:
-                    write(data)
+                if not send_file(application_iter):
+                    for data in application_iter:
+                        write(data)
                 if not headers_sent:
                     write(b"")
                 if chunk_response:
                     self.wfile.write(b"0\r\n\r\n")
             finally:
-                # Check for any remaining data in the read socket, and discard it. This
-                # will read past request.max_content_length, but lets the client see a
-                # 413 response instead of a connection reset failure. If we supported
-                # keep-alive connections, this naive approach would break by reading the
-                # next request line. Since we know that write (above) closes every
-                # connection we can read everything.
-                selector = selectors.DefaultSelector()
-                selector.register(self.connection, selectors.EVENT_READ)
-                total_size = 0
-                total_reads = 0
-
-                # A timeout of 0 tends to fail because a client needs a small amount of
-                # time to continue sending its data.
-                while selector.select(timeout=0.01):
-                    # Only read 10MB into memory at a time.
-                    data = self.rfile.read(10_000_000)
-                    total_size += len(data)
-                    total_reads += 1
-
-                    # Stop reading on no data, >=10GB, or 1000 reads. If a client sends
-                    # more than that, they'll get a connection reset failure.
-                    if not data or total_size >= 10_000_000_000 or total_reads > 1000:
-                        break
-
-                selector.close()
+                self.discard_request_body()
 
                 if hasattr(application_iter, "close"):
                     application_iter.close()
@@ -369,12 +416,15 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
         try:
             execute(self.server.app)
         except connection_dropped_errors as e:
+            self.close_connection = True
             self.connection_dropped(e, environ)
         except Exception as e:
             if self.server.passthrough_errors:
                 raise
 
-            if status_sent is not None and chunk_response:
+            # The response that was started can't be finished, so the
+            # client can't tell where the error response would start.
+            if status_sent is not None:
                 self.close_connection = True
 
             try:
@@ -392,6 +442,47 @@ class WSGIRequestHandler(BaseHTTPRequestHandler):
             msg = DebugTraceback(e).render_traceback_text()
             self.server.log("error", f"Error on request:\n{msg}")
 
+    def can_keep_alive(self) -> bool:
+        """Whether the connection can stay open for another request
+        after the response. Called before the response headers are sent.
+
+        By default every connection is closed, which disables HTTP/1.1
+        keep-alive connections. They aren't handled well by Python's
+        http.server because it doesn't know how to drain the stream
+        before the next request line.
+        """
+        return False
+
+    def discard_request_body(self) -> None:
+        """Read and discard whatever the application left of the
+        request body once the response was sent.
+        """
+        # Check for any remaining data in the read socket, and discard it. This
+        # will read past request.max_content_length, but lets the client see a
+        # 413 response instead of a connection reset failure. On a keep-alive
+        # connection this naive approach would break by reading the next request
+        # line. Since the connection is closed unless can_keep_alive says
+        # otherwise, we can read everything.
+        selector = selectors.DefaultSelector()
+        selector.register(self.connection, selectors.EVENT_READ)
+        total_size = 0
+        total_reads = 0
+
+        # A timeout of 0 tends to fail because a client needs a small amount of
+        # time to continue sending its data.
+        while selector.select(timeout=0.01):
+            # Only read 10MB into memory at a time.
+            data = self.rfile.read(10_000_000)
+            total_size += len(data)
+            total_reads += 1
+
+            # Stop reading on no data, >=10GB, or 1000 reads. If a client sends
+            # more than that, they'll get a connection reset failure.
+            if not data or total_size >= 10_000_000_000 or total_reads > 1000:
+                break
+
+        selector.close()
+
     def handle(self) -> None:
         """Handles a request ignoring dropped connections."""
         try:
@@ -903,6 +994,457 @@ class ForkingWSGIServer(ForkingMixIn, BaseWSGIServer):
         self.max_children = processes
 
 
+class _ConnectionReader(io.BufferedIOBase):
+    """The ``rfile`` of a :class:`SelectorWSGIRequestHandler`. It
+    starts with the bytes the event loop already received and then reads
+    from the socket. Reads can be limited to end at :attr:`end`, so the
+    application can't read into the next request, and whatever was
+    received past the request is kept for the next one.
+    """
+
+    def __init__(self, sock: socket.socket, received: bytes) -> None:
+        self._sock = sock
+        self._buffer = bytearray(received)
+        self.position = 0
+        self.end: int | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def pending(self) -> bytes:
+        """Received bytes that haven't been read yet."""
+        return bytes(self._buffer)
+
+    def _fill(self) -> bool:
+        data = self._sock.recv(65536)
+        self._buffer += data
+        return bool(data)
+
+    def _take(self, size: int) -> bytes:
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.position += size
+        return data
+
+    def _limit(self, size: int | None) -> int:
+        if size is None:
+            size = -1
+
+        if self.end is None:
+            return size
+
+        left = max(self.end - self.position, 0)
+        return left if size < 0 else min(size, left)
+
+    def read(self, size: int | None = -1) -> bytes:
+        size = self._limit(size)
+
+        if size < 0:
+            while self._fill():
+                pass
+
+            return self._take(len(self._buffer))
+
+        while len(self._buffer) < size and self._fill():
+            pass
+
+        return self._take(min(size, len(self._buffer)))
+
+    def read1(self, size: int = -1) -> bytes:
+        size = self._limit(size)
+
+        if size == 0:
+            return b""
+
+        if not self._buffer:
+            self._fill()
+
+        return self._take(
+            len(self._buffer) if size < 0 else min(size, len(self._buffer))
+        )
+
+    def readinto(self, b: bytearray) -> int:  # type: ignore[override]
+        data = self.read1(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def readline(self, size: int | None = -1) -> bytes:
+        size = self._limit(size)
+        start = 0
+
+        while True:
+            index = self._buffer.find(b"\n", start)
+
+            if index >= 0 and (size < 0 or index < size):
+                return self._take(index + 1)
+
+            if 0 <= size <= len(self._buffer):
+                return self._take(size)
+
+            start = len(self._buffer)
+
+            if not self._fill():
+                return self._take(len(self._buffer))
+
+
+class _Connection:
+    """A client connection of a :class:`SelectorWSGIServer`."""
+
+    def __init__(
+        self, sock: socket.socket, address: t.Any, handshake: bool = False
+    ) -> None:
+        self.socket = sock
+        self.address = address
+        self.received = bytearray()
+        self.reader: _ConnectionReader | None = None
+        self.last_active = time.monotonic()
+        self.handshake = handshake
+
+
+class SelectorWSGIRequestHandler(WSGIRequestHandler):
+    """The request handler of :class:`SelectorWSGIServer`. It handles
+    one request that the event loop received the head of. An HTTP/1.1
+    connection is kept alive if the request body is delimited by its
+    ``Content-Length``, the server then waits for the next request
+    without holding a thread.
+    """
+
+    request: _Connection
+    rfile: _ConnectionReader
+    protocol_version = "HTTP/1.1"
+
+    #: Whether the connection should be handed back to the server for
+    #: another request.
+    keep_alive = False
+
+    #: Close the connection rather than read more than this many bytes of
+    #: a request body the application didn't read.
+    max_discard_size = 10_000_000
+
+    def setup(self) -> None:
+        self.connection = self.request.socket
+        self.connection.setblocking(True)
+        timeout = self.timeout
+
+        if timeout is None:
+            timeout = self.server.socket_timeout  # type: ignore[attr-defined]
+
+        if timeout is not None:
+            self.connection.settimeout(timeout)
+
+        self.rfile = self.request.reader  # type: ignore[assignment]
+        self.wfile = self.connection.makefile("wb")
+
+    def handle_one_request(self) -> None:
+        super().handle_one_request()
+        # Hand the connection back to the server instead of waiting for
+        # the next request on this thread.
+        self.keep_alive = not self.close_connection
+        self.close_connection = True
+
+    def make_environ(self) -> WSGIEnvironment:
+        environ = super().make_environ()
+
+        # The rest of the connection may already hold the next request, so
+        # reads end with the body. A request without a length or chunked
+        # encoding has no body.
+        if not environ.get("wsgi.input_terminated"):
+            try:
+                content_length = int(environ.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                content_length = -1
+
+            if content_length >= 0:
+                self.rfile.end = self.rfile.position + content_length
+            else:
+                self.close_connection = True
+
+        return environ
+
+    def can_keep_alive(self) -> bool:
+        return (
+            not self.close_connection
+            and self.request_version == "HTTP/1.1"
+            and self.rfile.end is not None
+        )
+
+    def discard_request_body(self) -> None:
+        if self.rfile.end is None:
+            super().discard_request_body()
+            return
+
+        # Read the rest of the body so the next request starts with its
+        # request line.
+        if self.rfile.end - self.rfile.position > self.max_discard_size:
+            self.close_connection = True
+            return
+
+        try:
+            while self.rfile.read1(65536):
+                pass
+        except OSError:
+            pass
+
+        # A client that stopped sending, or timed out, leaves the stream
+        # somewhere in the body.
+        if self.rfile.position < self.rfile.end:
+            self.close_connection = True
+
+
+class SelectorWSGIServer(BaseWSGIServer):
+    """A WSGI server that waits for requests on all connections in a
+    single event loop. Once the head of a request has been received, the
+    request is handled by one of a fixed number of worker threads. Idle
+    connections, including keep-alive connections between requests,
+    only take up a file descriptor.
+
+    Use :func:`make_server` to create a server instance.
+    """
+
+    multithread = True
+
+    # The event loop accepts connections quickly, but allow for many
+    # clients connecting at once.
+    request_queue_size = 1024
+
+    #: Close connections that have been idle for this many seconds while
+    #: waiting for a request. ``None`` keeps them open.
+    keep_alive_timeout: float | None = 75.0
+
+    #: Close connections that send a longer request line and headers.
+    max_head_size = 65536
+
+    #: Socket timeout in seconds while a worker handles a request, unless
+    #: the request handler sets its own ``timeout``. A client that stops
+    #: sending its request body, or stops reading the response, only
+    #: holds a worker this long.
+    socket_timeout: float | None = 30.0
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app: WSGIApplication,
+        workers: int | None = None,
+        handler: type[WSGIRequestHandler] | None = None,
+        passthrough_errors: bool = False,
+        ssl_context: _TSSLContextArg | None = None,
+        fd: int | None = None,
+    ) -> None:
+        if handler is None:
+            handler = SelectorWSGIRequestHandler
+        elif not issubclass(handler, SelectorWSGIRequestHandler):
+            handler = type(handler.__name__, (SelectorWSGIRequestHandler, handler), {})
+
+        super().__init__(host, port, app, handler, passthrough_errors, ssl_context, fd)
+        self.workers = workers
+
+        if self.ssl_context is not None:
+            # Handshakes happen in the event loop, they mustn't block it.
+            self.socket.do_handshake_on_connect = False  # type: ignore[attr-defined]
+
+        self._returned: queue.SimpleQueue[_Connection] = queue.SimpleQueue()
+        self._wakeup, self._waker = socket.socketpair()
+        self._waker.setblocking(False)
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        self._is_shut_down.clear()
+        self._shutdown_request = False
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="werkzeug")
+        selector = selectors.DefaultSelector()
+        self.socket.setblocking(False)
+        selector.register(self.socket, selectors.EVENT_READ)
+        selector.register(self._wakeup, selectors.EVENT_READ)
+        last_sweep = time.monotonic()
+
+        try:
+            while not self._shutdown_request:
+                for key, _ in selector.select(poll_interval):
+                    if key.fileobj is self.socket:
+                        self._accept(selector)
+                    elif key.fileobj is self._wakeup:
+                        self._wakeup.recv(4096)
+
+                        while not self._returned.empty():
+                            self._wait_for_request(selector, pool, self._returned.get())
+                    else:
+                        self._receive(selector, pool, key.data)
+
+                if time.monotonic() - last_sweep >= 1:
+                    self._close_idle(selector)
+                    last_sweep = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for key in list(selector.get_map().values()):
+                if isinstance(key.data, _Connection):
+                    self.shutdown_request(key.data.socket)
+
+            selector.close()
+            pool.shutdown()
+
+            while not self._returned.empty():
+                self.shutdown_request(self._returned.get().socket)
+
+            self._is_shut_down.set()
+            self.server_close()
+
+    def shutdown(self) -> None:
+        self._shutdown_request = True
+        self._wake()
+        self._is_shut_down.wait()
+
+    def server_close(self) -> None:
+        super().server_close()
+
+        if hasattr(self, "_wakeup"):
+            self._wakeup.close()
+            self._waker.close()
+
+    def _wake(self) -> None:
+        try:
+            self._waker.send(b"\0")
+        except OSError:
+            # Already woken up, or closed.
+            pass
+
+    def _accept(self, selector: selectors.BaseSelector) -> None:
+        while True:
+            try:
+                sock, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # Out of file descriptors, for example. The connection
+                # stays in the listen queue until one is closed.
+                self.log("error", f"Error accepting a connection: {e}")
+                return
+
+            sock.setblocking(False)
+            connection = _Connection(sock, address, self.ssl_context is not None)
+            selector.register(sock, selectors.EVENT_READ, connection)
+
+    def _receive(
+        self,
+        selector: selectors.BaseSelector,
+        pool: ThreadPoolExecutor,
+        connection: _Connection,
+    ) -> None:
+        connection.last_active = time.monotonic()
+        sock = connection.socket
+
+        try:
+            if connection.handshake:
+                sock.do_handshake()  # type: ignore[attr-defined]
+                connection.handshake = False
+
+            data = sock.recv(65536)
+
+            # TLS may have decrypted more than was asked for, which the
+            # selector doesn't know about.
+            while data and self.ssl_context is not None and sock.pending():  # type: ignore[attr-defined]
+                data += sock.recv(sock.pending())  # type: ignore[attr-defined]
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            if self.ssl_context is not None and isinstance(
+                e, (ssl.SSLWantReadError, ssl.SSLWantWriteError)
+            ):
+                return
+
+            data = b""
+
+        if not data:
+            selector.unregister(sock)
+            self.shutdown_request(sock)
+            return
+
+        connection.received += data
+
+        if not self._dispatch(pool, connection):
+            if len(connection.received) > self.max_head_size:
+                selector.unregister(sock)
+                self.shutdown_request(sock)
+        else:
+            selector.unregister(sock)
+
+    def _dispatch(self, pool: ThreadPoolExecutor, connection: _Connection) -> bool:
+        """Hand the connection to a worker if the head of a request has
+        been received.
+        """
+        if b"\r\n\r\n" not in connection.received and (
+            b"\n\n" not in connection.received
+        ):
+            return False
+
+        connection.reader = _ConnectionReader(
+            connection.socket, bytes(connection.received)
+        )
+        connection.received = bytearray()
+        pool.submit(self._process, connection)
+        return True
+
+    def _wait_for_request(
+        self,
+        selector: selectors.BaseSelector,
+        pool: ThreadPoolExecutor,
+        connection: _Connection,
+    ) -> None:
+        connection.last_active = time.monotonic()
+
+        # A pipelined request may already have been received.
+        if not self._dispatch(pool, connection):
+            selector.register(connection.socket, selectors.EVENT_READ, connection)
+
+    def _process(self, connection: _Connection) -> None:
+        handler = None
+
+        try:
+            handler = self.RequestHandlerClass(connection, connection.address, self)  # type: ignore[arg-type]
+        except Exception:
+            self.handle_error(connection.socket, connection.address)
+        finally:
+            if (
+                isinstance(handler, SelectorWSGIRequestHandler)
+                and handler.keep_alive
+                and not self._shutdown_request
+            ):
+                self._keep_alive(connection)
+            else:
+                self.shutdown_request(connection.socket)
+
+    def _keep_alive(self, connection: _Connection) -> None:
+        sock = connection.socket
+        connection.received = bytearray(connection.reader.pending())  # type: ignore[union-attr]
+        connection.reader = None
+
+        try:
+            while self.ssl_context is not None and sock.pending():  # type: ignore[attr-defined]
+                connection.received += sock.recv(sock.pending())  # type: ignore[attr-defined]
+
+            sock.setblocking(False)
+        except OSError:
+            self.shutdown_request(sock)
+            return
+
+        self._returned.put(connection)
+        self._wake()
+
+    def _close_idle(self, selector: selectors.BaseSelector) -> None:
+        if self.keep_alive_timeout is None:
+            return
+
+        deadline = time.monotonic() - self.keep_alive_timeout
+
+        for key in list(selector.get_map().values()):
+            if isinstance(key.data, _Connection) and key.data.last_active < deadline:
+                selector.unregister(key.fileobj)
+                self.shutdown_request(key.data.socket)
+
+
 def make_server(
     host: str,
     port: int,
@@ -913,9 +1455,11 @@ def make_server(
     passthrough_errors: bool = False,
     ssl_context: _TSSLContextArg | None = None,
     fd: int | None = None,
+    server: t.Literal["selector"] | None = None,
+    workers: int | None = None,
 ) -> BaseWSGIServer:
     """Create an appropriate WSGI server instance based on the value of
-    ``threaded`` and ``processes``.
+    ``server``, ``threaded`` and ``processes``.
 
     This is called from :func:`run_simple`, but can be used separately
     to have access to the server object, such as to run it in a separate
@@ -923,6 +1467,26 @@ def make_server(
 
     See :func:`run_simple` for parameter docs.
     """
+    if server is not None:
+        if server != "selector":
+            raise ValueError(f"Unknown server {server!r}.")
+
+        if threaded or processes > 1:
+            raise ValueError(
+                "The selector server cannot be combined with threaded or processes."
+            )
+
+        return SelectorWSGIServer(
+            host,
+            port,
+            app,
+            workers,
+            request_handler,
+            passthrough_errors,
+            ssl_context,
+            fd=fd,
+        )
+
     if threaded and processes > 1:
         raise ValueError("Cannot have a multi-thread and multi-process server.")
 
@@ -974,6 +1538,8 @@ def run_simple(
     static_files: dict[str, str | tuple[str, str]] | None = None,
     passthrough_errors: bool = False,
     ssl_context: _TSSLContextArg | None = None,
+    server: t.Literal["selector"] | None = None,
+    workers: int | None = None,
 ) -> None:
     """Start a development server for a WSGI application. Various
     optional features can be enabled.
@@ -1027,6 +1593,14 @@ def run_simple(
         :class:`ssl.SSLContext` object, a ``(cert_file, key_file)``
         tuple to create a typical context, or the string ``'adhoc'`` to
         generate a temporary self-signed certificate.
+    :param server: Pass ``'selector'`` to wait for requests on all
+        connections in one event loop and handle them in a fixed pool of
+        ``workers`` threads, see :class:`SelectorWSGIServer`. Idle and
+        keep-alive connections don't hold a thread. Cannot be used with
+        ``threaded`` or ``processes``.
+    :param workers: The number of worker threads of the ``'selector'``
+        server. Defaults to the :class:`~concurrent.futures.ThreadPoolExecutor`
+        default.
 
     .. versionchanged:: 2.1
         Instructions are shown for dealing with an "address already in
@@ -1100,6 +1674,8 @@ def run_simple(
         passthrough_errors,
         ssl_context,
         fd=fd,
+        server=server,
+        workers=workers,
     )
     srv.socket.set_inheritable(True)
     os.environ["WERKZEUG_SERVER_FD"] = str(srv.fileno())
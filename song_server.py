@@ -0,0 +1,90 @@
+import mimetypes
+import os
+
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from werkzeug.wsgi import _RangeWrapper, wrap_file
+
+BLOCK_SIZE = 64 * 1024
+
+
+# Strong validator for a file on disk: any change to size or mtime changes it
+def file_etag(st):
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+# Work out which byte range to send. Returns (start, stop), None for the whole
+# file, or False when the requested range can't be satisfied.
+def requested_range(request, etag, size):
+    rng = request.range
+    if rng is None or rng.units != "bytes" or len(rng.ranges) != 1:
+        return None
+
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None:
+        return None
+
+    return rng.range_for_length(size) or False
+
+
+# Serve a song file with conditional and partial responses so the <audio>
+# player can revalidate and seek without downloading the whole track again.
+#
+# If the WSGI server offers wsgi.file_wrapper (gunicorn, uWSGI, mod_wsgi) the
+# file is handed to it positioned at the range start, and the server can use
+# sendfile() bounded by Content-Length. Otherwise werkzeug's FileWrapper is
+# wrapped in a _RangeWrapper, which the dev server in serving.py also sends
+# with sendfile() from the range's offset.
+def serve_song(request, response_class, songs_dir, filename, max_age=3600):
+    path = safe_join(songs_dir, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    f = open(path, "rb")
+    try:
+        st = os.fstat(f.fileno())
+        etag = file_etag(st)
+        size = st.st_size
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+        if request.if_none_match.contains_weak(etag):
+            f.close()
+            response = response_class(status=304)
+        else:
+            byte_range = requested_range(request, etag, size)
+            if byte_range is False:
+                f.close()
+                response = response_class(status=416)
+                response.content_range = ContentRange("bytes", None, None, size)
+            elif byte_range is None:
+                response = response_class(
+                    wrap_file(request.environ, f, BLOCK_SIZE),
+                    mimetype=mimetype,
+                    direct_passthrough=True,
+                )
+                response.content_length = size
+            else:
+                start, stop = byte_range
+                length = stop - start
+                if "wsgi.file_wrapper" in request.environ:
+                    f.seek(start)
+                    body = request.environ["wsgi.file_wrapper"](f, BLOCK_SIZE)
+                else:
+                    body = _RangeWrapper(wrap_file(request.environ, f, BLOCK_SIZE), start, length)
+                response = response_class(body, status=206, mimetype=mimetype, direct_passthrough=True)
+                response.content_length = length
+                response.content_range = ContentRange("bytes", start, stop, size)
+    except BaseException:
+        f.close()
+        raise
+
+    response.set_etag(etag)
+    response.last_modified = st.st_mtime
+    response.accept_ranges = "bytes"
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
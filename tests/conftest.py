@@ -0,0 +1,77 @@
+# Run from the repository root with:
+#
+#   python -P -m pytest --rootdir=tests tests
+#
+# -P keeps the repository root off the front of sys.path: it holds vendored
+# modules (functools.py, typing_extensions.py, ...) that would shadow the
+# standard library. The root is appended instead, the way the benchmarks do.
+# --rootdir stops pytest from importing the root's __init__.py as a package.
+import importlib.util
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+
+# app.py keeps its stores in the working directory, so it's imported once
+# from a scratch directory holding a copy of the catalog, and requests are
+# made from that directory too
+@pytest.fixture(scope="session")
+def app_workdir(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("app")
+    shutil.copy(os.path.join(ROOT, "mood_songs.json"), workdir)
+    return workdir
+
+
+@pytest.fixture(scope="session")
+def app_module(app_workdir):
+    cwd = os.getcwd()
+    os.chdir(app_workdir)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def client(app_module, app_workdir, monkeypatch):
+    monkeypatch.chdir(app_workdir)
+    app_module.app.config["TESTING"] = True
+    return app_module.app.test_client()
+
+
+# Load this repository's copy of a werkzeug module (serving.py, map.py, ...)
+# into the installed werkzeug package. `siblings` are loaded first and stand
+# in for the package's own modules while `name` is imported; the package's
+# modules are put back afterwards so the rest of the session is unaffected.
+def load_werkzeug_module(package, name, siblings=()):
+    # The package's __init__ imports its own modules, so it has to run
+    # before any of them are replaced
+    importlib.import_module(package)
+    saved = {}
+    module = None
+    try:
+        for module_name in (*siblings, name):
+            spec = importlib.util.spec_from_file_location(
+                f"{package}._vibesync_{module_name}", os.path.join(ROOT, f"{module_name}.py")
+            )
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = module
+            if module_name in siblings:
+                qualified = f"{package}.{module_name}"
+                saved.setdefault(qualified, sys.modules.get(qualified))
+                sys.modules[qualified] = module
+            spec.loader.exec_module(module)
+    finally:
+        for qualified, original in saved.items():
+            if original is None:
+                sys.modules.pop(qualified, None)
+            else:
+                sys.modules[qualified] = original
+    return module
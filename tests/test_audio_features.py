@@ -0,0 +1,33 @@
+import json
+import wave
+
+import pytest
+
+import audio_features
+from audio_features import FeatureCache, extract_many
+
+
+def write_silence(path):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(b"\0\0" * 8000)
+    return str(path)
+
+
+# Every file's hash is saved before extraction starts, so a run that dies part
+# way doesn't have to hash the library again
+def test_manifest_is_saved_before_extraction(tmp_path, monkeypatch):
+    paths = [write_silence(tmp_path / f"{i}.wav") for i in range(3)]
+    cache = FeatureCache(str(tmp_path / "cache"))
+
+    def crash(path):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(audio_features, "_extract_one", crash)
+    with pytest.raises(KeyboardInterrupt):
+        extract_many(paths, cache, workers=1)
+
+    with open(cache.manifest_path, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == sorted(paths)
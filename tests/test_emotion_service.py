@@ -0,0 +1,22 @@
+from emotion_service import EmotionService
+
+
+def load_model():
+    def model(texts, batch_size=None):
+        return [[{"label": "joy", "score": 0.75}, {"label": "sadness", "score": 0.25}] for _ in texts]
+
+    return model
+
+
+# Callers may change the scores they get without changing anyone else's
+def test_cached_scores_are_copies():
+    service = EmotionService(loader=load_model)
+    first = service.scores("What a day")
+    first["happy"] = 0.0
+    first["bored"] = 1.0
+
+    second = service.scores("what  a DAY")
+    assert second == {"happy": 0.75, "sad": 0.25}
+    assert second is not service.scores("what a day")
+    assert service.predict("What a day") == "happy"
+    assert service.items == 1
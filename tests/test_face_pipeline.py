@@ -0,0 +1,45 @@
+import threading
+import time
+
+from face_pipeline import FaceAnalyzer
+
+
+class StubDetector:
+    def __init__(self, scores, delay=0.0):
+        self.scores = scores
+        self.delay = delay
+        self.batches = []
+
+    def analyze(self, frames):
+        self.batches.append(len(frames))
+        time.sleep(self.delay)
+        return [self.scores for _ in frames]
+
+
+def test_frames_vote_in_batches():
+    detector = StubDetector({"happy": 80.0, "sad": 20.0})
+    result = FaceAnalyzer(detector, samples=5, batch_size=2).analyze(list(range(10)))
+    assert detector.batches == [2, 2, 1]
+    assert result["mood"] == "happy"
+    assert result["frames"] == 5
+    assert not result["timed_out"]
+
+
+# A batch that is still running when the deadline passes doesn't hold the caller
+def test_deadline_stops_waiting_for_a_slow_batch():
+    release = threading.Event()
+
+    class SlowDetector(StubDetector):
+        def analyze(self, frames):
+            if self.batches:
+                release.wait(5)
+            return super().analyze(frames)
+
+    detector = SlowDetector({"sad": 1.0})
+    analyzer = FaceAnalyzer(detector, samples=4, batch_size=2, deadline=0.2)
+    start = time.monotonic()
+    result = analyzer.analyze(list(range(4)))
+    release.set()
+    assert time.monotonic() - start < 1.0
+    assert result["timed_out"]
+    assert result["frames"] == 2
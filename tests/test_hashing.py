@@ -0,0 +1,68 @@
+import time
+
+import bcrypt
+import pytest
+
+from hashing import HashingService, HashQueueFull, HashTimeout
+
+
+def slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def service():
+    service = HashingService(workers=1, max_queue=1, timeout=5)
+    yield service
+    service.shutdown()
+
+
+def wait_until_idle(service, timeout=10):
+    deadline = time.monotonic() + timeout
+    while service.metrics()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_hash_and_check(service):
+    hashed = service.hash_password(b"secret")
+    assert bcrypt.checkpw(b"secret", hashed)
+    assert service.check_password(b"secret", hashed)
+    assert not service.check_password(b"wrong", hashed)
+
+
+# A call that times out keeps its slot until the pool has finished it, so
+# the pool's real backlog never grows past workers + max_queue
+def test_timed_out_call_holds_its_slot(service):
+    service._run(slow, 0.0)  # start the worker process
+    service.timeout = 0.2
+    with pytest.raises(HashTimeout):
+        service._run(slow, 2.0)
+    metrics = service.metrics()
+    assert metrics["in_flight"] == 1
+    assert metrics["timed_out"] == 1
+
+    # The second slot: a call queued behind the slow one times out too and
+    # still counts until the pool gets to it
+    with pytest.raises(HashTimeout):
+        service._run(slow, 0.0)
+    assert service.metrics()["in_flight"] == 2
+    with pytest.raises(HashQueueFull):
+        service._run(slow, 0.0)
+
+    wait_until_idle(service)
+    assert service.metrics()["in_flight"] == 0
+    assert service._run(slow, 0.0) == 0.0
+
+
+def test_register_answers_503_when_hashing_times_out(client, app_module, monkeypatch):
+    def timeout(password):
+        raise HashTimeout()
+
+    monkeypatch.setattr(app_module.hasher, "hash_password", timeout)
+    # The templates aren't part of this checkout's layout
+    monkeypatch.setattr(app_module, "render_template", lambda name, **context: context.get("error", ""))
+    response = client.post(
+        "/register", data={"username": "slowpoke", "email": "s@example.com", "password": "pw", "confirm": "pw"}
+    )
+    assert response.status_code == 503
@@ -0,0 +1,104 @@
+import multiprocessing
+
+import pytest
+
+from history import MAX_DURATION, HistoryStore
+
+
+def event(url, mood="happy", event="play", ts=1000.0, duration=30):
+    return {"url": url, "title": url.rsplit("/", 1)[-1], "mood": mood, "event": event, "ts": ts, "duration": duration}
+
+
+def test_last_returns_newest_first(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.ingest("ana", [event(f"/songs/{i}.wav", ts=float(i)) for i in range(5)])
+    assert [e["url"] for e in store.last("ana", 3)] == ["/songs/4.wav", "/songs/3.wav", "/songs/2.wav"]
+
+
+def test_compaction_keeps_order(tmp_path):
+    store = HistoryStore(str(tmp_path), segment_records=4, max_segments=2)
+    store.ingest("ana", [event(f"/songs/{i}.wav", ts=float(i + 1)) for i in range(30)])
+    store.compact("ana")
+    assert [e["ts"] for e in store.last("ana", 30)] == [float(i) for i in range(30, 0, -1)]
+
+
+def ingest_from_process(root, worker, count):
+    store = HistoryStore(root, segment_records=16, max_segments=2)
+    for i in range(count):
+        store.ingest("ana", [event(f"/songs/w{worker}-{i}.wav", ts=float(i))])
+        store.ingest(f"user{worker}", [event(f"/songs/shared-{i % 5}.wav")])
+
+
+# Forked workers sharing one store: every record has to decode to the song
+# its process wrote, however the song ids were handed out
+def test_processes_share_song_ids_and_segments(tmp_path):
+    root = str(tmp_path)
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=ingest_from_process, args=(root, w, 40)) for w in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = HistoryStore(root)
+    events = store.last("ana", 1000)
+    assert len(events) == 160
+    assert sorted(e["url"] for e in events) == sorted(f"/songs/w{w}-{i}.wav" for w in range(4) for i in range(40))
+    for w in range(4):
+        assert {e["url"] for e in store.last(f"user{w}", 100)} == {f"/songs/shared-{i}.wav" for i in range(5)}
+    urls = [line.split("\t")[0] for line in (tmp_path / "songs.tsv").read_text().splitlines()]
+    assert len(urls) == len(set(urls))
+
+
+def test_mood_counts_catch_up_with_other_writers(tmp_path):
+    reader = HistoryStore(str(tmp_path))
+    writer = HistoryStore(str(tmp_path), segment_records=4, max_segments=2)
+    writer.ingest("ana", [event("/songs/a.wav", mood="sad")] * 3)
+    assert reader.mood_counts("ana")["sad"] == 3
+
+    writer.ingest("ana", [event("/songs/b.wav", mood="happy")] * 10 + [event("/songs/b.wav", event="skip")])
+    counts = reader.mood_counts("ana")
+    assert counts["sad"] == 3
+    assert counts["happy"] == 10
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        {"ts": float("nan")},
+        {"ts": float("inf")},
+        {"ts": "soon"},
+        {"ts": [1]},
+        {"duration": float("inf")},
+        {"duration": "long"},
+        {"event": "rewind"},
+        {"title": 5},
+        {"url": None},
+    ],
+)
+def test_ingest_rejects_malformed_events_before_writing(tmp_path, bad):
+    store = HistoryStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.ingest("ana", [event("/songs/a.wav"), {**event("/songs/b.wav"), **bad}])
+    assert store.last("ana", 10) == []
+
+
+def test_ingest_clamps_duration_and_coerces_ts(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.ingest("ana", [event("/songs/a.wav", ts="12.5", duration=-3), event("/songs/b.wav", duration=10**9)])
+    newest, oldest = store.last("ana", 2)
+    assert (oldest["ts"], oldest["duration"]) == (12.5, 0)
+    assert newest["duration"] == MAX_DURATION
+
+
+def test_history_events_endpoint_answers_400_for_bad_events(client):
+    with client.session_transaction() as session:
+        session["username"] = "ana"
+    response = client.post("/history/events", json={"events": [event("/songs/a.wav", ts=float("inf"))]})
+    assert response.status_code == 400
+    assert client.post("/history/events", json={"events": "nope"}).status_code == 400
+    assert client.post("/history/events", json=[1]).get_json() == {"ingested": 0}
+
+    response = client.post("/history/events", json={"events": [event("/songs/a.wav", ts="1000")]})
+    assert response.get_json() == {"ingested": 1}
@@ -0,0 +1,55 @@
+import time
+
+from player import NullSink, Player
+
+
+def make_player(sink, announced):
+    # The tests poll by hand; the watcher thread never gets to
+    return Player(sink, on_track=announced.append, poll_interval=3600)
+
+
+def poll_until(player, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        player.poll()
+        time.sleep(0.005)
+
+
+def test_next_track_is_queued_and_takes_over_without_a_gap():
+    sink = NullSink()
+    announced = []
+    player = make_player(sink, announced)
+    assert player.play(["a.wav", "b.wav", "c.wav"], loop=False)
+
+    poll_until(player, lambda: ("queue", "b.wav") in sink.events)
+    sink.finish()
+    player.poll()
+    assert player.current_track == "b.wav"
+    # b was already on the sink, so it wasn't started again
+    assert ("play", "b.wav") not in sink.events
+    assert announced == ["a.wav", "b.wav"]
+
+
+def test_tracks_that_fail_to_decode_are_skipped():
+    class BrokenSink(NullSink):
+        def decode(self, path):
+            if path.startswith("bad"):
+                raise ValueError("not audio")
+            return super().decode(path)
+
+    sink = BrokenSink()
+    player = make_player(sink, [])
+    assert player.play(["bad.wav", "good.wav"])
+    assert player.current_track == "good.wav"
+    assert ("play", "good.wav") in sink.events
+
+
+def test_playback_stops_at_the_end_without_loop():
+    sink = NullSink()
+    player = make_player(sink, [])
+    player.play(["a.wav"], loop=False)
+    sink.finish()
+    player.poll()
+    assert not player.playing
+    assert player.current_track is None
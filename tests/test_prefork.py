@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+import signal
+import socket
+
+from prefork import PreforkServer
+
+
+def app(environ, start_response):
+    start_response("200 OK", [("Content-Length", "2")])
+    return [b"ok"]
+
+
+def serve(ports, exits_path):
+    def before_exit():
+        with open(exits_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+
+    server = PreforkServer(app, port=0, workers=1, keepalive_timeout=1, graceful_timeout=2, before_exit=before_exit)
+    server.preload = lambda: ports.put(server.port)
+    server.run()
+
+
+# Workers leave with os._exit, so before_exit is their only chance to save
+def test_workers_run_before_exit_when_stopped(tmp_path):
+    exits_path = str(tmp_path / "exits")
+    context = multiprocessing.get_context("fork")
+    ports = context.Queue()
+    parent = context.Process(target=serve, args=(ports, exits_path))
+    parent.start()
+    try:
+        port = ports.get(timeout=30)
+        with socket.create_connection(("127.0.0.1", port), timeout=10) as sock:
+            sock.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            assert sock.recv(1024).startswith(b"HTTP/1.1 200")
+    finally:
+        os.kill(parent.pid, signal.SIGTERM)
+        parent.join(30)
+    assert parent.exitcode == 0
+    with open(exits_path) as f:
+        pids = f.read().split()
+    assert len(pids) == 1 and int(pids[0]) != parent.pid
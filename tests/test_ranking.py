@@ -0,0 +1,117 @@
+import json
+import multiprocessing
+
+import pytest
+
+from history import HistoryStore
+from ranking import Reranker
+
+
+def test_snapshots_from_several_processes_are_merged(tmp_path):
+    path = str(tmp_path / "ranking.json")
+    first = Reranker(path)
+    second = Reranker(path)
+    first.record("ana", "/songs/a.wav", "play", 100.0)
+    second.record("ana", "/songs/a.wav", "play", 200.0)
+    second.record("ana", "/songs/b.wav", "skip", 150.0)
+
+    assert first.snapshot()
+    assert second.snapshot()
+    assert not second.snapshot()
+
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    counters = snapshot["counters"]
+    assert snapshot["events"] == {"ana": 3}
+    assert counters["ana"]["/songs/a.wav"] == [2, 0, 200.0]
+    assert counters["ana"]["/songs/b.wav"] == [0, 1, 0.0]
+    # The second snapshot also brought the first process's events in
+    assert second._counters == counters
+
+
+def test_played_songs_rank_first(tmp_path):
+    reranker = Reranker(str(tmp_path / "ranking.json"))
+    for _ in range(5):
+        reranker.record("ana", "/songs/b.wav", "play", 100.0)
+    reranker.record("ana", "/songs/a.wav", "skip", 100.0)
+    songs = [{"url": "/songs/a.wav"}, {"url": "/songs/b.wav"}]
+    assert [s["url"] for s in reranker.rank("ana", songs, now=100.0)] == ["/songs/b.wav", "/songs/a.wav"]
+
+
+def test_bad_ts_changes_nothing(tmp_path):
+    reranker = Reranker(str(tmp_path / "ranking.json"))
+    with pytest.raises(ValueError):
+        reranker.record("ana", "/songs/a.wav", "play", "yesterday")
+    assert not reranker.has_history("ana")
+    assert not reranker.snapshot()
+
+
+def ingest_and_record(store, reranker, user, events):
+    store.ingest(user, events)
+    for event in events:
+        reranker.record(user, event["url"], event["event"], event["ts"])
+
+
+# Events recorded after the last snapshot by a process that then stopped
+# are rebuilt from the history log
+def test_load_catches_up_with_the_history(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    path = str(tmp_path / "ranking.json")
+    first = Reranker(path, history=store)
+    ingest_and_record(store, first, "ana", [{"url": "/songs/a.wav", "event": "play", "ts": 100.0}])
+    assert first.snapshot()
+    ingest_and_record(store, first, "ana", [
+        {"url": "/songs/a.wav", "event": "play", "ts": 300.0},
+        {"url": "/songs/b.wav", "event": "skip", "ts": 200.0},
+    ])
+    ingest_and_record(store, first, "bo", [{"url": "/songs/c.wav", "event": "play", "ts": 50.0}])
+
+    second = Reranker(path, history=store)
+    assert second._counters == first._counters
+    assert second._counters["ana"]["/songs/a.wav"] == [2, 0, 300.0]
+    # The rebuilt counters were saved, so the next load has nothing to replay
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["events"] == {"ana": 3, "bo": 1}
+
+
+def test_load_replays_a_snapshot_without_event_counts(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    store.ingest("ana", [{"url": "/songs/a.wav", "event": "play", "ts": 100.0}] * 2)
+    path = tmp_path / "ranking.json"
+    path.write_text(json.dumps({"ana": {"/songs/a.wav": [1, 0, 100.0]}}), encoding="utf-8")
+    assert Reranker(str(path), history=store)._counters == {"ana": {"/songs/a.wav": [2, 0, 100.0]}}
+
+
+# A process with nothing of its own to snapshot still picks up the others'
+def test_idle_process_takes_other_processes_counters(tmp_path):
+    path = str(tmp_path / "ranking.json")
+    busy = Reranker(path)
+    idle = Reranker(path)
+    busy.record("ana", "/songs/a.wav", "play", 100.0)
+    assert busy.snapshot()
+
+    assert not idle.snapshot()
+    assert idle.has_history("ana")
+    assert idle._counters == busy._counters
+    # Nothing changed since, so the file isn't read again
+    assert not idle.refresh()
+
+
+def check_forked_counters(reranker, results):
+    results.put(reranker._counters)
+
+
+def test_forked_worker_starts_from_the_file(tmp_path):
+    path = str(tmp_path / "ranking.json")
+    parent = Reranker(path)
+    other = Reranker(path)
+    other.record("ana", "/songs/a.wav", "play", 100.0)
+    other.snapshot()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=check_forked_counters, args=(parent, results))
+    child.start()
+    assert results.get(timeout=30) == {"ana": {"/songs/a.wav": [1, 0, 100.0]}}
+    child.join(30)
+    assert parent._counters == {}
@@ -0,0 +1,52 @@
+import wave
+
+import numpy as np
+import pytest
+
+from audio_features import load_mono
+from recommender import Recommender
+
+
+def test_growing_keeps_rows_and_survives_reopening(tmp_path):
+    recommender = Recommender(str(tmp_path), initial_capacity=2)
+    for i in range(5):
+        recommender.add(f"{i}.wav", [float(i), float(i), float(i)])
+    recommender.flush()
+    assert recommender._matrix.shape[0] == 8
+    assert not (tmp_path / "features.npy.tmp").exists()
+
+    reopened = Recommender(str(tmp_path))
+    assert reopened.tracks == [f"{i}.wav" for i in range(5)]
+    assert reopened._matrix[4].tolist() == [4.0, 4.0, 4.0]
+
+
+def test_unknown_mood_recommends_nothing(tmp_path):
+    recommender = Recommender(str(tmp_path))
+    recommender.add("a.wav", [120.0, 0.5, 2000.0])
+    recommender.add("b.wav", [80.0, 0.1, 800.0])
+    assert recommender.top_k("bored") == []
+    assert recommender.top_k({"bored": 1.0}) == []
+    assert [name for name, _ in recommender.top_k("happy", 1)] == ["a.wav"]
+
+
+def write_wav(path, sampwidth, channels, frames):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sampwidth)
+        f.setframerate(8000)
+        f.writeframes(frames)
+
+
+# 8-bit WAV is unsigned: 0 is the most negative sample, 128 silence
+def test_load_mono_scales_unsigned_8_bit(tmp_path):
+    path = tmp_path / "u8.wav"
+    write_wav(path, 1, 2, bytes([0, 0, 128, 128, 255, 255]))
+    _, samples = load_mono(str(path))
+    assert samples.tolist() == pytest.approx([-1.0, 0.0, 127 / 128])
+
+
+def test_load_mono_scales_stereo_16_bit(tmp_path):
+    path = tmp_path / "s16.wav"
+    write_wav(path, 2, 2, np.array([32767, 32767, -32767, 0], dtype="<i2").tobytes())
+    _, samples = load_mono(str(path))
+    assert samples.tolist() == pytest.approx([1.0, -0.5])
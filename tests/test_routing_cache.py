@@ -0,0 +1,117 @@
+import sys
+
+import pytest
+from werkzeug.exceptions import NotFound
+
+from conftest import load_werkzeug_module
+
+routing_map = load_werkzeug_module("werkzeug.routing", "map", siblings=("converters", "rules", "matcher"))
+converters = sys.modules["werkzeug.routing._vibesync_converters"]
+Map, Rule = routing_map.Map, routing_map.Rule
+
+
+class StateConverter(converters.BaseConverter):
+    state = "a"
+
+    def to_url(self, value):
+        return f"{type(self).state}{value}"
+
+
+def test_build_cache_hits_for_plain_values():
+    urls = Map([Rule("/songs/<int:id>", endpoint="song")], build_cache_size=8).bind("localhost")
+    assert urls.build("song", {"id": 1}) == "/songs/1"
+    assert urls.build("song", {"id": 1}) == "/songs/1"
+    assert urls.build_many("song", [{"id": 1}, {"id": 2}]) == ["/songs/1", "/songs/2"]
+    assert urls.map.build_cache_info().hits == 2
+
+
+# A converter whose to_url reads state mustn't be answered from the cache
+def test_build_cache_skips_stateful_converters():
+    assert not StateConverter.build_cacheable
+    m = Map(
+        [Rule("/s/<state:value>", endpoint="s")],
+        converters={"state": StateConverter},
+        build_cache_size=8,
+    )
+    urls = m.bind("localhost")
+    assert urls.build("s", {"value": "1"}) == "/s/a1"
+
+    StateConverter.state = "b"
+    try:
+        assert urls.build("s", {"value": "1"}) == "/s/b1"
+        assert urls.build_many("s", [{"value": "1"}]) == ["/s/b1"]
+    finally:
+        StateConverter.state = "a"
+    assert m.build_cache_info().currsize == 0
+
+
+def song_map(**options):
+    return Map([Rule("/songs/<name>", endpoint="song"), Rule("/", endpoint="index")], match_cache_size=2, **options)
+
+
+def test_match_cache_counts_hits_and_misses():
+    m = song_map()
+    urls = m.bind("localhost")
+    assert urls.match("/songs/a") == ("song", {"name": "a"})
+    assert urls.match("/songs/a") == ("song", {"name": "a"})
+    assert urls.match("/songs/b") == ("song", {"name": "b"})
+    info = m.match_cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 2, 2, 2)
+
+    # The least recently used entry goes first
+    urls.match("/songs/a")
+    urls.match("/")
+    urls.match("/songs/a")
+    urls.match("/songs/b")
+    info = m.match_cache_info()
+    assert (info.hits, info.misses) == (3, 4)
+
+
+def test_match_cache_hands_out_copies():
+    urls = song_map().bind("localhost")
+    urls.match("/songs/a")[1]["name"] = "changed"
+    assert urls.match("/songs/a") == ("song", {"name": "a"})
+
+
+def test_failed_matches_are_not_cached():
+    m = song_map()
+    urls = m.bind("localhost")
+    for _ in range(2):
+        with pytest.raises(NotFound):
+            urls.match("/albums/a")
+    assert m.match_cache_info().currsize == 0
+
+
+def test_adding_a_rule_clears_the_match_cache():
+    m = song_map()
+    urls = m.bind("localhost")
+    assert urls.match("/songs/new") == ("song", {"name": "new"})
+
+    m.add(Rule("/songs/new", endpoint="new"))
+    assert m.match_cache_info().currsize == 0
+    assert urls.match("/songs/new") == ("new", {})
+    # update() re-sorts the rules after an add and clears again
+    m._remap = True
+    m.update()
+    assert m.match_cache_info().currsize == 0
+
+
+def test_converters_with_their_own_to_python_are_not_cached():
+    calls = []
+
+    class LookupConverter(converters.BaseConverter):
+        def to_python(self, value):
+            calls.append(value)
+            return value.upper()
+
+    assert not LookupConverter.match_cacheable
+    m = Map(
+        [Rule("/songs/<lookup:name>", endpoint="song")],
+        converters={"lookup": LookupConverter},
+        match_cache_size=8,
+    )
+    urls = m.bind("localhost")
+    assert urls.match("/songs/a") == ("song", {"name": "A"})
+    assert urls.match("/songs/a") == ("song", {"name": "A"})
+    assert calls == ["a", "a"]
+    assert m.match_cache_info().currsize == 0
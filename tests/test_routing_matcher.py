@@ -0,0 +1,83 @@
+import sys
+
+from conftest import load_werkzeug_module
+
+routing_map = load_werkzeug_module("werkzeug.routing", "map", siblings=("converters", "rules", "matcher"))
+converters = sys.modules["werkzeug.routing._vibesync_converters"]
+Map, Rule = routing_map.Map, routing_map.Rule
+
+
+# Rules can only be bound to one map, so each call binds copies
+def match(rules, path, **options):
+    return Map([rule.empty() for rule in rules], **options).bind("localhost").match(path)
+
+
+# Transitions are tried by weight, whatever order the rules were added in
+def test_rules_are_tried_by_weight():
+    rules = [Rule("/x/<name>", endpoint="name"), Rule("/x/<int:id>", endpoint="int")]
+    assert match(rules, "/x/5") == ("int", {"id": 5})
+    assert match(rules[::-1], "/x/5") == ("int", {"id": 5})
+    assert match(rules, "/x/five") == ("name", {"name": "five"})
+
+    rules = [Rule("/f/<path:rest>", endpoint="path"), Rule("/f/<name>", endpoint="name")]
+    assert match(rules, "/f/a") == ("name", {"name": "a"})
+    assert match(rules, "/f/a/b") == ("path", {"rest": "a/b"})
+
+
+# The first alternative that matches the segment leads nowhere, so the
+# matcher has to go back and try the ones after it
+def test_backtracks_into_a_later_alternative():
+    rules = [Rule("/a/<int:id>/edit", endpoint="edit"), Rule("/a/<name>/view", endpoint="view")]
+    assert match(rules, "/a/5/view") == ("view", {"name": "5"})
+    assert match(rules, "/a/5/edit") == ("edit", {"id": 5})
+
+
+class RangeConverter(converters.BaseConverter):
+    regex = r"(\d+)-(\d+)"
+
+    def to_python(self, value):
+        start, end = value.split("-")
+        return int(start), int(end)
+
+
+class NamedConverter(converters.BaseConverter):
+    regex = r"(?P<code>[a-z]{2})"
+
+
+# Groups inside a converter's regex shift the group numbers of every
+# alternative after it
+def test_converters_whose_regex_has_groups():
+    rules = [
+        Rule("/r/<range:span>", endpoint="range"),
+        Rule("/r/<range:span>.<int:page>", endpoint="page"),
+        Rule("/r/<name>", endpoint="name"),
+    ]
+    options = {"converters": {"range": RangeConverter}}
+    assert match(rules, "/r/1-2", **options) == ("range", {"span": (1, 2)})
+    assert match(rules, "/r/1-2.3", **options) == ("page", {"span": (1, 2), "page": 3})
+    assert match(rules, "/r/x", **options) == ("name", {"name": "x"})
+
+
+# Named groups can't repeat in one alternation, so the transitions are
+# tried one at a time
+def test_converters_with_named_groups_fall_back():
+    rules = [
+        Rule("/n/<lang:code>", endpoint="lang"),
+        Rule("/n/<lang:code>.<int:page>", endpoint="page"),
+    ]
+    options = {"converters": {"lang": NamedConverter}}
+    assert match(rules, "/n/en", **options) == ("lang", {"code": "en"})
+    assert match(rules, "/n/en.2", **options) == ("page", {"code": "en", "page": 2})
+
+
+# Converter groups are ordered by number, not by name: __werkzeug_10 comes
+# after __werkzeug_9
+def test_more_than_ten_converters_in_one_segment():
+    names = [f"v{i}" for i in range(12)]
+    rules = [
+        Rule("/m/" + "-".join(f"<int:{name}>" for name in names), endpoint="many"),
+        Rule("/m/<name>", endpoint="name"),
+    ]
+    path = "/m/" + "-".join(str(i) for i in range(12))
+    assert match(rules, path) == ("many", {name: i for i, name in enumerate(names)})
+    assert match(rules, "/m/x") == ("name", {"name": "x"})
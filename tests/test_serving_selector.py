@@ -0,0 +1,103 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from conftest import load_werkzeug_module
+
+serving = load_werkzeug_module("werkzeug", "serving")
+
+
+def app(environ, start_response):
+    path = environ["PATH_INFO"]
+    if path == "/broken":
+        # Promises ten bytes, sends three, then fails
+        start_response("200 OK", [("Content-Length", "10")])
+
+        def body():
+            yield b"abc"
+            raise RuntimeError("failed mid-response")
+
+        return body()
+    if path == "/upload":
+        body = environ["wsgi.input"].read()
+        start_response("200 OK", [("Content-Length", str(len(body)))])
+        return [body]
+    start_response("200 OK", [("Content-Length", "2")])
+    return [b"ok"]
+
+
+class QuietHandler(serving.WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(**attrs):
+        srv = serving.make_server(
+            "127.0.0.1", 0, app, request_handler=QuietHandler, server="selector", workers=1
+        )
+        srv.log = lambda *args: None
+        for name, value in attrs.items():
+            setattr(srv, name, value)
+        thread = threading.Thread(target=srv.serve_forever, daemon=True)
+        thread.start()
+        servers.append((srv, thread))
+        return srv
+
+    yield start
+    for srv, thread in servers:
+        srv.shutdown()
+        thread.join(5)
+
+
+def request(path, extra=b""):
+    return f"GET {path} HTTP/1.1\r\nHost: localhost\r\n".encode() + extra + b"\r\n"
+
+
+def read_all(sock, timeout=5):
+    sock.settimeout(timeout)
+    data = b""
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def test_keep_alive_serves_pipelined_requests(server):
+    srv = server()
+    with socket.create_connection(("127.0.0.1", srv.port)) as sock:
+        sock.sendall(request("/") + request("/") + request("/", b"Connection: close\r\n"))
+        data = read_all(sock)
+    assert data.count(b"HTTP/1.1 200 OK") == 3
+
+
+def test_error_after_headers_closes_connection(server):
+    srv = server()
+    with socket.create_connection(("127.0.0.1", srv.port)) as sock:
+        sock.sendall(request("/broken") + request("/"))
+        data = read_all(sock)
+    # Only the broken response's start, never the next response in its body
+    assert data.count(b"HTTP/1.1 ") == 1
+    assert data.endswith(b"\r\n\r\nabc")
+
+
+def test_stalled_request_body_releases_worker(server):
+    srv = server(socket_timeout=0.5)
+    with socket.create_connection(("127.0.0.1", srv.port)) as stalled:
+        stalled.sendall(
+            b"POST /upload HTTP/1.1\r\nHost: localhost\r\nContent-Length: 100\r\n\r\n" + b"x" * 10
+        )
+        start = time.monotonic()
+        read_all(stalled)
+        assert time.monotonic() - start < 5
+
+        # The only worker is free again
+        with socket.create_connection(("127.0.0.1", srv.port)) as sock:
+            sock.sendall(request("/", b"Connection: close\r\n"))
+            assert read_all(sock).endswith(b"\r\n\r\nok")
@@ -0,0 +1,139 @@
+import io
+import os
+import socket
+import threading
+
+import pytest
+from werkzeug.wsgi import _RangeWrapper, wrap_file
+
+from conftest import load_werkzeug_module
+
+serving = load_werkzeug_module("werkzeug", "serving")
+
+DATA = os.urandom(300 * 1024)
+START, LENGTH = 1000, 200 * 1024
+SKIPPED = 4096
+
+
+def make_app(path):
+    def app(environ, start_response):
+        name = environ["PATH_INFO"]
+        if name == "/bytesio":
+            body = wrap_file(environ, io.BytesIO(DATA))
+            start_response("200 OK", [("Content-Length", str(len(DATA)))])
+            return body
+
+        f = open(path, "rb")
+        if name == "/whole":
+            start_response("200 OK", [("Content-Length", str(len(DATA)))])
+            return wrap_file(environ, f)
+        if name == "/seeked":
+            f.seek(START)
+            start_response("200 OK", [("Content-Length", str(len(DATA) - START))])
+            return wrap_file(environ, f)
+        if name == "/range":
+            start_response("206 Partial Content", [("Content-Length", str(LENGTH))])
+            return _RangeWrapper(wrap_file(environ, f), START, LENGTH)
+        if name == "/range-read":
+            # The app already took the first block off the range
+            body = _RangeWrapper(wrap_file(environ, f, SKIPPED), START, LENGTH)
+            next(body)
+            start_response("206 Partial Content", [("Content-Length", str(LENGTH - SKIPPED))])
+            return body
+        if name == "/chunked":
+            start_response("200 OK", [])
+            return wrap_file(environ, f)
+        raise AssertionError(name)
+
+    return app
+
+
+EXPECTED = {
+    "/whole": DATA,
+    "/seeked": DATA[START:],
+    "/range": DATA[START : START + LENGTH],
+    "/range-read": DATA[START + SKIPPED : START + LENGTH],
+    "/bytesio": DATA,
+    "/chunked": DATA,
+}
+
+
+class QuietHandler(serving.WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    path = tmp_path / "song.wav"
+    path.write_bytes(DATA)
+
+    # Counts the bodies sent with sendfile() instead of write()
+    sent = []
+    sendfile = socket.socket.sendfile
+
+    def counting_sendfile(sock, file, offset=0, count=None):
+        sent.append((offset, count))
+        return sendfile(sock, file, offset, count)
+
+    monkeypatch.setattr(socket.socket, "sendfile", counting_sendfile)
+    srv = serving.make_server(
+        "127.0.0.1", 0, make_app(str(path)), request_handler=QuietHandler, server="selector", workers=1
+    )
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv, sent
+    srv.shutdown()
+    thread.join(5)
+
+
+def read_response(f):
+    status = f.readline()
+    headers = {}
+    while True:
+        line = f.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "content-length" in headers:
+        return status, headers, f.read(int(headers["content-length"]))
+    body = b""
+    while True:
+        size = int(f.readline(), 16)
+        chunk = f.read(size + 2)
+        if not size:
+            return status, headers, body
+        body += chunk[:-2]
+
+
+# All of them over one keep-alive connection, so a body that came out too
+# long or short shows up in the responses after it too
+def fetch(srv, paths):
+    with socket.create_connection(("127.0.0.1", srv.port), timeout=10) as sock:
+        f = sock.makefile("rb")
+        for path in paths:
+            sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            yield path, read_response(f)
+
+
+def test_file_bodies_are_sent_with_sendfile(server):
+    srv, sent = server
+    paths = ["/whole", "/seeked", "/range", "/whole"]
+    for path, (status, _, body) in fetch(srv, paths):
+        assert status.startswith(b"HTTP/1.1 2")
+        assert body == EXPECTED[path]
+    assert sent == [(0, None), (START, None), (START, LENGTH), (0, None)]
+
+
+@pytest.mark.parametrize("path", ["/range-read", "/bytesio", "/chunked"])
+def test_other_bodies_fall_back_to_write(server, path):
+    srv, sent = server
+    responses = dict(fetch(srv, [path, "/range"]))
+    for name, (status, _, body) in responses.items():
+        assert status.startswith(b"HTTP/1.1 2")
+        assert body == EXPECTED[name]
+    if path == "/chunked":
+        assert responses[path][1]["transfer-encoding"] == "chunked"
+    # Only the /range request after it went through sendfile
+    assert sent == [(START, LENGTH)]
@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+import time
+
+from transcode import TranscodeCache, _Transcode
+
+
+def make_cache(tmp_path, **options):
+    songs = tmp_path / "songs"
+    songs.mkdir()
+    return TranscodeCache(str(tmp_path / "cache"), **options), songs
+
+
+def add_song(songs, name, data):
+    path = songs / name
+    path.write_bytes(data)
+    return str(path)
+
+
+# A hit mustn't change the mtime the ETag and Last-Modified come from
+def test_lookup_keeps_the_cached_file_mtime(tmp_path):
+    cache, songs = make_cache(tmp_path)
+    song = add_song(songs, "a.wav", b"a" * 100)
+    target = cache.cache_path(song, "audio/mpeg")
+    with open(target, "wb") as f:
+        f.write(b"mp3")
+    os.utime(target, (1000, 1000))
+
+    assert cache.lookup(song, "audio/mpeg") == target
+    assert os.stat(target).st_mtime == 1000
+
+
+def test_evict_drops_least_recently_looked_up(tmp_path):
+    cache, songs = make_cache(tmp_path, max_bytes=150)
+    paths = {}
+    for i, name in enumerate(["old.wav", "new.wav"]):
+        song = add_song(songs, name, name.encode())
+        paths[name] = cache.cache_path(song, "audio/mpeg")
+        with open(paths[name], "wb") as f:
+            f.write(b"x" * 100)
+        # old.wav was written later, but is the one looked up last
+        os.utime(paths[name], (1000 - i, 1000 - i))
+        if name == "old.wav":
+            cache.lookup(song, "audio/mpeg")
+
+    cache.evict()
+    assert os.path.exists(paths["old.wav"])
+    assert not os.path.exists(paths["new.wav"])
+
+
+def test_finish_installs_the_file_and_cleans_up(tmp_path):
+    cache, songs = make_cache(tmp_path)
+    target = os.path.join(cache.cache_dir, "song.mp3")
+    stale = os.path.join(cache.cache_dir, "crashed.mp3.part")
+    open(stale, "wb").close()
+
+    tmp_path_part = os.path.join(cache.cache_dir, "job.mp3.part")
+    job = _Transcode([sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'encoded')"], tmp_path_part)
+    cache._running[target] = job
+    job.thread.start()
+    cache._finish(job, target)
+
+    with open(target, "rb") as f:
+        assert f.read() == b"encoded"
+    assert target not in cache._running
+    assert not [name for name in os.listdir(cache.cache_dir) if name.endswith(".part")]
+
+
+def encoder_command(data):
+    return [sys.executable, "-c", f"import sys; sys.stdout.buffer.write({data!r})"]
+
+
+# prefork workers share the cache directory, so a worker only removes temp
+# files of its own, of processes that are gone, or that have gone stale
+def test_remove_parts_spares_other_live_processes(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+
+    def part(pid, name):
+        path = os.path.join(cache.cache_dir, f"{pid}-{name}.mp3.part")
+        open(path, "wb").close()
+        return path
+
+    live = part(os.getppid(), "live")
+    stale = part(os.getppid(), "stale")
+    os.utime(stale, (time.time() - 2 * 3600,) * 2)
+    gone = part(dead.pid, "gone")
+    mine = part(os.getpid(), "mine")
+
+    cache._remove_parts()
+    assert os.path.exists(live)
+    assert not any(os.path.exists(path) for path in (stale, gone, mine))
+
+
+def test_finish_survives_a_removed_part(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    target = os.path.join(cache.cache_dir, "song.mp3")
+    job = _Transcode(encoder_command(b"encoded"), cache._temp_file(".mp3.part"))
+    cache._running[target] = job
+    job.thread.start()
+    job.thread.join()
+    os.remove(job.tmp_path)
+
+    cache._finish(job, target)
+    assert not os.path.exists(target)
+    assert target not in cache._running
+
+
+def test_stream_encodes_again_when_the_part_is_gone(tmp_path, monkeypatch):
+    cache, songs = make_cache(tmp_path)
+    song = add_song(songs, "a.wav", b"a")
+    target = cache.cache_path(song, "audio/mpeg")
+    monkeypatch.setattr(cache, "_command", lambda path, variant: encoder_command(b"encoded"))
+    cache._running[target] = _Transcode(encoder_command(b"lost"), os.path.join(cache.cache_dir, "gone.mp3.part"))
+
+    assert b"".join(cache.stream(song, "audio/mpeg")) == b"encoded"
+    deadline = time.monotonic() + 10
+    while target in cache._running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with open(target, "rb") as f:
+        assert f.read() == b"encoded"
@@ -0,0 +1,65 @@
+import sqlite3
+import threading
+
+import pytest
+
+from user_store import SQLiteUserStore, UserStore
+
+
+def test_add_and_get(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / "users.db"))
+    assert store.add("ana", "ana@example.com", "hash")
+    assert not store.add("ana", "other@example.com", "hash")
+    assert store.get("ana") == {"email": "ana@example.com", "password": "hash"}
+    assert store.count() == 1
+    store.close()
+
+
+def test_store_implements_the_interface(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / "users.db"))
+    assert isinstance(store, UserStore)
+    with pytest.raises(TypeError):
+        UserStore()
+    store.close()
+
+
+def test_calls_after_close_raise(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / "users.db"))
+    store.add("ana", "ana@example.com", "hash")
+    assert store.get("ana") is not None  # cached now
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.get("ana")
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.add("bo", "bo@example.com", "hash")
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.count()
+
+
+# A connection opened by another thread is closed too, so it can't be used
+# (or leaked) after close()
+def test_close_closes_every_threads_connection(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / "users.db"), cache_size=0)
+    store.add("ana", "ana@example.com", "hash")
+    opened = threading.Event()
+    closed = threading.Event()
+    errors = []
+
+    def reader():
+        store.get("ana")
+        opened.set()
+        closed.wait(5)
+        try:
+            store.get("ana")
+        except sqlite3.ProgrammingError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    opened.wait(5)
+    store.close()
+    closed.set()
+    thread.join(5)
+    assert len(errors) == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.count()
@@ -0,0 +1,89 @@
+import io
+import wave
+from array import array
+
+import pytest
+
+from voice_stream import StubRecognizer, VoiceActivityDetector, VoiceStream, VoiceStreamManager
+
+RATE = 16000
+FRAME = RATE * 30 // 1000
+
+
+def tone(frames, amplitude):
+    return array("h", [amplitude, -amplitude] * (frames * FRAME // 2))
+
+
+def wav_bytes(samples, rate=RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("rate", [1, 10, 33])
+def test_rate_without_samples_per_frame_is_rejected(rate):
+    with pytest.raises(ValueError):
+        VoiceActivityDetector(sample_rate=rate)
+    with pytest.raises(ValueError):
+        VoiceStream(sample_rate=rate)
+
+
+@pytest.mark.parametrize("rate", [10, 11025, 44100])
+def test_manager_only_opens_supported_rates(rate):
+    manager = VoiceStreamManager(recognizer=StubRecognizer())
+    with pytest.raises(ValueError):
+        manager.open(rate)
+    assert manager.open(8000)
+
+
+def test_utterance_goes_to_recognizer_once_speech_ends():
+    recognizer = StubRecognizer("i feel happy")
+    manager = VoiceStreamManager(recognizer=recognizer, sample_rate=RATE)
+    stream_id = manager.open()
+
+    samples = tone(5, 10) + tone(40, 8000) + tone(40, 10)
+    assert manager.feed(stream_id, samples.tobytes()) == (True, "i feel happy")
+    assert recognizer.calls == 1
+    # The stream is gone once it has been answered
+    with pytest.raises(KeyError):
+        manager.feed(stream_id, tone(1, 10).tobytes())
+
+
+def test_final_chunk_without_speech_skips_recognizer():
+    recognizer = StubRecognizer()
+    manager = VoiceStreamManager(recognizer=recognizer, sample_rate=RATE)
+    stream_id = manager.open()
+    assert manager.feed(stream_id, tone(10, 10).tobytes(), final=True) == (True, None)
+    assert recognizer.calls == 0
+
+
+def test_wav_chunk_at_another_rate_is_rejected():
+    manager = VoiceStreamManager(recognizer=StubRecognizer(), sample_rate=RATE)
+    stream_id = manager.open()
+    with pytest.raises(ValueError):
+        manager.feed(stream_id, wav_bytes(tone(2, 10), rate=8000), is_wav=True)
+
+
+def test_stream_endpoint_rejects_unsupported_rate(client):
+    response = client.post("/voice/stream?rate=10")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_voice_job_rejects_unsupported_rate(client):
+    response = client.post("/jobs/voice?rate=10", data=b"\0\0" * 100)
+    assert response.status_code == 400
+    # Same message as the stream endpoint, both come from check_sample_rate
+    assert response.get_json() == client.post("/voice/stream?rate=10").get_json()
+
+
+def test_stream_endpoint_rejects_malformed_wav(client):
+    stream_id = client.post("/voice/stream").get_json()["session"]
+    response = client.post(
+        f"/voice/stream?session={stream_id}", data=b"RIFF\0\0\0\0WAVEjunk", content_type="audio/wav"
+    )
+    assert response.status_code == 400
@@ -0,0 +1,208 @@
+import atexit
+import hashlib
+import os
+import string
+import struct
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from multiprocessing import Lock as ProcessLock
+from multiprocessing import shared_memory
+
+_PUNCTUATION = str.maketrans({c: " " for c in string.punctuation})
+_stemmer = None
+
+
+# nltk is imported on first use so it isn't paid for at app startup
+@lru_cache(maxsize=8192)
+def _stem(word):
+    global _stemmer
+    if _stemmer is None:
+        from nltk.stem import PorterStemmer
+
+        _stemmer = PorterStemmer()
+    return _stemmer.stem(word)
+
+
+# Cache key for a phrase: lowercased, punctuation dropped, whitespace
+# collapsed and each word stemmed, so "I feel SAD!" and "i  feel sad" share
+# one entry
+def normalize_phrase(text):
+    words = (text or "").lower().translate(_PUNCTUATION).split()
+    return " ".join(_stem(word) for word in words)
+
+
+# Size- and TTL-bounded LRU of finished /text responses for this process.
+# Entries are (mood, body) pairs keyed on the normalized phrase.
+class TextResponseCache:
+    def __init__(self, max_entries=2048, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    def get(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, mood, body):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, mood, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": "local",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expired": self._expired,
+            }
+
+
+# Header: hits, misses, evictions, expired
+_HEADER = struct.Struct("<4Q")
+# Slot: key digest, expiry (wall clock), last used, mood length, body length
+_SLOT = struct.Struct("<16sddHI")
+_EMPTY = bytes(16)
+
+
+# Same interface as TextResponseCache, but the entries live in one
+# shared-memory block so every worker forked from the process that created
+# it reads and fills the same cache. The block is split into fixed-size
+# slots grouped into small sets; a key hashes to one set, and within a set
+# the least recently used slot is replaced. Responses too big for a slot are
+# simply not cached.
+class SharedTextResponseCache:
+    def __init__(self, slots=4096, slot_size=2048, ways=4, ttl=300.0):
+        self.ways = ways
+        self.sets = max(1, slots // ways)
+        self.slot_size = slot_size
+        self.ttl = ttl
+        self._lock = ProcessLock()
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=_HEADER.size + self.sets * ways * slot_size
+        )
+        self._shm.buf[: self._shm.size] = bytes(self._shm.size)
+        self._owner = os.getpid()
+        atexit.register(self.close)
+
+    @property
+    def max_entries(self):
+        return self.sets * self.ways
+
+    def _slots(self, digest):
+        first = _HEADER.size + (int.from_bytes(digest[:8], "little") % self.sets) * self.ways * self.slot_size
+        return range(first, first + self.ways * self.slot_size, self.slot_size)
+
+    def _count(self, field):
+        counts = list(_HEADER.unpack_from(self._shm.buf, 0))
+        counts[field] += 1
+        _HEADER.pack_into(self._shm.buf, 0, *counts)
+
+    def get(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        buf = self._shm.buf
+        now = time.time()
+        with self._lock:
+            for offset in self._slots(digest):
+                slot_digest, expires, _, mood_len, body_len = _SLOT.unpack_from(buf, offset)
+                if slot_digest != digest:
+                    continue
+                if expires <= now:
+                    _SLOT.pack_into(buf, offset, _EMPTY, 0.0, 0.0, 0, 0)
+                    self._count(3)
+                    break
+                _SLOT.pack_into(buf, offset, digest, expires, now, mood_len, body_len)
+                start = offset + _SLOT.size
+                mood = bytes(buf[start : start + mood_len]).decode("utf-8")
+                body = bytes(buf[start + mood_len : start + mood_len + body_len])
+                self._count(0)
+                return mood, body
+            self._count(1)
+        return None
+
+    def put(self, key, mood, body):
+        mood = mood.encode("utf-8")
+        if _SLOT.size + len(mood) + len(body) > self.slot_size:
+            return
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        buf = self._shm.buf
+        now = time.time()
+        with self._lock:
+            target = None
+            oldest = None
+            for offset in self._slots(digest):
+                slot_digest, expires, last_used, _, _ = _SLOT.unpack_from(buf, offset)
+                if slot_digest == digest or slot_digest == _EMPTY or expires <= now:
+                    target = offset
+                    break
+                if oldest is None or last_used < oldest:
+                    target, oldest = offset, last_used
+            else:
+                self._count(2)
+            _SLOT.pack_into(buf, target, digest, now + self.ttl, now, len(mood), len(body))
+            start = target + _SLOT.size
+            buf[start : start + len(mood)] = mood
+            buf[start + len(mood) : start + len(mood) + len(body)] = body
+
+    def clear(self):
+        with self._lock:
+            self._shm.buf[_HEADER.size : self._shm.size] = bytes(self._shm.size - _HEADER.size)
+
+    def metrics(self):
+        with self._lock:
+            hits, misses, evictions, expired = _HEADER.unpack_from(self._shm.buf, 0)
+            entries = sum(
+                1
+                for offset in range(_HEADER.size, self._shm.size, self.slot_size)
+                if self._shm.buf[offset : offset + 16] != _EMPTY
+            )
+        lookups = hits + misses
+        return {
+            "backend": "shared",
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": evictions,
+            "expired": expired,
+        }
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._shm.close()
+        if os.getpid() == self._owner:
+            self._shm.unlink()
+        self._shm = None
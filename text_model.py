@@ -3,10 +3,10 @@ import nltk
 from nltk.tokenize import word_tokenize
 import pygame
 import os
-import time
-import threading
-import keyboard
-from transformers import pipeline
+from emotion_service import emotion_service
+from library_index import LibraryIndex
+from player import Player
+from controls import CommandDispatcher, bind_hotkeys
 
 # Define the main music directory
 MUSIC_PATH = r"C:\VibeSync\music"
@@ -25,12 +25,16 @@ EMOTION_FOLDERS = {
 # Initialize recognizer
 recognizer = sr.Recognizer()
 
-# Load Hugging Face emotion classification model
-emotion_pipeline = pipeline(
-    "text-classification",
-    model="j-hartmann/emotion-english-distilroberta-base",
-    return_all_scores=True
-)
+# Index of the music folders, kept up to date in the background
+library = LibraryIndex(MUSIC_PATH, EMOTION_FOLDERS.values())
+library.start_watching()
+
+# One player for the session; the mixer stays up and the next song is
+# decoded in the background while the current one plays
+player = Player(on_track=lambda path: print(f"\n🎵 Now playing: {os.path.basename(path)}"))
+
+# Playback commands from hotkeys and typed input, run one at a time
+controls = CommandDispatcher(debounce=0.3)
 
 # Globals
 current_index = 0
@@ -44,7 +48,7 @@ def list_songs(emotion):
         print(f"⚠️ No music folder found for {emotion}. Please check your path.")
         return []
     
-    songs = [f for f in os.listdir(folder_path) if f.endswith((".mp3", ".wav"))]
+    songs = library.songs_in(EMOTION_FOLDERS.get(emotion, ""))
     if not songs:
         print(f"⚠️ No songs found for {emotion}.")
         return []
@@ -61,20 +65,21 @@ def get_song_path(emotion, filename):
 
 # Function to find a song across all folders
 def find_song(song_name):
-    for emotion, folder in EMOTION_FOLDERS.items():
-        folder_path = os.path.join(MUSIC_PATH, folder)
-        if os.path.exists(folder_path):
-            for file in os.listdir(folder_path):
-                if file.lower() == song_name.lower():
-                    return os.path.join(folder_path, file)
-    return None
+    return library.find_exact(song_name)
 
 # Function to play a single song
 def play_song(song_path):
-    pygame.mixer.init()
-    pygame.mixer.music.load(song_path)
-    pygame.mixer.music.play()
-    print(f"\n🎵 Now playing: {os.path.basename(song_path)}")
+    player.play([song_path], loop=False)
+
+# Full paths of the songs in the current list
+def current_paths():
+    if current_emotion:
+        return [get_song_path(current_emotion, song) for song in current_songs]
+    return list(current_songs)
+
+# Play the current list from `index` on
+def play_mood_songs(index):
+    player.play(current_paths(), index)
 
 # Detect emotion from text
 def detect_emotion(command):
@@ -82,35 +87,33 @@ def detect_emotion(command):
     for emotion in EMOTION_FOLDERS:
         if emotion in tokens:
             return emotion
-    return None
+    # No mood named outright, ask the classifier
+    return emotion_service.predict(command)
 
 # Hotkey action: Skip to next
 def skip_to_next():
     global current_index, current_songs, current_emotion
     if current_songs:
-        current_index += 1
-        if current_index >= len(current_songs):
-            current_index = 0
-        pygame.mixer.music.stop()
         print("\n⏭️ Playing next song...")
-        time.sleep(0.5)
-        next_song_path = (
-            get_song_path(current_emotion, current_songs[current_index])
-            if current_emotion else current_songs[current_index]
-        )
-        play_song(next_song_path)
+        paths = current_paths()
+        if player.tracks != paths or not player.next():
+            current_index = (current_index + 1) % len(paths)
+            player.play(paths, current_index)
+        current_index = player.index
 
 # Hotkey action: Quit program
 def quit_program():
     print("\n👋 Exiting...")
-    pygame.mixer.music.stop()
+    player.stop()
     os._exit(0)
 
-# Key monitoring thread
+controls.on("next", skip_to_next)
+controls.on("play", play_mood_songs)
+controls.on("quit", quit_program)
+
+# Hotkeys post to the same dispatcher as typed commands
 def monitor_keys():
-    keyboard.add_hotkey('n', skip_to_next)
-    keyboard.add_hotkey('q', quit_program)
-    keyboard.wait()
+    bind_hotkeys(controls, {"n": "next", "q": "quit"})
 
 # Main function
 def main():
@@ -118,7 +121,8 @@ def main():
 
     pygame.init()
     nltk.download('punkt')
-    threading.Thread(target=monitor_keys, daemon=True).start()
+    controls.start()
+    monitor_keys()
 
     print("\n🎶 Welcome to VibeSync!")
     print("💡 Controls: Press 'n' to play next song | Press 'q' to quit\n")
@@ -130,7 +134,7 @@ def main():
             print("👋 Exiting program...")
             break
         elif user_input == "n" and current_songs:
-            skip_to_next()
+            controls.post("next", source="input")
             continue
 
         song_path = find_song(user_input)
@@ -156,14 +160,13 @@ def main():
                 print("👋 Exiting program...")
                 return
             elif song_choice == "n":
-                skip_to_next()
+                controls.post("next", source="input")
             else:
                 try:
                     song_index = int(song_choice) - 1
                     if 0 <= song_index < len(current_songs):
                         current_index = song_index
-                        full_path = get_song_path(current_emotion, current_songs[current_index])
-                        play_song(full_path)
+                        controls.post("play", current_index, source="input")
                     else:
                         print("⚠️ Invalid selection! Try again.")
                 except ValueError:
@@ -0,0 +1,266 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+# Compressed variants we can produce: mimetype -> (ffmpeg format, extension, codec args)
+VARIANTS = {
+    "audio/mpeg": ("mp3", ".mp3", ["-codec:a", "libmp3lame", "-b:a", "128k"]),
+    "audio/ogg": ("ogg", ".ogg", ["-codec:a", "libvorbis", "-q:a", "4"]),
+}
+
+CHUNK_SIZE = 64 * 1024
+# Another process's temp file that hasn't been written to for this long is
+# left over from a crash, even if its pid has been reused since
+STALE_PART_SECONDS = 3600
+
+
+# Pick a compressed variant from the Accept header, or None to send the WAV.
+# A bare */* (what most <audio> elements send) gets the first variant.
+def choose_variant(accept):
+    best = accept.best_match(list(VARIANTS) + ["audio/wav", "audio/x-wav"])
+    return best if best in VARIANTS else None
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # os.kill would end the process; rely on STALE_PART_SECONDS instead
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# One ffmpeg run writing into a temp file in the cache directory. Readers
+# follow the temp file while it grows, so the first listener hears the track
+# while it is still being encoded, and a second listener joins the same run.
+class _Transcode:
+    def __init__(self, command, tmp_path):
+        self.tmp_path = tmp_path
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, args=(command,), daemon=True)
+
+    def _run(self, command):
+        try:
+            with open(self.tmp_path, "wb") as out:
+                proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+                    out.flush()
+                    with self.cond:
+                        self.cond.notify_all()
+                if proc.wait() != 0:
+                    raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    def follow(self, f):
+        with f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if chunk:
+                    yield chunk
+                    continue
+                with self.cond:
+                    if self.done:
+                        chunk = f.read()
+                        if chunk:
+                            yield chunk
+                        return
+                    self.cond.wait(0.5)
+
+
+# Size-bounded on-disk cache of transcoded tracks, keyed by the hash of the
+# source file's contents. Once the cache grows past max_bytes the least
+# recently used files are removed. Recency is kept in memory (files not used
+# since startup count from when they were written): the files' mtimes feed
+# the ETag and Last-Modified they're served with, so hits mustn't touch them.
+class TranscodeCache:
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._hashes = {}
+        self._running = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        from pydub.utils import get_encoder_name
+
+        self.encoder = shutil.which(get_encoder_name())
+
+    @property
+    def available(self):
+        return self.encoder is not None
+
+    # Content hash of a source file, remembered until its size or mtime changes
+    def content_hash(self, path):
+        st = os.stat(path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = self._hashes[path] = (stamp, _file_hash(path))
+        return cached[1]
+
+    def cache_path(self, path, variant):
+        return os.path.join(self.cache_dir, self.content_hash(path) + VARIANTS[variant][1])
+
+    # Path of the finished variant, or None if it hasn't been produced yet
+    def lookup(self, path, variant):
+        target = self.cache_path(path, variant)
+        if not os.path.isfile(target):
+            return None
+        self._last_used[target] = time.time()
+        return target
+
+    def _command(self, path, variant):
+        fmt, ext, args = VARIANTS[variant]
+        return [self.encoder, "-v", "error", "-i", path, *args, "-f", fmt, "pipe:1"]
+
+    # Temp files are named after the process writing them, so processes
+    # sharing the cache directory only clean up their own (see _remove_parts)
+    def _temp_file(self, suffix):
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.getpid()}-", suffix=suffix, dir=self.cache_dir)
+        os.close(fd)
+        return tmp_path
+
+    def _start(self, path, variant, target):
+        job = self._running[target] = _Transcode(
+            self._command(path, variant), self._temp_file(VARIANTS[variant][1] + ".part")
+        )
+        job.thread.start()
+        threading.Thread(target=self._finish, args=(job, target), daemon=True).start()
+        return job
+
+    # Stream a variant that isn't cached yet, starting the transcode if needed
+    def stream(self, path, variant):
+        target = self.cache_path(path, variant)
+        with self._lock:
+            job = self._running.get(target) or self._start(path, variant, target)
+            # Open before releasing the lock so the file can't be renamed away first
+            try:
+                f = open(job.tmp_path, "rb")
+            except FileNotFoundError:
+                # Deleted from under the job (say by hand); its output can't
+                # be followed, so encode again
+                job = self._start(path, variant, target)
+                f = open(job.tmp_path, "rb")
+        return job.follow(f)
+
+    # The finished file is in place before the job stops being listed as
+    # running, so a request in between finds one or the other, never neither
+    def _finish(self, job, target):
+        job.thread.join()
+        with self._lock:
+            try:
+                if job.error is None and not self._install(job.tmp_path, target):
+                    job.error = FileNotFoundError(f"{job.tmp_path} was removed while encoding")
+                if job.error is None:
+                    self._last_used[target] = time.time()
+            finally:
+                # A job started in this one's place is still running
+                if self._running.get(target) is job:
+                    del self._running[target]
+        if job.error is None:
+            self.evict()
+        else:
+            print(f"⚠️ Transcoding failed for {target}: {job.error}")
+            self._remove_parts()
+
+    # Returns False if the temp file is gone
+    def _install(self, tmp_path, target):
+        try:
+            os.replace(tmp_path, target)
+            return True
+        except FileNotFoundError:
+            return False
+        except PermissionError:
+            pass
+        # Windows won't rename a file a listener still has open: copy it
+        # next to the target and rename the copy. The original is removed
+        # once the listener is done with it (see _remove_parts).
+        copy_path = self._temp_file(".part")
+        try:
+            shutil.copyfile(tmp_path, copy_path)
+            os.replace(copy_path, target)
+        except FileNotFoundError:
+            os.remove(copy_path)
+            return False
+        except BaseException:
+            os.remove(copy_path)
+            raise
+        return True
+
+    # Whether a temp file may be deleted: this process's when no running job
+    # writes to it (failed runs, originals left behind by _install), another
+    # process's only once that process is gone or the file has gone stale
+    def _abandoned(self, entry, running, now):
+        if entry.path in running:
+            return False
+        owner, sep, _ = entry.name.partition("-")
+        if not sep or not owner.isdigit():
+            return True  # from before temp files were named after their process
+        pid = int(owner)
+        if pid == os.getpid():
+            return True
+        try:
+            if now - entry.stat().st_mtime >= STALE_PART_SECONDS:
+                return True
+        except FileNotFoundError:
+            return False
+        return not _pid_alive(pid)
+
+    # Delete the temp files nobody writes to any more
+    def _remove_parts(self):
+        now = time.time()
+        with self._lock:
+            running = {job.tmp_path for job in self._running.values()}
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".part") and self._abandoned(entry, running, now):
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+
+    def evict(self):
+        self._remove_parts()
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    st = entry.stat()
+                    last_used = max(st.st_mtime, self._last_used.get(entry.path, 0.0))
+                    entries.append((last_used, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._last_used.pop(path, None)
+            except OSError:
+                pass
@@ -0,0 +1,245 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Interface for user backends. Records are dicts shaped like the entries of
+# the old users.json: {"email": ..., "password": ...}
+class UserStore(ABC):
+    # The user's record, or None
+    @abstractmethod
+    def get(self, username): ...
+
+    # Returns False if the username is already taken
+    @abstractmethod
+    def add(self, username, email, password_hash): ...
+
+    # Insert (username, email, password_hash) tuples, skipping taken
+    # usernames. Returns the number inserted.
+    @abstractmethod
+    def add_many(self, users): ...
+
+    @abstractmethod
+    def count(self): ...
+
+    @abstractmethod
+    def close(self): ...
+
+
+# SQLite backed store. The database runs in WAL mode so writes are appended
+# to the write-ahead log and readers never block on a writer. Lookups go
+# through the primary key index, with a small LRU cache in front of it.
+#
+# Once closed, every method raises sqlite3.ProgrammingError, cache hits
+# included.
+class SQLiteUserStore(UserStore):
+    def __init__(self, path, cache_size=1024, batch_size=64):
+        self.path = path
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._conns = []  # every thread's connection, for close()
+        self._conns_lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            " username TEXT PRIMARY KEY,"
+            " email TEXT NOT NULL,"
+            " password TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.commit()
+        conn.close()
+
+        self._start_writer()
+        # Connections and the writer thread don't survive a fork; a forked
+        # worker (see prefork.py) opens its own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_writer(self):
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _after_fork(self):
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._close_lock = threading.Lock()
+        self._writes = queue.Queue()
+        if not self._closed:
+            self._start_writer()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # One connection per thread, readers share nothing but the file
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._conns_lock:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Cannot operate on a closed user store.")
+                conn = self._local.conn = self._connect()
+                self._conns.append(conn)
+        return conn
+
+    def _cache_get(self, username):
+        with self._cache_lock:
+            record = self._cache.get(username)
+            if record is not None:
+                self._cache.move_to_end(username)
+            return record
+
+    def _cache_put(self, username, record):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[username] = record
+            self._cache.move_to_end(username)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, username):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed user store.")
+        record = self._cache_get(username)
+        if record is not None:
+            return record
+
+        row = self._conn().execute(
+            "SELECT email, password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        record = {"email": row[0], "password": row[1]}
+        self._cache_put(username, record)
+        return record
+
+    # Queue a single insert for the writer thread and wait for it to commit.
+    # Returns False if the username is already taken.
+    def add(self, username, email, password_hash):
+        future = Future()
+        # close() queues the writer's stop under the same lock, so nothing
+        # can be queued behind it and wait forever
+        with self._close_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed user store.")
+            self._writes.put(((username, email, password_hash), future))
+        return future.result()
+
+    # Insert many users in one transaction, skipping existing usernames.
+    # Returns the number of users actually inserted.
+    def add_many(self, users):
+        conn = self._conn()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, email, password) VALUES (?, ?, ?)",
+                users,
+            )
+            return conn.total_changes - before
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    # Finish the queued writes, stop the writer and close every thread's
+    # connection
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            with self._conns_lock:
+                self._closed = True
+            self._writes.put(None)
+        self._writer.join()
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+
+    # Group commit: drain whatever registrations are waiting and write them
+    # in a single transaction, so a burst of signups costs one fsync.
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            results = []
+            try:
+                with conn:
+                    for params, _ in batch:
+                        cursor = conn.execute(
+                            "INSERT OR IGNORE INTO users (username, email, password) VALUES (?, ?, ?)",
+                            params,
+                        )
+                        results.append(cursor.rowcount == 1)
+            except sqlite3.Error as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (params, future), inserted in zip(batch, results):
+                    if inserted:
+                        self._cache_put(params[0], {"email": params[1], "password": params[2]})
+                    future.set_result(inserted)
+
+            if stop:
+                break
+        conn.close()
+
+
+# One-shot import of an existing users.json into a store
+def import_users_json(json_path, store):
+    with open(json_path, "r") as f:
+        users = json.load(f)
+
+    return store.add_many(
+        (username, user.get("email", "not_set@example.com"), user["password"])
+        for username, user in users.items()
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python user_store.py <users.json> <users.db>")
+        sys.exit(1)
+
+    json_path, db_path = sys.argv[1], sys.argv[2]
+    if not os.path.exists(json_path):
+        print(f"⚠️ {json_path} does not exist.")
+        sys.exit(1)
+
+    store = SQLiteUserStore(db_path)
+    imported = import_users_json(json_path, store)
+    print(f"✅ Imported {imported} users into {db_path} ({store.count()} total).")
+    store.close()
@@ -3,10 +3,11 @@ import nltk
 from nltk.tokenize import word_tokenize
 import pygame
 import os
-import time
 import threading
-import keyboard  # For keypress detection
-from transformers import pipeline
+from emotion_service import emotion_service
+from library_index import LibraryIndex
+from player import Player
+from controls import CommandDispatcher, bind_hotkeys
 import pyttsx3  # Text-to-speech library
 
 # Define the main music directory
@@ -26,15 +27,19 @@ EMOTION_FOLDERS = {
 # Initialize recognizer
 recognizer = sr.Recognizer()
 
-# Load Hugging Face emotion classification model
-emotion_pipeline = pipeline(
-    "text-classification",
-    model="j-hartmann/emotion-english-distilroberta-base",
-    return_all_scores=True
-)
+# Index of the music folders, kept up to date in the background
+library = LibraryIndex(MUSIC_PATH, EMOTION_FOLDERS.values())
+library.start_watching()
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
+# Text-to-speech engine, started the first time something is spoken
+engine = None
+
+# One player for the session; the mixer stays up and the next song is
+# decoded in the background while the current one plays
+player = Player(on_track=lambda path: print(f"\n🎵 Now playing: {os.path.basename(path)}"))
+
+# Playback commands from voice and hotkeys, run one at a time
+controls = CommandDispatcher(debounce=0.3)
 
 # Event for skipping songs
 skip_song = threading.Event()
@@ -44,6 +49,9 @@ current_emotion = None
 
 # Function to speak text
 def speak(text):
+    global engine
+    if engine is None:
+        engine = pyttsx3.init()
     engine.say(text)
     engine.runAndWait()
 
@@ -55,7 +63,7 @@ def list_songs(emotion):
         print(f"⚠️ No music folder found for {emotion}. Please check your path.")
         return []
     
-    songs = [f for f in os.listdir(folder_path) if f.endswith((".mp3", ".wav"))]
+    songs = library.songs_in(EMOTION_FOLDERS.get(emotion, ""))
     if not songs:
         print(f"⚠️ No songs found for {emotion}.")
         return []
@@ -69,24 +77,34 @@ def list_songs(emotion):
 
 # Function to search for a song in all emotion folders
 def find_song(song_name):
-    for emotion, folder in EMOTION_FOLDERS.items():
-        folder_path = os.path.join(MUSIC_PATH, folder)
-        if os.path.exists(folder_path):
-            for file in os.listdir(folder_path):
-                if song_name.lower() in file.lower():
-                    return os.path.join(folder_path, file)  # Return full path of song
-    return None
+    matches = library.find_substring(song_name)
+    return matches[0] if matches else None  # Return full path of song
 
 # Function to play a single song
 def play_song(song_path):
     print(f"🔍 Debug: Attempting to play song from path: {song_path}")  # Debug print
-    pygame.mixer.init()
-    try:
-        pygame.mixer.music.load(song_path)
-        pygame.mixer.music.play()
-        print(f"\n🎵 Now playing: {os.path.basename(song_path)}")
-    except pygame.error as e:
-        print(f"⚠️ Error: {e}")
+    player.play([song_path], loop=False)
+
+# Full paths of the songs in the current list
+def current_paths():
+    folder = os.path.join(MUSIC_PATH, EMOTION_FOLDERS.get(current_emotion, ""))
+    return [os.path.join(folder, song) for song in current_songs]
+
+# Play the current list from `index` on
+def play_mood_songs(index):
+    player.play(current_paths(), index)
+
+# Move on to the next song in the current list, wrapping around
+def skip_to_next():
+    global current_index
+    if not current_songs:
+        return
+    print("\n⏭️ Playing next song...")
+    paths = current_paths()
+    if player.tracks != paths or not player.next():
+        current_index = (current_index + 1) % len(paths)
+        player.play(paths, current_index)
+    current_index = player.index
 
 # Function to recognize speech
 def recognize_speech():
@@ -114,7 +132,8 @@ def detect_emotion(command):
     for emotion in EMOTION_FOLDERS.keys():
         if emotion in tokens:
             return emotion
-    return None
+    # No mood named outright, ask the classifier
+    return emotion_service.predict(command)
 
 # Convert index number input to correct song
 def index_to_song(index):
@@ -139,22 +158,18 @@ def word_to_index(word):
     }
     return word_map.get(word.lower(), -1)  # Return -1 if not found
 
-# Monitor key presses
+def quit_program():
+    player.stop()
+    print("\n👋 Exiting...")
+    os._exit(0)
+
+controls.on("next", skip_to_next)
+controls.on("play", play_mood_songs)
+controls.on("quit", quit_program)
+
+# Hotkeys post to the same dispatcher as voice commands
 def monitor_keys():
-    global current_index, current_songs
-    while True:
-        if keyboard.is_pressed('n') and current_songs:
-            current_index += 1
-            if current_index >= len(current_songs):
-                current_index = 0  # Restart from first song
-            pygame.mixer.music.stop()
-            print("\n⏭️ Playing next song...")
-            time.sleep(0.5)
-            play_song(current_songs[current_index])
-        elif keyboard.is_pressed('q'):
-            pygame.mixer.music.stop()
-            print("\n👋 Exiting...")
-            os._exit(0)
+    bind_hotkeys(controls, {"n": "next", "q": "quit"})
 
 # Main function to handle user input
 def main():
@@ -162,6 +177,8 @@ def main():
 
     pygame.init()
     nltk.download('punkt')
+    controls.start()
+    monitor_keys()
 
     print("\n🎶 Welcome to VibeSync!")
     print("💡 Say 'next' to play next song | Say 'exit' to quit\n")
@@ -184,10 +201,7 @@ def main():
 
         # Skip to next song
         elif "next" in command and current_songs:
-            current_index = (current_index + 1) % len(current_songs)
-            pygame.mixer.music.stop()
-            print("\n⏭️ Playing next song...")
-            play_song(os.path.join(MUSIC_PATH, EMOTION_FOLDERS[current_emotion], current_songs[current_index]))
+            controls.post("next", source="voice")
             continue
 
         # Play specific song by letter index
@@ -202,7 +216,7 @@ def main():
                     song_path = index_to_song(index)
                     
                     if song_path:
-                        play_song(song_path)
+                        controls.post("play", index - 1, source="voice")
                         continue
                     else:
                         print("⚠️ Invalid selection! Try again.")
@@ -230,7 +244,7 @@ def main():
                 if index != -1:
                     song_path = index_to_song(index)
                     if song_path:
-                        play_song(song_path)
+                        controls.post("play", index - 1, source="voice")
                         continue
                     else:
                         print("⚠️ Invalid selection! Try again.")
@@ -0,0 +1,216 @@
+import io
+import math
+import threading
+import time
+import uuid
+import wave
+from array import array
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+# Rates the VAD is tuned for; anything else is rejected when a stream opens
+SAMPLE_RATES = (8000, 16000, 32000, 48000)
+
+
+# Raises ValueError for a sample rate the VAD doesn't support
+def check_sample_rate(sample_rate):
+    if sample_rate not in SAMPLE_RATES:
+        raise ValueError(f"Unsupported sample rate {sample_rate}, use one of {', '.join(map(str, SAMPLE_RATES))}")
+
+
+# Turn an uploaded chunk into mono 16-bit PCM samples. Raw chunks are taken
+# as-is; WAV chunks are unwrapped and downmixed.
+def read_chunk(data, is_wav=False):
+    if not is_wav:
+        return array("h", data[: len(data) - len(data) % SAMPLE_WIDTH]), None
+
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError("Only 16-bit WAV audio is supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        samples = array("h", wav.readframes(wav.getnframes()))
+    if channels > 1:
+        samples = array("h", (
+            sum(samples[i : i + channels]) // channels for i in range(0, len(samples), channels)
+        ))
+    return samples, rate
+
+
+def rms(samples):
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+# Energy based voice activity detector. The first few frames set the noise
+# floor; after that a frame is speech when it is clearly louder than the floor.
+# The utterance ends after `hangover` seconds of silence following speech, or
+# when it reaches `max_utterance` seconds, whichever comes first.
+class VoiceActivityDetector:
+    def __init__(self, sample_rate=16000, frame_ms=30, min_energy=300.0, ratio=3.0,
+                 start_frames=3, hangover=0.6, max_utterance=8.0, calibration_frames=5):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        if self.frame_size <= 0:
+            raise ValueError(f"A {frame_ms} ms frame at {sample_rate} Hz has no samples")
+        self.frame_seconds = frame_ms / 1000
+        self.min_energy = min_energy
+        self.ratio = ratio
+        self.start_frames = start_frames
+        self.hangover_frames = int(hangover / self.frame_seconds)
+        self.max_frames = int(max_utterance / self.frame_seconds)
+        self.calibration_frames = calibration_frames
+        self.noise_floor = None
+        self._calibration = []
+        self._speech_run = 0
+        self._silence_run = 0
+        self.speech_frames = 0
+        self.in_speech = False
+        self.done = False
+
+    def _threshold(self):
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.ratio)
+
+    # Feed one frame, returns True if it belongs to the utterance
+    def frame(self, samples):
+        energy = rms(samples)
+        if self.noise_floor is None:
+            self._calibration.append(energy)
+            if len(self._calibration) >= self.calibration_frames:
+                self.noise_floor = sum(self._calibration) / len(self._calibration)
+            return False
+
+        speech = energy >= self._threshold()
+        if not self.in_speech:
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.start_frames:
+                self.in_speech = True
+            return self.in_speech
+
+        self.speech_frames += 1
+        self._silence_run = 0 if speech else self._silence_run + 1
+        if self._silence_run >= self.hangover_frames or self.speech_frames >= self.max_frames:
+            self.done = True
+        return True
+
+
+# Recognizers turn one utterance of 16-bit mono PCM into text, or None.
+# Offline CMU Sphinx through speech_recognition, so nothing leaves the machine.
+class SphinxRecognizer:
+    def transcribe(self, pcm, sample_rate):
+        import speech_recognition as sr
+
+        audio = sr.AudioData(pcm, sample_rate, SAMPLE_WIDTH)
+        try:
+            return sr.Recognizer().recognize_sphinx(audio).lower()
+        except sr.UnknownValueError:
+            return None
+
+
+# Always hears the same thing. Handy for tests and for running without a speech model.
+class StubRecognizer:
+    def __init__(self, text="i feel happy"):
+        self.text = text
+        self.calls = 0
+
+    def transcribe(self, pcm, sample_rate):
+        self.calls += 1
+        return self.text
+
+
+# One browser recording in progress. Keeps a short pre-roll so the start of
+# the first word isn't clipped when speech is detected. `lock` serializes
+# chunks that arrive for the same stream at once; `closed` is set once the
+# utterance has been handed to the recognizer.
+class VoiceStream:
+    def __init__(self, sample_rate=16000, preroll_frames=5, **vad_options):
+        self.sample_rate = sample_rate
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate, **vad_options)
+        self.preroll_frames = preroll_frames
+        self._pending = array("h")
+        self._preroll = []
+        self._speech = array("h")
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def done(self):
+        return self.vad.done
+
+    # Add a chunk of samples; returns True once the utterance is complete
+    def feed(self, samples):
+        self.last_seen = time.monotonic()
+        self._pending.extend(samples)
+        size = self.vad.frame_size
+        offset = 0
+        while not self.vad.done and len(self._pending) - offset >= size:
+            frame = self._pending[offset : offset + size]
+            offset += size
+            if self.vad.frame(frame):
+                for buffered in self._preroll:
+                    self._speech.extend(buffered)
+                self._preroll = []
+                self._speech.extend(frame)
+            else:
+                self._preroll.append(frame)
+                del self._preroll[: -self.preroll_frames]
+        del self._pending[:offset]
+        return self.vad.done
+
+    def audio(self):
+        return self._speech.tobytes()
+
+
+# Tracks open streams by id and hands finished utterances to the recognizer
+class VoiceStreamManager:
+    def __init__(self, recognizer=None, sample_rate=16000, ttl=30.0, **vad_options):
+        self.recognizer = recognizer if recognizer is not None else SphinxRecognizer()
+        self.sample_rate = sample_rate
+        self.ttl = ttl
+        self.vad_options = vad_options
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    # Raises ValueError for a sample rate the VAD doesn't support
+    def open(self, sample_rate=None):
+        sample_rate = sample_rate or self.sample_rate
+        check_sample_rate(sample_rate)
+        self._expire()
+        stream_id = uuid.uuid4().hex
+        with self._lock:
+            self._streams[stream_id] = VoiceStream(sample_rate, **self.vad_options)
+        return stream_id
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            for stream_id in [k for k, v in self._streams.items() if v.last_seen < cutoff]:
+                del self._streams[stream_id]
+
+    # Feed a chunk to a stream. Returns (done, text); text is only set once the
+    # utterance has ended, either because the VAD cut it off or `final` was sent.
+    def feed(self, stream_id, data, is_wav=False, final=False):
+        with self._lock:
+            stream = self._streams.get(stream_id)
+        if stream is None:
+            raise KeyError(stream_id)
+
+        samples, rate = read_chunk(data, is_wav)
+        if rate is not None and rate != stream.sample_rate:
+            raise ValueError(f"Expected {stream.sample_rate} Hz audio, got {rate} Hz")
+
+        with stream.lock:
+            # Another request for the same stream finished it while this one waited
+            if stream.closed:
+                raise KeyError(stream_id)
+            if not stream.feed(samples) and not final:
+                return False, None
+            stream.closed = True
+
+        with self._lock:
+            self._streams.pop(stream_id, None)
+        pcm = stream.audio()
+        if not pcm:
+            return True, None
+        return True, self.recognizer.transcribe(pcm, stream.sample_rate)